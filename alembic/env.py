@@ -34,6 +34,19 @@ def get_url():
     return settings.DATABASE_URL
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate away from objects managed by hand in migrations."""
+    # Monthly partitions of usagelog, created by migrations and Celery beat
+    if type_ == "table" and name.startswith("usagelog_"):
+        return False
+    # Postgres-only full-text column and its GIN index on conversationlog
+    if type_ == "column" and object.table.name == "conversationlog":
+        return name != "search_vector"
+    if type_ == "index":
+        return name != "ix_conversationlog_search_vector"
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -52,6 +65,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -59,7 +73,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,50 @@
+"""Add usage counter table
+
+Revision ID: 20261017_100000
+Revises: 20250901_210000
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_100000"
+down_revision: Union[str, None] = "20250901_210000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usagecounter",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("feature_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("period", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id", "feature_name", "period"),
+    )
+
+    # Backfill lifetime counters from the existing usage history
+    op.execute(
+        """
+        INSERT INTO usagecounter (user_id, feature_name, period, count)
+        SELECT user_id, feature_name, 'all', count(id)
+        FROM usagelog
+        GROUP BY user_id, feature_name
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("usagecounter")
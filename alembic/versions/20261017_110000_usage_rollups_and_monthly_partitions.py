@@ -0,0 +1,141 @@
+"""Add daily usage rollups and partition usagelog by month
+
+Revision ID: 20261017_110000
+Revises: 20261017_100000
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from datetime import date, timedelta
+from typing import Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_110000"
+down_revision: Union[str, None] = "20261017_100000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions to create beyond the current month; the
+# ensure_usage_log_partitions Celery task keeps extending this
+PARTITIONS_AHEAD = 2
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usagedaily",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("feature_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id", "feature_name", "day"),
+    )
+    op.execute(
+        """
+        INSERT INTO usagedaily (user_id, feature_name, day, count)
+        SELECT user_id, feature_name, CAST(timestamp AS DATE), count(id)
+        FROM usagelog
+        GROUP BY user_id, feature_name, CAST(timestamp AS DATE)
+        """
+    )
+
+    # Limits are now monthly; seed the per-month counters from the rollups
+    op.execute(
+        """
+        INSERT INTO usagecounter (user_id, feature_name, period, count)
+        SELECT user_id, feature_name, to_char(day, 'YYYY-MM'), sum(count)
+        FROM usagedaily
+        GROUP BY user_id, feature_name, to_char(day, 'YYYY-MM')
+        ON CONFLICT (user_id, feature_name, period) DO NOTHING
+        """
+    )
+
+    # Rebuild usagelog as a table range-partitioned by month. The partition
+    # key must be part of the primary key.
+    op.execute("ALTER TABLE usagelog RENAME TO usagelog_unpartitioned")
+    op.execute("ALTER INDEX usagelog_pkey RENAME TO usagelog_unpartitioned_pkey")
+    op.execute(
+        """
+        CREATE TABLE usagelog (
+            id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            feature_name VARCHAR NOT NULL,
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT usagelog_pkey PRIMARY KEY (id, timestamp),
+            CONSTRAINT usagelog_user_id_fkey
+                FOREIGN KEY (user_id) REFERENCES "user" (id)
+        ) PARTITION BY RANGE (timestamp)
+        """
+    )
+
+    first_timestamp = (
+        op.get_bind()
+        .execute(sa.text("SELECT min(timestamp) FROM usagelog_unpartitioned"))
+        .scalar()
+    )
+    current_month = date.today().replace(day=1)
+    month = first_timestamp.date().replace(day=1) if first_timestamp else current_month
+    last_month = current_month
+    for _ in range(PARTITIONS_AHEAD):
+        last_month = _next_month(last_month)
+    while month <= last_month:
+        op.execute(
+            f"CREATE TABLE usagelog_{month:%Y_%m} PARTITION OF usagelog "
+            f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+        )
+        month = _next_month(month)
+    op.execute("CREATE TABLE usagelog_default PARTITION OF usagelog DEFAULT")
+
+    op.execute(
+        """
+        INSERT INTO usagelog (id, user_id, feature_name, timestamp)
+        SELECT id, user_id, feature_name, timestamp FROM usagelog_unpartitioned
+        """
+    )
+    op.drop_table("usagelog_unpartitioned")
+    op.create_index(
+        "ix_usagelog_user_feature_timestamp",
+        "usagelog",
+        ["user_id", "feature_name", "timestamp"],
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE usagelog RENAME TO usagelog_partitioned")
+    op.execute("ALTER INDEX usagelog_pkey RENAME TO usagelog_partitioned_pkey")
+    op.create_table(
+        "usagelog",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("feature_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        """
+        INSERT INTO usagelog (id, user_id, feature_name, timestamp)
+        SELECT id, user_id, feature_name, timestamp FROM usagelog_partitioned
+        """
+    )
+    # Dropping the parent drops every partition with it
+    op.drop_table("usagelog_partitioned")
+
+    op.execute("DELETE FROM usagecounter WHERE period <> 'all'")
+    op.drop_table("usagedaily")
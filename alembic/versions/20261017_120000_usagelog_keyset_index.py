@@ -0,0 +1,30 @@
+"""Add usagelog index for keyset pagination
+
+Revision ID: 20261017_120000
+Revises: 20261017_110000
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_120000"
+down_revision: Union[str, None] = "20261017_110000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_usagelog_user_timestamp_id",
+        "usagelog",
+        ["user_id", "timestamp", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_usagelog_user_timestamp_id", table_name="usagelog")
@@ -0,0 +1,60 @@
+"""Index conversationlog for history browsing and full-text search
+
+Revision ID: 20261017_140000
+Revises: 20261017_120000
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_140000"
+down_revision: Union[str, None] = "20261017_120000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index(
+            "ix_conversationlog_user_timestamp_id",
+            "conversationlog",
+            ["user_id", "timestamp", "id"],
+        )
+        return
+
+    # Adding a stored generated column rewrites the table once
+    op.execute(
+        """
+        ALTER TABLE conversationlog ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('english', coalesce(message, '') || ' ' || coalesce(response, ''))
+        ) STORED
+        """
+    )
+    # Build the indexes without blocking the chat endpoints' inserts
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_conversationlog_user_timestamp_id",
+            "conversationlog",
+            ["user_id", "timestamp", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_conversationlog_search_vector",
+            "conversationlog",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_conversationlog_search_vector", table_name="conversationlog")
+        op.drop_column("conversationlog", "search_vector")
+    op.drop_index("ix_conversationlog_user_timestamp_id", table_name="conversationlog")
@@ -0,0 +1,43 @@
+"""Record usage quantities and LLM token counts
+
+Revision ID: 20261017_150000
+Revises: 20261017_140000
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_150000"
+down_revision: Union[str, None] = "20261017_140000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default is a metadata-only change, also on the partitions
+    op.add_column(
+        "usagelog",
+        sa.Column("quantity", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.add_column(
+        "conversationlog", sa.Column("prompt_tokens", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "conversationlog", sa.Column("completion_tokens", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("conversationlog", "completion_tokens")
+    op.drop_column("conversationlog", "prompt_tokens")
+    op.execute("DELETE FROM usagedaily WHERE feature_name = 'llm_tokens'")
+    op.execute("DELETE FROM usagecounter WHERE feature_name = 'llm_tokens'")
+    op.execute("DELETE FROM usagelog WHERE feature_name = 'llm_tokens'")
+    op.drop_column("usagelog", "quantity")
@@ -0,0 +1,231 @@
+"""Load test for the LLM chat endpoints.
+
+Drives ``/llm/chat`` (or ``/llm/chat/stream``) on a running API with a fixed
+number of requests at a fixed concurrency, and reports latency percentiles and
+throughput. Run the API against ``benchmarks.mock_llm`` so results measure this
+service rather than the provider::
+
+    python -m benchmarks.mock_llm --port 8100 &
+    LLM_BASE_URL=http://localhost:8100/v1 uvicorn src.main:app --port 8000 &
+    python -m benchmarks.llm_load --url http://localhost:8000 --requests 500 --concurrency 50
+
+Every request is sent with ``use_cache: false``. Load is spread over freshly
+registered users so per-user quotas are not what is being measured.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+import json
+import math
+import time
+from uuid import uuid4
+
+import httpx
+
+from src.subscriptions.tiers import TIER_LIMITS, SubscriptionTier
+
+PASSWORD = "benchmark-password-123"
+
+
+@dataclass(frozen=True)
+class BenchmarkUser:
+    user_id: str
+    headers: dict[str, str]
+
+
+@dataclass
+class Results:
+    latencies: list[float] = field(default_factory=list)
+    first_tokens: list[float] = field(default_factory=list)
+    statuses: Counter[str] = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return self.statuses["200"]
+
+    def summary(self) -> dict:
+        summary: dict = {
+            "requests": sum(self.statuses.values()),
+            "succeeded": self.succeeded,
+            "statuses": dict(sorted(self.statuses.items())),
+            "elapsed_seconds": round(self.elapsed, 3),
+            "throughput_rps": round(self.succeeded / self.elapsed, 2)
+            if self.elapsed
+            else 0.0,
+            "latency_ms": _percentiles(self.latencies),
+        }
+        if self.first_tokens:
+            summary["first_token_ms"] = _percentiles(self.first_tokens)
+        return summary
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {}
+    return {
+        name: round(percentile(samples, q) * 1000, 1)
+        for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+    }
+
+
+async def register_users(
+    client: httpx.AsyncClient, count: int, concurrency: int
+) -> list[BenchmarkUser]:
+    run = uuid4().hex[:8]
+    slots = asyncio.Semaphore(concurrency)
+
+    async def register(i: int) -> BenchmarkUser:
+        credentials = {"email": f"bench-{run}-{i}@example.com", "password": PASSWORD}
+        async with slots:
+            response = await client.post("/users/", json=credentials)
+            response.raise_for_status()
+            user_id = response.json()["id"]
+            response = await client.post("/auth/login", json=credentials)
+            response.raise_for_status()
+        token = response.json()["access_token"]
+        return BenchmarkUser(user_id, {"Authorization": f"Bearer {token}"})
+
+    return await asyncio.gather(*(register(i) for i in range(count)))
+
+
+async def _chat(
+    client: httpx.AsyncClient, user: BenchmarkUser, message: str, results: Results
+) -> None:
+    started = time.perf_counter()
+    response = await client.post(
+        "/llm/chat",
+        json={"user_id": user.user_id, "message": message, "use_cache": False},
+        headers=user.headers,
+    )
+    results.statuses[str(response.status_code)] += 1
+    if response.status_code == 200:
+        results.latencies.append(time.perf_counter() - started)
+
+
+async def _chat_stream(
+    client: httpx.AsyncClient, user: BenchmarkUser, message: str, results: Results
+) -> None:
+    started = time.perf_counter()
+    first_token = None
+    event = None
+    async with client.stream(
+        "POST",
+        "/llm/chat/stream",
+        json={"user_id": user.user_id, "message": message, "use_cache": False},
+        headers=user.headers,
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            results.statuses[str(response.status_code)] += 1
+            return
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line.removeprefix("event: ")
+            elif (
+                line.startswith("data: ")
+                and first_token is None
+                and "delta" in json.loads(line.removeprefix("data: "))
+            ):
+                first_token = time.perf_counter() - started
+
+    if event == "error":
+        results.statuses["stream_error"] += 1
+        return
+    results.statuses["200"] += 1
+    results.latencies.append(time.perf_counter() - started)
+    if first_token is not None:
+        results.first_tokens.append(first_token)
+
+
+async def run_benchmark(
+    client: httpx.AsyncClient,
+    users: list[BenchmarkUser],
+    requests: int,
+    concurrency: int,
+    stream: bool = False,
+    message: str = "How should I rebalance a 60/40 portfolio?",
+) -> Results:
+    """Send ``requests`` chats, ``concurrency`` at a time, round-robin over ``users``."""
+    results = Results()
+    send = _chat_stream if stream else _chat
+    next_request = iter(range(requests))
+
+    async def worker() -> None:
+        for i in next_request:
+            try:
+                await send(client, users[i % len(users)], f"{message} ({i})", results)
+            except httpx.HTTPError as e:
+                results.statuses[type(e).__name__] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    results.elapsed = time.perf_counter() - started
+    return results
+
+
+def _print_report(summary: dict) -> None:
+    print(
+        f"{summary['succeeded']}/{summary['requests']} succeeded in "
+        f"{summary['elapsed_seconds']}s ({summary['throughput_rps']} req/s)"
+    )
+    print(f"statuses: {summary['statuses']}")
+    for name in ("latency_ms", "first_token_ms"):
+        if summary.get(name):
+            values = "  ".join(f"{k}={v}" for k, v in summary[name].items())
+            print(f"{name}: {values}")
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    per_user = TIER_LIMITS[SubscriptionTier.FREE].llm_requests_limit
+    user_count = args.users or math.ceil((args.warmup + args.requests) / per_user)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        users = await register_users(client, user_count, args.concurrency)
+        if args.warmup:
+            await run_benchmark(
+                client, users, args.warmup, args.concurrency, stream=args.stream
+            )
+        results = await run_benchmark(
+            client, users, args.requests, args.concurrency, stream=args.stream
+        )
+    return results.summary()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--stream", action="store_true", help="Use /llm/chat/stream")
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=None,
+        help="Users to spread load over (default: enough to stay within free quotas)",
+    )
+    parser.add_argument("--warmup", type=int, default=0, help="Untimed requests first")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", action="store_true", help="Print a JSON summary")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        _print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Local OpenAI-compatible chat completions server for load tests.
+
+Answers ``POST /v1/chat/completions``, streaming or not, with filler text after
+a simulated time to first token, then at a fixed token rate. A share of calls
+can be failed with provider-style errors. Point the API at it with
+``LLM_BASE_URL=http://localhost:8100/v1``::
+
+    python -m benchmarks.mock_llm --port 8100 --ttft-ms 300 --tokens-per-second 80
+
+Each filler word is reported as one completion token; prompt tokens are a
+characters-per-token estimate. Only their order of magnitude matters here.
+"""
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+import json
+import math
+import random
+import time
+from typing import Any, Literal
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+Distribution = Literal["fixed", "uniform", "lognormal"]
+
+ERROR_BODIES = {
+    429: ("rate_limit_exceeded", "Rate limit reached"),
+    500: ("server_error", "The server had an error processing your request"),
+    502: ("bad_gateway", "Upstream provider unavailable"),
+    503: ("overloaded", "The engine is currently overloaded"),
+}
+FILLER_TEXT = (
+    "Diversification spreads risk across assets whose returns do not move "
+    "together so that losses in one holding are offset by gains in another"
+)
+
+
+@dataclass(frozen=True)
+class MockLLMConfig:
+    # Time to first token: the median for lognormal, the mean for uniform
+    ttft_ms: float = 200.0
+    ttft_distribution: Distribution = "lognormal"
+    # Lognormal shape, or the +/- fraction of ttft_ms for uniform
+    ttft_spread: float = 0.5
+    # Generation speed after the first token; 0 sends everything at once
+    tokens_per_second: float = 50.0
+    completion_tokens: int = 100
+    # Share of calls answered with one of error_statuses instead
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (429, 500, 503)
+    seed: int | None = None
+
+
+def _count_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+class MockLLM:
+    def __init__(self, config: MockLLMConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+
+    def ttft(self) -> float:
+        """A time to first token in seconds, drawn from the configured distribution."""
+        config = self.config
+        median = config.ttft_ms / 1000
+        if config.ttft_distribution == "uniform":
+            spread = median * config.ttft_spread
+            return max(0.0, self.random.uniform(median - spread, median + spread))
+        if config.ttft_distribution == "lognormal":
+            return self.random.lognormvariate(math.log(median), config.ttft_spread)
+        return median
+
+    def failure(self) -> int | None:
+        if self.random.random() < self.config.error_rate:
+            return self.random.choice(self.config.error_statuses)
+        return None
+
+    def tokens(self) -> list[str]:
+        words = FILLER_TEXT.split()
+        return [
+            words[i % len(words)] + " " for i in range(self.config.completion_tokens)
+        ]
+
+    def usage(self, messages: list[dict[str, Any]], completion_tokens: int) -> dict:
+        prompt_tokens = sum(_count_tokens(str(m.get("content", ""))) for m in messages)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    async def pace(self, tokens: int) -> None:
+        if self.config.tokens_per_second > 0:
+            await asyncio.sleep(tokens / self.config.tokens_per_second)
+
+
+def _error(status: int) -> JSONResponse:
+    code, message = ERROR_BODIES.get(status, ("error", "Injected failure"))
+    headers = {"retry-after": "1"} if status == 429 else None
+    return JSONResponse(
+        {"error": {"message": message, "type": code, "code": status}},
+        status_code=status,
+        headers=headers,
+    )
+
+
+def _chunk(completion_id: str, model: str, choices: list[dict], **extra) -> str:
+    body = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": choices,
+        **extra,
+    }
+    return f"data: {json.dumps(body)}\n\n"
+
+
+def create_app(config: MockLLMConfig | None = None) -> FastAPI:
+    mock = MockLLM(config or MockLLMConfig())
+    app = FastAPI(title="Mock LLM")
+    app.state.mock = mock
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "mock")
+        messages = body.get("messages", [])
+        completion_id = f"chatcmpl-{uuid4().hex}"
+
+        status = mock.failure()
+        if status is not None:
+            await asyncio.sleep(mock.ttft())
+            return _error(status)
+
+        tokens = mock.tokens()
+        if not body.get("stream"):
+            await asyncio.sleep(mock.ttft())
+            await mock.pace(len(tokens))
+            text = "".join(tokens)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": mock.usage(messages, len(tokens)),
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        async def events() -> AsyncIterator[str]:
+            await asyncio.sleep(mock.ttft())
+            for i, token in enumerate(tokens):
+                if i:
+                    await mock.pace(1)
+                delta = (
+                    {"content": token} if i else {"role": "assistant", "content": token}
+                )
+                yield _chunk(completion_id, model, [{"index": 0, "delta": delta}])
+            yield _chunk(
+                completion_id,
+                model,
+                [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            )
+            if include_usage:
+                usage = mock.usage(messages, len(tokens))
+                yield _chunk(completion_id, model, [], usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft-ms", type=float, default=MockLLMConfig.ttft_ms)
+    parser.add_argument(
+        "--ttft-distribution",
+        choices=["fixed", "uniform", "lognormal"],
+        default=MockLLMConfig.ttft_distribution,
+    )
+    parser.add_argument("--ttft-spread", type=float, default=MockLLMConfig.ttft_spread)
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=MockLLMConfig.tokens_per_second
+    )
+    parser.add_argument(
+        "--completion-tokens", type=int, default=MockLLMConfig.completion_tokens
+    )
+    parser.add_argument("--error-rate", type=float, default=MockLLMConfig.error_rate)
+    parser.add_argument(
+        "--error-statuses",
+        type=lambda value: tuple(int(status) for status in value.split(",")),
+        default=MockLLMConfig.error_statuses,
+        help="Comma-separated HTTP statuses to inject, e.g. 429,503",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = MockLLMConfig(
+        ttft_ms=args.ttft_ms,
+        ttft_distribution=args.ttft_distribution,
+        ttft_spread=args.ttft_spread,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        error_statuses=args.error_statuses,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
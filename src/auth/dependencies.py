@@ -1,10 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.principals import CachedUser, get_principal_cache
 from src.auth.service import AuthService
 from src.core.database import get_session
-from src.core.security import verify_token
+from src.core.security import decode_token
 from src.users.models import User
 from src.users.service import UserService
 
@@ -16,6 +19,7 @@ async def get_auth_service(session: AsyncSession = Depends(get_session)) -> Auth
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     session: AsyncSession = Depends(get_session),
 ) -> User:
@@ -28,16 +32,41 @@ async def get_current_user(
     if credentials is None:
         raise credentials_exception
 
-    token = credentials.credentials
-    email = verify_token(token)
-    if email is None:
+    # RateLimitMiddleware has usually verified the token already
+    payload = getattr(request.state, "token_claims", None) or decode_token(
+        credentials.credentials
+    )
+    if (
+        payload is None
+        or payload.get("sub") is None
+        or payload.get("type") == "refresh"
+    ):
         raise credentials_exception
+    if payload.get("active") is False:
+        raise HTTPException(status_code=400, detail="Inactive user")
+
+    user_id: UUID | None
+    try:
+        user_id = UUID(payload["sub"])
+    except ValueError:
+        # Tokens issued before the subject became the user id carry the email
+        user_id = None
+
+    principals = get_principal_cache()
+    if user_id is not None:
+        principal = await principals.get(user_id)
+        if principal is not None:
+            return principal.to_user()
 
     user_service = UserService(session)
-    user = await user_service.get_user_by_email(email)
+    if user_id is not None:
+        user = await user_service.get_user_by_id(user_id)
+    else:
+        user = await user_service.get_user_by_email(payload["sub"])
     if user is None:
         raise credentials_exception
 
+    await principals.set(CachedUser.model_validate(user, from_attributes=True))
     return user
 
 
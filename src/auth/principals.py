@@ -0,0 +1,169 @@
+"""Short-lived cache of authenticated users.
+
+``get_current_user`` used to load the user row on every authenticated request.
+Access tokens now carry the user id, and the user is resolved through this
+cache: a process-local LRU in front of an optional Redis tier shared by every
+worker. ``UserService`` invalidates entries when a user is updated or deleted;
+the shorter local TTL bounds how long other processes may serve a stale entry.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+import logging
+import time
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.metrics import principal_cache_lookups_total
+from src.core.redis import get_redis, redis_is_configured
+from src.users.models import User, UserBase
+
+logger = logging.getLogger(__name__)
+
+
+class CachedUser(UserBase):
+    """The cacheable part of ``User``; the password hash never leaves the database."""
+
+    id: UUID
+    created_at: datetime
+    updated_at: datetime | None = None
+
+    def to_user(self) -> User:
+        """A detached ``User`` for request handlers (no ``hashed_password``)."""
+        return User(**self.model_dump())
+
+
+def principal_key(user_id: UUID) -> str:
+    return f"principal:{user_id}"
+
+
+class PrincipalCache(ABC):
+    @abstractmethod
+    async def get(self, user_id: UUID) -> CachedUser | None:
+        pass
+
+    @abstractmethod
+    async def set(self, principal: CachedUser) -> None:
+        pass
+
+    @abstractmethod
+    async def invalidate(self, user_id: UUID) -> None:
+        pass
+
+
+class InMemoryPrincipalCache(PrincipalCache):
+    """Bounded LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[UUID, tuple[CachedUser, float]] = OrderedDict()
+
+    async def get(self, user_id: UUID) -> CachedUser | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return principal
+
+    async def set(self, principal: CachedUser) -> None:
+        self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, user_id: UUID) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisPrincipalCache(PrincipalCache):
+    def __init__(self, client: Redis, ttl_seconds: int):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, user_id: UUID) -> CachedUser | None:
+        value = await self.client.get(principal_key(user_id))
+        return CachedUser.model_validate_json(value) if value is not None else None
+
+    async def set(self, principal: CachedUser) -> None:
+        await self.client.set(
+            principal_key(principal.id),
+            principal.model_dump_json(),
+            ex=self.ttl_seconds,
+        )
+
+    async def invalidate(self, user_id: UUID) -> None:
+        await self.client.delete(principal_key(user_id))
+
+
+class TieredPrincipalCache(PrincipalCache):
+    """Local LRU backed by an optional shared tier.
+
+    Errors from the shared tier are logged and treated as misses, so Redis
+    being unavailable only costs a database lookup.
+    """
+
+    def __init__(self, local: PrincipalCache, shared: PrincipalCache | None = None):
+        self.local = local
+        self.shared = shared
+
+    async def get(self, user_id: UUID) -> CachedUser | None:
+        principal = await self.local.get(user_id)
+        if principal is not None:
+            principal_cache_lookups_total.labels(result="local_hit").inc()
+            return principal
+
+        if self.shared is not None:
+            try:
+                principal = await self.shared.get(user_id)
+            except RedisError as e:
+                logger.warning(f"Principal cache unavailable: {e}")
+            if principal is not None:
+                principal_cache_lookups_total.labels(result="remote_hit").inc()
+                await self.local.set(principal)
+                return principal
+
+        principal_cache_lookups_total.labels(result="miss").inc()
+        return None
+
+    async def set(self, principal: CachedUser) -> None:
+        await self.local.set(principal)
+        if self.shared is not None:
+            try:
+                await self.shared.set(principal)
+            except RedisError as e:
+                logger.warning(f"Failed to cache principal {principal.id}: {e}")
+
+    async def invalidate(self, user_id: UUID) -> None:
+        await self.local.invalidate(user_id)
+        if self.shared is not None:
+            try:
+                await self.shared.invalidate(user_id)
+            except RedisError as e:
+                logger.warning(f"Failed to invalidate principal {user_id}: {e}")
+
+
+@lru_cache
+def get_principal_cache() -> TieredPrincipalCache:
+    local = InMemoryPrincipalCache(
+        max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+    )
+    if redis_is_configured():
+        return TieredPrincipalCache(
+            local,
+            RedisPrincipalCache(get_redis(), settings.PRINCIPAL_CACHE_TTL_SECONDS),
+        )
+    return TieredPrincipalCache(local)
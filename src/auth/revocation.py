@@ -0,0 +1,173 @@
+"""Revocation list for refresh tokens and token families.
+
+Revoked ids live in Redis sets bucketed by the day the token expires, each set
+expiring with its bucket, so the list only ever holds ids of tokens that would
+still be accepted. Each process keeps a bloom filter of revoked ids in front of
+it: a negative answer skips the Redis lookup. The filter is updated on every
+local revocation and rebuilt from Redis every
+``REVOCATION_SYNC_INTERVAL_SECONDS``, which bounds how long a revocation made
+by another process can go unnoticed by ``is_revoked``. ``claim`` (used for
+refresh token rotation) always goes to Redis and is exact.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+import hashlib
+import math
+import time
+
+from redis.asyncio import Redis
+
+from src.core.config import settings
+from src.core.metrics import token_revocation_lookups_total
+from src.core.redis import get_redis, redis_is_configured
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (double hashing on blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position // 8] & (1 << (position % 8))
+            for position in self._positions(item)
+        )
+
+
+class RevocationStore(ABC):
+    @abstractmethod
+    async def revoke(self, token_id: str, expires_at: datetime) -> None:
+        """Revoke ``token_id`` until ``expires_at`` (UTC), when it lapses anyway."""
+
+    @abstractmethod
+    async def is_revoked(self, token_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def claim(self, token_id: str, expires_at: datetime) -> bool:
+        """Atomically revoke ``token_id``; False if it was already revoked.
+
+        Used to spend single-use refresh tokens.
+        """
+
+
+class InMemoryRevocationStore(RevocationStore):
+    """Process-local store used in tests and when Redis is not configured."""
+
+    def __init__(self):
+        self._revoked: dict[str, datetime] = {}
+
+    def _active(self, token_id: str) -> bool:
+        expires_at = self._revoked.get(token_id)
+        if expires_at is None:
+            return False
+        if expires_at <= datetime.utcnow():
+            del self._revoked[token_id]
+            return False
+        return True
+
+    async def revoke(self, token_id: str, expires_at: datetime) -> None:
+        self._revoked[token_id] = max(
+            expires_at, self._revoked.get(token_id, expires_at)
+        )
+
+    async def is_revoked(self, token_id: str) -> bool:
+        return self._active(token_id)
+
+    async def claim(self, token_id: str, expires_at: datetime) -> bool:
+        if self._active(token_id):
+            return False
+        self._revoked[token_id] = expires_at
+        return True
+
+
+def revocation_bucket(expires_at: datetime) -> str:
+    return f"revoked:{expires_at:%Y%m%d}"
+
+
+class RedisRevocationStore(RevocationStore):
+    def __init__(
+        self,
+        client: Redis,
+        bloom_capacity: int = settings.REVOCATION_BLOOM_CAPACITY,
+        bloom_error_rate: float = settings.REVOCATION_BLOOM_ERROR_RATE,
+        sync_interval: float = settings.REVOCATION_SYNC_INTERVAL_SECONDS,
+    ):
+        self.client = client
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.sync_interval = sync_interval
+        self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._synced_at: float | None = None
+
+    def _live_buckets(self) -> list[str]:
+        today = datetime.utcnow()
+        return [
+            revocation_bucket(today + timedelta(days=offset))
+            for offset in range(settings.REFRESH_TOKEN_EXPIRE_DAYS + 2)
+        ]
+
+    async def _sync(self) -> None:
+        # Claim the sync first so concurrent lookups keep using the old filter
+        self._synced_at = time.monotonic()
+        bloom = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+        for bucket in self._live_buckets():
+            async for token_id in self.client.sscan_iter(bucket, count=1000):
+                bloom.add(token_id)
+        self._bloom = bloom
+
+    async def _add(self, token_id: str, expires_at: datetime) -> bool:
+        bucket = revocation_bucket(expires_at)
+        bucket_end = expires_at.replace(
+            hour=0, minute=0, second=0, microsecond=0, tzinfo=UTC
+        ) + timedelta(days=1)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.sadd(bucket, token_id)
+            pipe.expireat(bucket, int(bucket_end.timestamp()))
+            added, _ = await pipe.execute()
+        self._bloom.add(token_id)
+        return bool(added)
+
+    async def revoke(self, token_id: str, expires_at: datetime) -> None:
+        await self._add(token_id, expires_at)
+
+    async def is_revoked(self, token_id: str) -> bool:
+        if (
+            self._synced_at is None
+            or time.monotonic() - self._synced_at > self.sync_interval
+        ):
+            await self._sync()
+        if token_id not in self._bloom:
+            token_revocation_lookups_total.labels(result="bloom_negative").inc()
+            return False
+
+        token_revocation_lookups_total.labels(result="checked").inc()
+        async with self.client.pipeline(transaction=False) as pipe:
+            for bucket in self._live_buckets():
+                pipe.sismember(bucket, token_id)
+            return any(await pipe.execute())
+
+    async def claim(self, token_id: str, expires_at: datetime) -> bool:
+        return await self._add(token_id, expires_at)
+
+
+@lru_cache
+def get_revocation_store() -> RevocationStore:
+    if redis_is_configured():
+        return RedisRevocationStore(get_redis())
+    return InMemoryRevocationStore()
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 
 from src.auth.dependencies import get_auth_service, get_current_active_user
-from src.auth.schemas import LoginRequest, TokenResponse
+from src.auth.schemas import LoginRequest, RefreshRequest, TokenResponse
 from src.auth.service import AuthService
 from src.users.models import User
 from src.users.schemas import UserResponse
@@ -16,6 +16,23 @@ async def login(
     return await auth_service.authenticate_user(login_request)
 
 
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    refresh_request: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    return await auth_service.refresh(refresh_request.refresh_token)
+
+
+@router.post("/logout")
+async def logout(
+    refresh_request: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    await auth_service.logout(refresh_request.refresh_token)
+    return {"message": "Logged out successfully"}
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     return UserResponse.model_validate(current_user)
@@ -1,11 +1,21 @@
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.revocation import get_revocation_store
 from src.auth.schemas import LoginRequest, TokenResponse
 from src.core.config import settings
 from src.core.exceptions import AuthenticationError
-from src.core.security import create_access_token, verify_password
+from src.core.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    verify_and_update_password,
+)
+from src.subscriptions.services import SubscriptionService
+from src.subscriptions.tiers import SubscriptionTier
+from src.users.models import User
 from src.users.service import UserService
 
 
@@ -13,24 +23,88 @@ class AuthService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.user_service = UserService(session)
+        self.subscription_service = SubscriptionService(session)
 
     async def authenticate_user(self, login_request: LoginRequest) -> TokenResponse:
         user = await self.user_service.get_user_by_email(login_request.email)
 
-        if not user or not verify_password(
+        if not user:
+            raise AuthenticationError("Incorrect email or password")
+
+        is_valid, new_hash = await verify_and_update_password(
             login_request.password, user.hashed_password
-        ):
+        )
+        if not is_valid:
             raise AuthenticationError("Incorrect email or password")
 
         if not user.is_active:
             raise AuthenticationError("User account is disabled")
 
+        if new_hash is not None:
+            # The configured bcrypt cost changed since this hash was made
+            user.hashed_password = new_hash
+            await self.session.commit()
+
+        return await self._issue_tokens(user)
+
+    async def refresh(self, refresh_token: str) -> TokenResponse:
+        """Rotate a refresh token: spend it and issue a new access/refresh pair.
+
+        Costs a signature check and a revocation lookup, no password hashing.
+        Presenting an already-spent token revokes its whole family, logging out
+        both the legitimate client and whoever replayed it.
+        """
+        payload = decode_token(refresh_token)
+        if payload is None or payload.get("type") != "refresh":
+            raise AuthenticationError("Invalid refresh token")
+
+        revocations = get_revocation_store()
+        family = payload["fam"]
+        if await revocations.is_revoked(family):
+            raise AuthenticationError("Refresh token has been revoked")
+        # The revocation store works in naive UTC, like the rest of the module
+        expires_at = datetime.fromtimestamp(payload["exp"], tz=UTC).replace(tzinfo=None)
+        if not await revocations.claim(payload["jti"], expires_at):
+            await revocations.revoke(family, self._family_expiry())
+            raise AuthenticationError("Refresh token has already been used")
+
+        user = await self.user_service.get_user_by_id(UUID(payload["sub"]))
+        if not user or not user.is_active:
+            raise AuthenticationError("User account is disabled")
+
+        return await self._issue_tokens(user, family=family)
+
+    async def logout(self, refresh_token: str) -> None:
+        """Revoke every refresh token rotated from the same login."""
+        payload = decode_token(refresh_token)
+        if payload is None or payload.get("type") != "refresh":
+            raise AuthenticationError("Invalid refresh token")
+        await get_revocation_store().revoke(payload["fam"], self._family_expiry())
+
+    async def _issue_tokens(
+        self, user: User, family: str | None = None
+    ) -> TokenResponse:
+        # The tier claim selects the rate limit bucket; it catches up with plan
+        # changes on the next refresh
+        subscription = await self.subscription_service.get_subscription_by_user_id(
+            user.id
+        )
+        tier = subscription.tier if subscription else SubscriptionTier.FREE.value
+
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            subject=user.email, expires_delta=access_token_expires
+            subject=user.id,
+            expires_delta=access_token_expires,
+            claims={"email": user.email, "active": user.is_active, "tier": tier},
         )
 
         return TokenResponse(
             access_token=access_token,
             expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_token=create_refresh_token(user.id, family=family),
         )
+
+    @staticmethod
+    def _family_expiry() -> datetime:
+        # Sessions slide, so a family lives at most one refresh lifetime past now
+        return datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
@@ -0,0 +1,267 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+import contextlib
+from datetime import datetime
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import AsyncSessionLocal
+from src.core.metrics import (
+    batch_writer_flush_seconds,
+    batch_writer_queue_depth,
+    batch_writer_rows_total,
+)
+
+logger = logging.getLogger(__name__)
+
+# Errors caused by the rows themselves; retrying the same rows cannot succeed
+REJECTED_ROW_ERRORS = (IntegrityError, DataError)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return {"$uuid": str(value)}
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$uuid" in value:
+            return UUID(value["$uuid"])
+        if "$datetime" in value:
+            return datetime.fromisoformat(value["$datetime"])
+    return value
+
+
+def _dump_rows(rows: list[dict[str, Any]]) -> str:
+    """Rows as JSON lines, with UUID and datetime values tagged."""
+    return "".join(
+        json.dumps({key: _encode_value(value) for key, value in row.items()}) + "\n"
+        for row in rows
+    )
+
+
+def _load_rows(text: str) -> list[dict[str, Any]]:
+    return [
+        {key: _decode_value(value) for key, value in json.loads(line).items()}
+        for line in text.splitlines()
+        if line
+    ]
+
+
+class BatchWriter:
+    """Write-behind buffer that bulk-inserts rows into a single table.
+
+    Callers enqueue plain row dicts and return immediately. A background task
+    flushes them with multi-row INSERTs once ``batch_size`` rows are pending or
+    every ``flush_interval`` seconds, whichever comes first. ``stop`` drains the
+    buffer, so it must be awaited from the application's shutdown hook.
+
+    ``on_flush`` runs in the same transaction as each INSERT, e.g. to maintain
+    derived tables.
+
+    With a ``spool_dir``, rows that still cannot be written at shutdown are
+    saved there as JSON lines and re-queued by the next ``start`` instead of
+    being dropped.
+
+    A batch that violates a constraint is split in halves and retried until
+    the offending rows are isolated; those are rejected (saved to a
+    ``.rejected`` file in ``spool_dir`` if set) so they cannot block the rows
+    behind them. Any other error requeues the batch for the next flush.
+    """
+
+    def __init__(
+        self,
+        table: Any,
+        name: str,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        on_flush: Callable[[AsyncSession, list[dict[str, Any]]], Awaitable[None]]
+        | None = None,
+        spool_dir: Path | None = None,
+    ):
+        self.table = table
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self.on_flush = on_flush
+        self.spool_dir = spool_dir
+        self._pending: deque[dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._restore_spool()
+        self._task = asyncio.create_task(self._run(), name=f"{self.name}-writer")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+        if self._pending and self.spool_dir is not None:
+            self._write_spool()
+        if self._pending:
+            logger.error(
+                f"Dropping {len(self._pending)} unwritten {self.name} rows on shutdown"
+            )
+            batch_writer_rows_total.labels(writer=self.name, result="dropped").inc(
+                len(self._pending)
+            )
+            self._pending.clear()
+            batch_writer_queue_depth.labels(writer=self.name).set(0)
+
+    def _write_spool(self) -> None:
+        assert self.spool_dir is not None
+        # One file per process and shutdown, so workers never write the same file
+        path = self.spool_dir / f"{self.name}-{os.getpid()}-{time.time_ns()}.spool"
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_text(_dump_rows(list(self._pending)))
+            temporary.replace(path)
+        except Exception as e:
+            logger.error(f"Failed to spool {self.name} rows to {path}: {e}")
+            return
+
+        logger.warning(
+            f"Spooled {len(self._pending)} unwritten {self.name} rows to {path}"
+        )
+        batch_writer_rows_total.labels(writer=self.name, result="spooled").inc(
+            len(self._pending)
+        )
+        self._pending.clear()
+        batch_writer_queue_depth.labels(writer=self.name).set(0)
+
+    def _restore_spool(self) -> None:
+        if self.spool_dir is None or not self.spool_dir.is_dir():
+            return
+        for path in sorted(self.spool_dir.glob(f"{self.name}-*.spool")):
+            # Claim the file first; another worker starting up may race for it
+            claimed = path.with_suffix(f".claimed-{os.getpid()}")
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                continue
+            rows = _load_rows(claimed.read_text())
+            self._pending.extend(rows)
+            claimed.unlink()
+            logger.info(f"Restored {len(rows)} spooled {self.name} rows from {path}")
+        batch_writer_queue_depth.labels(writer=self.name).set(len(self._pending))
+
+    def enqueue(self, row: dict[str, Any]) -> None:
+        if len(self._pending) >= self.max_pending:
+            # Shed the oldest row rather than grow without bound while the
+            # database is unavailable
+            self._pending.popleft()
+            batch_writer_rows_total.labels(writer=self.name, result="dropped").inc()
+            logger.error(f"{self.name} buffer full, dropped oldest row")
+
+        self._pending.append(row)
+        batch_writer_queue_depth.labels(writer=self.name).set(len(self._pending))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> None:
+        async with self.session_factory() as session:
+            await session.execute(insert(self.table), rows)
+            if self.on_flush is not None:
+                await self.on_flush(session, rows)
+            await session.commit()
+
+    def _reject(self, row: dict[str, Any], error: Exception) -> None:
+        logger.error(f"Rejected {self.name} row {row}: {error}")
+        batch_writer_rows_total.labels(writer=self.name, result="rejected").inc()
+        if self.spool_dir is None:
+            return
+        path = self.spool_dir / f"{self.name}-{os.getpid()}-{time.time_ns()}.rejected"
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(_dump_rows([row]))
+        except Exception as e:
+            logger.error(f"Failed to save rejected {self.name} row to {path}: {e}")
+
+    async def _write(self, batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Write ``batch``, isolating rejected rows; returns the rows left unwritten."""
+        chunks = [batch]
+        while chunks:
+            rows = chunks.pop()
+            try:
+                await self._insert(rows)
+            except REJECTED_ROW_ERRORS as e:
+                if len(rows) == 1:
+                    self._reject(rows[0], e)
+                else:
+                    middle = len(rows) // 2
+                    chunks += [rows[middle:], rows[:middle]]
+                continue
+            except Exception as e:
+                logger.error(f"Failed to flush {len(rows)} {self.name} rows: {e}")
+                return rows + [row for chunk in reversed(chunks) for row in chunk]
+
+            batch_writer_rows_total.labels(writer=self.name, result="written").inc(
+                len(rows)
+            )
+        return []
+
+    async def flush(self) -> bool:
+        """Write every pending row; returns False if a batch failed and was requeued."""
+        while self._pending:
+            count = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+
+            start = time.perf_counter()
+            try:
+                unwritten = await self._write(batch)
+            finally:
+                batch_writer_flush_seconds.labels(writer=self.name).observe(
+                    time.perf_counter() - start
+                )
+            if unwritten:
+                self._pending.extendleft(reversed(unwritten))
+            batch_writer_queue_depth.labels(writer=self.name).set(len(self._pending))
+            if unwritten:
+                return False
+        return True
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+        # Final drain on shutdown
+        await self.flush()
@@ -31,6 +31,16 @@ config = {
         "src.subscriptions.tasks.process_stripe_event": {"queue": "webhooks"},
         "src.privacy.tasks.generate_user_data_export": {"queue": "privacy"},
     },
+    "beat_schedule": {
+        "reconcile-usage-counters": {
+            "task": "src.subscriptions.tasks.reconcile_usage_counters",
+            "schedule": 3600.0,
+        },
+        "ensure-usage-log-partitions": {
+            "task": "src.subscriptions.tasks.ensure_usage_log_partitions",
+            "schedule": 86400.0,
+        },
+    },
 }
 
 # Enable eager execution for tests (run tasks synchronously)
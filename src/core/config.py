@@ -28,6 +28,15 @@ class Settings(BaseSettings):
     REDIS_URL: str = Field(..., description="Redis connection URL")
     REDIS_TIMEOUT: int = 5
 
+    # Usage Metering
+    USAGE_COUNTER_TTL_SECONDS: int = 86400
+    USAGE_LOG_BATCH_SIZE: int = 500
+    USAGE_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    USAGE_LOG_MAX_PENDING: int = 50000
+    # Where write-behind buffers save rows they could not write at shutdown;
+    # empty to drop them instead
+    BATCH_WRITER_SPOOL_DIR: str = ""
+
     # Security Configuration
     SECRET_KEY: str = Field(
         default="your-super-secret-key-here-at-least-32-characters-long",
@@ -41,6 +50,16 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ALGORITHM: str = "HS256"
+    JWT_KEYRING_FILE: str | None = None
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 5.0
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
 
     # CORS Configuration
     ALLOWED_HOSTS: list[str] = ["*"]
@@ -74,11 +93,58 @@ class Settings(BaseSettings):
         default="sk-or-v1-default", description="OpenRouter API key"
     )
     DEFAULT_LLM_MODEL: str = "openai/gpt-4o"
+    # Any OpenAI-compatible endpoint, e.g. a local mock server for load tests
+    LLM_BASE_URL: str = "https://openrouter.ai/api/v1"
+    # Upstream calls in flight per worker, and how long a call may wait for a slot
+    LLM_MAX_CONCURRENCY: int = 64
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    LLM_HTTP2: bool = True
+    LLM_MAX_CONNECTIONS: int = 64
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    # Deadline per upstream attempt, and for a call including its retries
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 60.0
+    LLM_DEADLINE_SECONDS: float = 120.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    # Hedging sends a duplicate request once a call is slower than this percentile
+    # of recent calls; it trades extra provider cost for tail latency
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    LLM_LOG_BATCH_SIZE: int = 200
+    LLM_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    LLM_LOG_MAX_PENDING: int = 10000
+    LLM_CONTEXT_MAX_MESSAGES: int = 40
+    LLM_CONTEXT_MAX_MESSAGE_CHARS: int = 8000
+    LLM_CONTEXT_TTL_SECONDS: int = 3600
+    LLM_CONTEXT_MAX_USERS: int = 10000
+    # Reload recent turns from the conversation log when a context was evicted
+    LLM_CONTEXT_REHYDRATE: bool = True
+    # Prompt tokens sent per request (history plus the new message); the rest of
+    # the model's window is left for the reply. Overrides are keyed by model.
+    LLM_CONTEXT_TOKEN_BUDGET: int = 8000
+    LLM_MODEL_TOKEN_BUDGETS: dict[str, int] = {}
+
+    # Finance Configuration
+    # Memory-mapped price history, loaded with ``python -m src.finance.ingest_prices``
+    PRICE_STORE_DIR: str = "data/prices"
+    # Worker processes for CPU-bound finance tools (0 runs them on the event loop)
+    FINANCE_COMPUTE_WORKERS: int = 2
+    FINANCE_COMPUTE_MAX_PENDING: int = 32
+    # Default for tools that do not set their own ``timeout_seconds``
+    FINANCE_COMPUTE_TIMEOUT_SECONDS: float = 30.0
 
     # GDPR Configuration
     GDPR_RETENTION_PERIOD_DAYS: int = 3650
 
-    # Additional Rate Limiting
+    # Additional Rate Limiting (anonymous clients; users are limited by tier)
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_TIMES: int = 100
     RATE_LIMIT_SECONDS: int = 60
 
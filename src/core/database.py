@@ -1,5 +1,6 @@
 from collections.abc import AsyncGenerator
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel
 
@@ -32,6 +33,20 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """For work that outlives the request's ``get_session``, e.g. a streamed
+    response, which must open (and close) its own session."""
+    return AsyncSessionLocal
+
+
+def dialect_insert(session: AsyncSession, table):
+    """INSERT construct supporting ``on_conflict_do_update`` for the session's
+    backend (Postgres in production, SQLite in tests)."""
+    if session.bind.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
 # Create tables (for development)
 async def create_db_and_tables():
     async with engine.begin() as conn:
@@ -33,6 +33,26 @@ class AuthorizationError(BaseAPIError):
         super().__init__(message, 403)
 
 
+class UsageLimitExceededError(BaseAPIError):
+    def __init__(self, message: str = "Usage limit exceeded"):
+        super().__init__(message, 429)
+
+
+class ServiceOverloadedError(BaseAPIError):
+    def __init__(self, message: str = "Service is busy, please retry"):
+        super().__init__(message, 503)
+
+
+class ComputeTimeoutError(BaseAPIError):
+    def __init__(self, message: str = "Computation timed out"):
+        super().__init__(message, 504)
+
+
+class UpstreamUnavailableError(BaseAPIError):
+    def __init__(self, message: str = "Upstream provider is unavailable, please retry"):
+        super().__init__(message, 503)
+
+
 def api_exception_handler(request: Request, exc: BaseAPIError) -> Response:
     logger.error(f"API Exception: {exc.message}")
     return JSONResponse(
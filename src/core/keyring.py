@@ -0,0 +1,144 @@
+"""JWT signing keys indexed by ``kid``.
+
+Tokens are signed with the active key and carry its ``kid`` header; any key in
+the ring verifies the tokens it signed, so rotating means adding a new key,
+making it active, and dropping the old one once its tokens have expired.
+Keys are parsed once into ``cryptography`` key objects when the ring is
+loaded. Public halves of asymmetric keys (ES256, EdDSA, RS256...) are
+published as a JWKS document so other services can verify tokens locally.
+
+The ring is read from ``JWT_KEYRING_FILE``::
+
+    {
+      "active": "2024-10",
+      "keys": [
+        {"kid": "2024-10", "alg": "ES256", "private_key_file": "/run/keys/2024-10.pem"},
+        {"kid": "2024-09", "alg": "EdDSA", "public_key": "-----BEGIN PUBLIC KEY-----..."}
+      ]
+    }
+
+Keys with only a public half verify but never sign. HMAC keys take a
+``secret``. Without a keyring file, tokens are signed with ``SECRET_KEY`` and
+``ALGORITHM`` and carry no ``kid``, as before. Tokens without a ``kid`` are
+still accepted against that key unless ``"accept_unkeyed": false``.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+import json
+from pathlib import Path
+from typing import Any
+
+from jwt import InvalidTokenError, decode, encode, get_unverified_header
+from jwt.algorithms import get_default_algorithms
+
+from src.core.config import settings
+
+_ALGORITHMS = get_default_algorithms()
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    kid: str | None
+    algorithm: str
+    verifying_key: Any
+    signing_key: Any | None = None
+    public_jwk: dict[str, Any] | None = None
+
+
+def _read_pem(spec: dict[str, Any], field: str) -> str | None:
+    if field in spec:
+        return spec[field]
+    if f"{field}_file" in spec:
+        return Path(spec[f"{field}_file"]).read_text()
+    return None
+
+
+def load_key(spec: dict[str, Any]) -> JWTKey:
+    """Parse one keyring entry; raises ``ValueError`` if it is incomplete."""
+    kid, alg = spec["kid"], spec["alg"]
+    if alg not in _ALGORITHMS:
+        raise ValueError(f"Unsupported JWT algorithm for key {kid}: {alg}")
+    algorithm = _ALGORITHMS[alg]
+
+    if alg.startswith("HS"):
+        secret = algorithm.prepare_key(spec["secret"])
+        return JWTKey(kid, alg, verifying_key=secret, signing_key=secret)
+
+    private_pem = _read_pem(spec, "private_key")
+    if private_pem is not None:
+        signing_key = algorithm.prepare_key(private_pem)
+        verifying_key = signing_key.public_key()
+    else:
+        public_pem = _read_pem(spec, "public_key")
+        if public_pem is None:
+            raise ValueError(f"JWT key {kid} has neither a private nor a public key")
+        signing_key = None
+        verifying_key = algorithm.prepare_key(public_pem)
+
+    public_jwk = {
+        **algorithm.to_jwk(verifying_key, as_dict=True),
+        "kid": kid,
+        "alg": alg,
+        "use": "sig",
+    }
+    return JWTKey(kid, alg, verifying_key, signing_key, public_jwk)
+
+
+class Keyring:
+    def __init__(
+        self,
+        keys: list[JWTKey],
+        active_kid: str | None,
+        unkeyed: JWTKey | None = None,
+    ):
+        self.keys = {key.kid: key for key in keys}
+        self.active = self.keys[active_kid]
+        if self.active.signing_key is None:
+            raise ValueError(f"Active JWT key {active_kid} has no private key")
+        self.unkeyed = unkeyed
+
+    def sign(self, payload: dict[str, Any]) -> str:
+        headers = {"kid": self.active.kid} if self.active.kid is not None else None
+        return encode(
+            payload,
+            self.active.signing_key,
+            algorithm=self.active.algorithm,
+            headers=headers,
+        )
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Decode ``token`` with the key named by its ``kid``.
+
+        Raises ``jwt.InvalidTokenError`` for unknown keys as for bad signatures.
+        """
+        kid = get_unverified_header(token).get("kid")
+        key = self.keys.get(kid) if kid is not None else self.unkeyed
+        if key is None:
+            raise InvalidTokenError(f"Unknown signing key: {kid}")
+        return decode(token, key.verifying_key, algorithms=[key.algorithm])
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        return {
+            "keys": [key.public_jwk for key in self.keys.values() if key.public_jwk]
+        }
+
+
+def _secret_key() -> JWTKey:
+    return load_key(
+        {"kid": None, "alg": settings.ALGORITHM, "secret": settings.SECRET_KEY}
+    )
+
+
+@lru_cache
+def get_keyring() -> Keyring:
+    secret_key = _secret_key()
+    if not settings.JWT_KEYRING_FILE:
+        return Keyring([secret_key], active_kid=None, unkeyed=secret_key)
+
+    config = json.loads(Path(settings.JWT_KEYRING_FILE).read_text())
+    return Keyring(
+        [load_key(spec) for spec in config["keys"]],
+        active_kid=config["active"],
+        unkeyed=secret_key if config.get("accept_unkeyed", True) else None,
+    )
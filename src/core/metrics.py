@@ -1,4 +1,4 @@
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 # Subscription metrics
 subscriptions_active_total = Counter(
@@ -10,7 +10,137 @@ finance_tool_usage_total = Counter(
     "finance_tool_usage_total", "Total usage of finance tools", ["tool_name", "user_id"]
 )
 
+finance_compute_pool_workers = Gauge(
+    "finance_compute_pool_workers", "Worker processes in the finance compute pool"
+)
+finance_compute_pool_pending = Gauge(
+    "finance_compute_pool_pending",
+    "Finance compute jobs submitted and not yet finished, queued or running",
+)
+finance_compute_pool_rejected_total = Counter(
+    "finance_compute_pool_rejected_total",
+    "Finance compute jobs refused because the pool was saturated",
+    ["tool_name"],
+)
+finance_compute_pool_timeouts_total = Counter(
+    "finance_compute_pool_timeouts_total",
+    "Finance compute jobs that exceeded their tool's timeout",
+    ["tool_name"],
+)
+finance_compute_pool_queue_wait_seconds = Histogram(
+    "finance_compute_pool_queue_wait_seconds",
+    "Time finance compute jobs waited for a free worker",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+finance_compute_pool_run_seconds = Histogram(
+    "finance_compute_pool_run_seconds",
+    "Time finance compute jobs ran in a worker",
+    ["tool_name"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
 # Privacy/GDPR metrics
 gdpr_actions_total = Counter(
     "gdpr_actions_total", "Total GDPR actions performed", ["action_type"]
 )
+
+# Usage metering metrics
+usage_counter_lookups_total = Counter(
+    "usage_counter_lookups_total",
+    "Usage counter lookups by source",
+    ["result"],  # hit, miss or fallback
+)
+
+# Authentication metrics
+principal_cache_lookups_total = Counter(
+    "principal_cache_lookups_total",
+    "Authenticated user lookups by source",
+    ["result"],  # local_hit, remote_hit or miss
+)
+
+rate_limit_decisions_total = Counter(
+    "rate_limit_decisions_total",
+    "Rate limiter decisions",
+    ["result"],  # allowed, limited or error (store unreachable, allowed)
+)
+token_revocation_lookups_total = Counter(
+    "token_revocation_lookups_total",
+    "Revocation list lookups",
+    ["result"],  # bloom_negative (skipped Redis) or checked
+)
+password_hash_queue_depth = Gauge(
+    "password_hash_queue_depth",
+    "Password hash/verify jobs submitted and not yet finished",
+)
+password_hash_rejected_total = Counter(
+    "password_hash_rejected_total",
+    "Password hash/verify jobs refused because the pool was saturated",
+)
+
+# LLM metrics
+llm_stream_first_token_seconds = Histogram(
+    "llm_stream_first_token_seconds",
+    "Time from a streaming chat request to its first token being sent",
+    buckets=(0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10, 30),
+)
+llm_response_cache_lookups_total = Counter(
+    "llm_response_cache_lookups_total",
+    "LLM response cache lookups by outcome",
+    ["result"],  # local_hit, remote_hit, miss or coalesced (joined an in-flight call)
+)
+llm_upstream_queue_wait_seconds = Histogram(
+    "llm_upstream_queue_wait_seconds",
+    "Time spent waiting for a free upstream LLM call slot",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+llm_upstream_in_flight = Gauge(
+    "llm_upstream_in_flight", "Upstream LLM calls currently running on this worker"
+)
+llm_upstream_rejected_total = Counter(
+    "llm_upstream_rejected_total",
+    "LLM calls refused after waiting too long for an upstream slot",
+)
+llm_upstream_attempts_total = Counter(
+    "llm_upstream_attempts_total",
+    "Upstream LLM call attempts by outcome",
+    ["result"],  # success, retryable_error, error or circuit_open
+)
+llm_hedged_requests_total = Counter(
+    "llm_hedged_requests_total",
+    "Upstream LLM calls that were slow enough to send a hedged duplicate",
+)
+llm_circuit_open = Gauge(
+    "llm_circuit_open", "1 while the LLM provider circuit breaker is open"
+)
+llm_streams_total = Counter(
+    "llm_streams_total",
+    "Streaming chat responses by outcome",
+    ["result"],  # completed, cancelled (client went away) or error
+)
+LLM_TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 131072)
+llm_prompt_tokens = Histogram(
+    "llm_prompt_tokens",
+    "Prompt tokens per upstream LLM call",
+    ["model", "source"],  # source: provider (reported) or estimate (tiktoken)
+    buckets=LLM_TOKEN_BUCKETS,
+)
+llm_completion_tokens = Histogram(
+    "llm_completion_tokens",
+    "Completion tokens per upstream LLM call",
+    ["model", "source"],
+    buckets=LLM_TOKEN_BUCKETS,
+)
+
+# Write-behind batch writer metrics
+batch_writer_queue_depth = Gauge(
+    "batch_writer_queue_depth", "Rows waiting to be flushed", ["writer"]
+)
+batch_writer_flush_seconds = Histogram(
+    "batch_writer_flush_seconds", "Time spent flushing one batch", ["writer"]
+)
+batch_writer_rows_total = Counter(
+    "batch_writer_rows_total",
+    "Rows handled by batch writers",
+    # written, dropped, spooled (saved to disk at shutdown) or rejected (bad row)
+    ["writer", "result"],
+)
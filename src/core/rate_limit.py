@@ -0,0 +1,202 @@
+"""Distributed token-bucket rate limiting as pure ASGI middleware.
+
+Authenticated requests are limited per user at their subscription tier's
+``requests_per_minute``; anonymous ones per client address at
+``RATE_LIMIT_TIMES`` per ``RATE_LIMIT_SECONDS``. Buckets live in Redis and are
+updated by a single Lua script using the Redis clock, so every worker and node
+draws from the same bucket. Without Redis (tests, local runs) an in-memory
+bucket store stands in.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+import json
+import logging
+import math
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.metrics import rate_limit_decisions_total
+from src.core.redis import get_redis, redis_is_configured
+from src.core.security import decode_token
+from src.subscriptions.tiers import TIER_LIMITS, SubscriptionTier
+
+logger = logging.getLogger(__name__)
+
+# Never limited: probes and scrapers
+EXEMPT_PATHS = ("/health", "/metrics")
+
+
+@dataclass(frozen=True)
+class BucketResult:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class TokenBucketStore(ABC):
+    @abstractmethod
+    async def take(
+        self, key: str, capacity: int, refill_per_second: float, cost: int = 1
+    ) -> BucketResult:
+        """Refill ``key`` for the time elapsed, then try to take ``cost`` tokens."""
+
+
+class InMemoryTokenBucketStore(TokenBucketStore):
+    """Process-local buckets used in tests and when Redis is not configured."""
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def take(
+        self, key: str, capacity: int, refill_per_second: float, cost: int = 1
+    ) -> BucketResult:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+        if tokens >= cost:
+            self._buckets[key] = (tokens - cost, now)
+            return BucketResult(True, tokens - cost, 0.0)
+        self._buckets[key] = (tokens, now)
+        return BucketResult(False, tokens, (cost - tokens) / refill_per_second)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+# KEYS[1] = bucket key, ARGV = capacity, refill per second, cost.
+# Floats are returned as strings; Redis would truncate Lua numbers to integers.
+_TAKE_TOKENS = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class RedisTokenBucketStore(TokenBucketStore):
+    def __init__(self, client: Redis):
+        self._take = client.register_script(_TAKE_TOKENS)
+
+    async def take(
+        self, key: str, capacity: int, refill_per_second: float, cost: int = 1
+    ) -> BucketResult:
+        allowed, remaining, retry_after = await self._take(
+            keys=[key], args=[capacity, refill_per_second, cost]
+        )
+        return BucketResult(bool(allowed), float(remaining), float(retry_after))
+
+
+@lru_cache
+def get_token_bucket_store() -> TokenBucketStore:
+    if redis_is_configured():
+        return RedisTokenBucketStore(get_redis())
+    return InMemoryTokenBucketStore()
+
+
+def _bearer_token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" and token else None
+    return None
+
+
+class RateLimitMiddleware:
+    """Answers 429 with ``Retry-After`` once the caller's bucket is empty.
+
+    Verified token claims are left in ``scope["state"]["token_claims"]`` so
+    ``get_current_user`` does not decode the token a second time. If the bucket
+    store is unreachable, requests are let through.
+    """
+
+    def __init__(self, app: ASGIApp, store: TokenBucketStore | None = None):
+        self.app = app
+        self.store = store
+
+    def _limit_for(self, scope: Scope) -> tuple[str, int, float]:
+        """Bucket key, capacity and refill rate for the request's caller."""
+        token = _bearer_token(scope)
+        claims = decode_token(token) if token else None
+        if claims is not None and claims.get("type") != "refresh":
+            scope.setdefault("state", {})["token_claims"] = claims
+            try:
+                tier = SubscriptionTier(claims.get("tier"))
+            except ValueError:
+                tier = SubscriptionTier.FREE
+            per_minute = TIER_LIMITS[tier].requests_per_minute
+            return (
+                f"ratelimit:user:{claims['sub']}:{tier.value}",
+                per_minute,
+                per_minute / 60,
+            )
+
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        return (
+            f"ratelimit:ip:{address}",
+            settings.RATE_LIMIT_TIMES,
+            settings.RATE_LIMIT_TIMES / settings.RATE_LIMIT_SECONDS,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["path"].startswith(EXEMPT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key, capacity, refill_per_second = self._limit_for(scope)
+        store = self.store or get_token_bucket_store()
+        try:
+            result = await store.take(key, capacity, refill_per_second)
+        except RedisError as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            rate_limit_decisions_total.labels(result="error").inc()
+            await self.app(scope, receive, send)
+            return
+
+        if result.allowed:
+            rate_limit_decisions_total.labels(result="allowed").inc()
+            await self.app(scope, receive, send)
+            return
+
+        rate_limit_decisions_total.labels(result="limited").inc()
+        body = json.dumps({"error": "Rate limit exceeded", "status_code": 429}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(result.retry_after)).encode()),
+                    (b"x-ratelimit-limit", str(capacity).encode()),
+                    (b"x-ratelimit-remaining", b"0"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
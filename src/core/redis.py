@@ -0,0 +1,31 @@
+from functools import lru_cache
+
+import redis.asyncio as redis
+
+from src.core.config import settings
+
+
+def redis_is_configured() -> bool:
+    """Return False when REDIS_URL points at the test stand-in (``redis://fake-*``).
+
+    Mirrors the check in ``src.core.celery_app`` so that every Redis-backed
+    component falls back to its in-memory implementation under tests.
+    """
+    return not settings.REDIS_URL.startswith("redis://fake-")
+
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    """Process-wide Redis client sharing one connection pool."""
+    return redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_TIMEOUT,
+        decode_responses=True,
+    )
+
+
+async def close_redis() -> None:
+    if get_redis.cache_info().currsize:
+        await get_redis().aclose()
+        get_redis.cache_clear()
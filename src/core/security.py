@@ -1,16 +1,31 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from functools import lru_cache
+from typing import Any, TypeVar
+from uuid import uuid4
 
-from jwt import PyJWTError, decode, encode
+from jwt import PyJWTError
 from passlib.context import CryptContext  # type: ignore
 
 from src.core.config import settings
+from src.core.exceptions import ServiceOverloadedError
+from src.core.keyring import get_keyring
+from src.core.metrics import password_hash_queue_depth, password_hash_rejected_total
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost are flagged by needs_update/verify_and_update
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
+
+T = TypeVar("T")
 
 
 def create_access_token(
-    subject: str | Any, expires_delta: timedelta | None = None
+    subject: str | Any,
+    expires_delta: timedelta | None = None,
+    claims: dict[str, Any] | None = None,
 ) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -19,23 +34,112 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    to_encode = {
+        "type": "access",
+        **(claims or {}),
+        "exp": expire,
+        "sub": str(subject),
+    }
+    return get_keyring().sign(to_encode)
 
 
-def verify_token(token: str) -> str | None:
+def create_refresh_token(subject: str | Any, family: str | None = None) -> str:
+    """Single-use refresh token with a fresh ``jti``.
+
+    ``family`` ties every token rotated from the same login together, so a
+    replayed token can revoke the whole chain.
+    """
+    return create_access_token(
+        subject,
+        expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        claims={"type": "refresh", "jti": uuid4().hex, "fam": family or uuid4().hex},
+    )
+
+
+def decode_token(token: str) -> dict[str, Any] | None:
     try:
-        payload = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        token_data = payload.get("sub")
-        return token_data
+        return get_keyring().verify(token)
     except PyJWTError:
         return None
 
 
+def verify_token(token: str) -> str | None:
+    payload = decode_token(token)
+    return payload.get("sub") if payload is not None else None
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop in a small dedicated thread pool.
+
+    A bcrypt round takes hundreds of milliseconds of CPU; on the loop it stalls
+    every request on the worker. bcrypt releases the GIL, so a few threads run
+    it in parallel. Jobs beyond ``max_pending`` are refused with
+    ``ServiceOverloadedError`` instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self.max_pending:
+            password_hash_rejected_total.inc()
+            raise ServiceOverloadedError()
+
+        self._pending += 1
+        password_hash_queue_depth.set(self._pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            password_hash_queue_depth.set(self._pending)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """Verify the password; also return a new hash if the stored one is outdated."""
+        return await self._run(
+            pwd_context.verify_and_update, plain_password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    )
+
+
+async def hash_password(password: str) -> str:
+    return await get_password_hasher().hash(password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await get_password_hasher().verify_and_update(
+        plain_password, hashed_password
+    )
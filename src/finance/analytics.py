@@ -0,0 +1,181 @@
+"""Vectorized mean-variance analytics over historical return series.
+
+``returns`` is always a ``T x M`` matrix of periodic simple returns (one column
+per asset, oldest row first) and ``weights`` either one portfolio ``(M,)`` or a
+stack of them ``(N, M)``; every metric is computed for all portfolios at once.
+
+Covariance estimates are kept in factored form (the de-meaned returns plus the
+shrinkage terms) rather than as an ``M x M`` matrix: ``wᵀΣw`` is evaluated as
+``‖Xw‖²`` in ``O(TM)`` per portfolio, so thousands of assets stay cheap. Call
+``CovarianceEstimate.matrix`` when the full matrix is actually needed.
+
+Requires NumPy (the ``finance`` extra).
+"""
+
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+CovarianceMethod = Literal["sample", "ledoit_wolf"]
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+@dataclass(frozen=True)
+class CovarianceEstimate:
+    """``Σ = (1 - shrinkage)·XᵀX·scale + shrinkage·target·I``."""
+
+    centered: np.ndarray  # T x M returns minus their column means
+    scale: float
+    shrinkage: float = 0.0
+    target: float = 0.0
+
+    @property
+    def assets(self) -> int:
+        return self.centered.shape[1]
+
+    def matrix(self) -> np.ndarray:
+        sample = (self.centered.T @ self.centered) * self.scale
+        if self.shrinkage:
+            sample *= 1 - self.shrinkage
+            sample[np.diag_indices_from(sample)] += self.shrinkage * self.target
+        return sample
+
+    def quadratic_form(self, weights: np.ndarray) -> np.ndarray:
+        """``wᵀΣw`` for each row of ``weights`` (``N x M``)."""
+        projected = self.centered @ weights.T  # T x N
+        sample = np.einsum("tn,tn->n", projected, projected) * self.scale
+        if not self.shrinkage:
+            return sample
+        squared_norms = np.einsum("nm,nm->n", weights, weights)
+        return (1 - self.shrinkage) * sample + (
+            self.shrinkage * self.target * squared_norms
+        )
+
+
+def estimate_covariance(
+    returns: np.ndarray, method: CovarianceMethod = "ledoit_wolf"
+) -> CovarianceEstimate:
+    """Covariance of the columns of ``returns``.
+
+    ``"sample"`` is the unbiased sample covariance. ``"ledoit_wolf"`` shrinks
+    the (biased) sample covariance towards a scaled identity with the optimal
+    intensity of Ledoit & Wolf (2004), which keeps the estimate well conditioned
+    when there are nearly as many assets as observations, or more.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    observations, assets = returns.shape
+    if observations < 2:
+        raise ValueError("At least two return observations are required")
+    centered = returns - returns.mean(axis=0)
+
+    if method == "sample":
+        return CovarianceEstimate(centered, 1.0 / (observations - 1))
+    if method != "ledoit_wolf":
+        raise ValueError(f"Unknown covariance method: {method}")
+
+    # ‖S‖²_F from whichever Gram matrix is smaller (T x T when M > T)
+    gram = centered @ centered.T if observations < assets else centered.T @ centered
+    sample_norm = np.einsum("ij,ij->", gram, gram) / observations**2
+    row_norms = np.einsum("tm,tm->t", centered, centered)
+    target = row_norms.sum() / observations / assets  # tr(S) / M
+
+    dispersion = sample_norm - assets * target**2  # ‖S - target·I‖²
+    # Mean squared distance of the single-observation estimates from S
+    noise = (np.mean(row_norms**2) - sample_norm) / observations
+    shrinkage = float(np.clip(noise / dispersion, 0.0, 1.0)) if dispersion > 0 else 0.0
+    return CovarianceEstimate(centered, 1.0 / observations, shrinkage, float(target))
+
+
+@dataclass(frozen=True)
+class PortfolioMetrics:
+    """Annualized metrics, one value per portfolio.
+
+    ``beta`` and ``tracking_error`` are None without a benchmark.
+    """
+
+    expected_return: np.ndarray
+    variance: np.ndarray
+    volatility: np.ndarray
+    sharpe_ratio: np.ndarray
+    beta: np.ndarray | None = None
+    tracking_error: np.ndarray | None = None
+
+
+def portfolio_metrics(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    benchmark: np.ndarray | None = None,
+    risk_free_rate: float = 0.0,
+    periods_per_year: int = TRADING_DAYS_PER_YEAR,
+    covariance: CovarianceEstimate | None = None,
+) -> PortfolioMetrics:
+    """Expected return, ``wᵀΣw`` variance, Sharpe, beta and tracking error.
+
+    ``risk_free_rate`` is annual. Pass ``covariance`` to reuse an estimate
+    across calls; by default a Ledoit-Wolf estimate of ``returns`` is used.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    if weights.shape[1] != returns.shape[1]:
+        raise ValueError("weights and returns must cover the same assets")
+    covariance = covariance or estimate_covariance(returns)
+
+    expected_return = weights @ returns.mean(axis=0) * periods_per_year
+    variance = np.maximum(covariance.quadratic_form(weights), 0.0) * periods_per_year
+    volatility = np.sqrt(variance)
+    excess = expected_return - risk_free_rate
+    sharpe_ratio = np.divide(
+        excess, volatility, out=np.zeros_like(excess), where=volatility > 0
+    )
+
+    beta = tracking_error = None
+    if benchmark is not None:
+        benchmark = np.asarray(benchmark, dtype=np.float64)
+        if benchmark.shape != (returns.shape[0],):
+            raise ValueError("benchmark must have one return per observation")
+        portfolio_returns = returns @ weights.T  # T x N
+        benchmark_centered = benchmark - benchmark.mean()
+        benchmark_variance = benchmark_centered @ benchmark_centered
+        beta = (
+            benchmark_centered @ portfolio_returns / benchmark_variance
+            if benchmark_variance > 0
+            else np.zeros(len(weights))
+        )
+        active = portfolio_returns - benchmark[:, None]
+        tracking_error = active.std(axis=0, ddof=1) * np.sqrt(periods_per_year)
+
+    return PortfolioMetrics(
+        expected_return=expected_return,
+        variance=variance,
+        volatility=volatility,
+        sharpe_ratio=sharpe_ratio,
+        beta=beta,
+        tracking_error=tracking_error,
+    )
+
+
+def evaluate_portfolios(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    benchmark: np.ndarray | None = None,
+    covariance_method: CovarianceMethod = "ledoit_wolf",
+    risk_free_rate: float = 0.0,
+    periods_per_year: int = TRADING_DAYS_PER_YEAR,
+) -> tuple[PortfolioMetrics, float]:
+    """``portfolio_metrics`` with a fresh covariance estimate, and its shrinkage.
+
+    Takes and returns only arrays and scalars, so it can run in the compute
+    pool (see ``src/finance/compute.py``).
+    """
+    covariance = estimate_covariance(returns, covariance_method)
+    metrics = portfolio_metrics(
+        returns,
+        weights,
+        benchmark=benchmark,
+        risk_free_rate=risk_free_rate,
+        periods_per_year=periods_per_year,
+        covariance=covariance,
+    )
+    return metrics, covariance.shrinkage
@@ -1,14 +1,24 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Any, TypeVar
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import settings
 from src.core.metrics import finance_tool_usage_total
+from src.finance.compute import get_compute_pool
 from src.subscriptions.services import SubscriptionService
 
+T = TypeVar("T")
+
 
 class FinanceToolBase(ABC):
     feature_name: str = "finance_tool"  # Default, override in subclasses
+    # CPU-bound tools run ``compute`` calls in the process pool, off the loop
+    cpu_bound: bool = False
+    # Limit for each ``compute`` call (default FINANCE_COMPUTE_TIMEOUT_SECONDS)
+    timeout_seconds: float | None = None
 
     def __init__(
         self,
@@ -23,25 +33,45 @@ class FinanceToolBase(ABC):
     async def run(self, *args, **kwargs):
         if self.user_id is None:
             raise ValueError("user_id must be set before running")
-        # Check usage limit
-        if not await self.subscription_service.check_usage_limit(
-            self.user_id, self.feature_name
-        ):
-            raise Exception("Usage limit exceeded")
 
-        # Execute tool
-        result = await self._execute(*args, **kwargs)
-
-        # Log usage
-        await self.subscription_service.log_usage(self.user_id, self.feature_name)
+        # Reserve quota, execute tool, then commit usage (released on failure)
+        quantity = self.usage_quantity(*args, **kwargs)
+        async with self.subscription_service.metered(
+            self.user_id, self.feature_name, quantity
+        ):
+            result = await self._execute(*args, **kwargs)
 
         # Increment metrics
         finance_tool_usage_total.labels(
             tool_name=self.feature_name, user_id=str(self.user_id)
-        ).inc()
+        ).inc(quantity)
 
         return result
 
+    async def compute(self, func: Callable[..., T], *args: Any) -> T:
+        """Call ``func(*args)``, in the compute pool if the tool is CPU-bound.
+
+        ``func`` must be a module-level function; large NumPy arguments are
+        passed through shared memory.
+        """
+        if not self.cpu_bound:
+            return func(*args)
+        return await get_compute_pool().run(
+            func,
+            *args,
+            tool_name=self.feature_name,
+            timeout=self.timeout_seconds or settings.FINANCE_COMPUTE_TIMEOUT_SECONDS,
+        )
+
+    @property
+    def parallelism(self) -> int:
+        """How many ``compute`` calls can run at once, to split work across cores."""
+        return max(get_compute_pool().max_workers, 1) if self.cpu_bound else 1
+
+    def usage_quantity(self, *args, **kwargs) -> int:
+        """Units of quota a call consumes; batch tools charge one per item."""
+        return 1
+
     @abstractmethod
     async def _execute(self, *args, **kwargs):
         pass
@@ -0,0 +1,215 @@
+"""Process pool for CPU-bound finance tools.
+
+Numeric work holds the GIL, so on the event loop (or in a thread) one large
+portfolio stalls every request on the worker. ``ComputePool`` runs such work
+in a small set of worker processes instead.
+
+NumPy arrays of ``SHARED_MEMORY_MIN_BYTES`` or more are not pickled: each is
+copied once into a POSIX shared memory segment and the worker maps it as a
+read-only array. The segments are unlinked when the job finishes. Functions
+must be importable module-level callables and must not return views of their
+array arguments.
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import time
+from typing import Any, TypeVar
+
+from src.core.config import settings
+from src.core.exceptions import ComputeTimeoutError, ServiceOverloadedError
+from src.core.metrics import (
+    finance_compute_pool_pending,
+    finance_compute_pool_queue_wait_seconds,
+    finance_compute_pool_rejected_total,
+    finance_compute_pool_run_seconds,
+    finance_compute_pool_timeouts_total,
+    finance_compute_pool_workers,
+)
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Smaller arrays are cheaper to pickle than to place in a segment
+SHARED_MEMORY_MIN_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Reference to an array in a shared memory segment, passed in its place."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def _share(array: "np.ndarray") -> tuple[SharedMemory, SharedArray]:
+    segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+    return segment, SharedArray(segment.name, array.shape, array.dtype.str)
+
+
+def _load(arg: Any, segments: list[SharedMemory]) -> Any:
+    if not isinstance(arg, SharedArray):
+        return arg
+    # Workers share the parent's resource tracker, which already tracks the
+    # segment, so attaching does not take ownership of it
+    segment = SharedMemory(name=arg.name)
+    segments.append(segment)
+    view = np.ndarray(arg.shape, dtype=np.dtype(arg.dtype), buffer=segment.buf)
+    view.flags.writeable = False
+    return view
+
+
+def _invoke(  # noqa: UP047
+    func: Callable[..., T], args: tuple[Any, ...]
+) -> tuple[float, float, T]:
+    """Worker side: map shared arrays, call ``func``, return its timings and result."""
+    started = time.time()
+    segments: list[SharedMemory] = []
+    resolved = [_load(arg, segments) for arg in args]
+    try:
+        result = func(*resolved)
+    finally:
+        del resolved
+        for segment in segments:
+            # Still mapped if the result references the input; freed with it
+            with contextlib.suppress(BufferError):
+                segment.close()
+    return started, time.time(), result
+
+
+class ComputePool:
+    """Runs CPU-bound functions in worker processes with bounded admission.
+
+    At most ``max_pending`` jobs may be queued or running; further jobs are
+    refused with ``ServiceOverloadedError``. A job that exceeds its timeout
+    raises ``ComputeTimeoutError`` to the caller, but a worker cannot be
+    interrupted mid-call: the job keeps its slot until it finishes, so
+    persistent overruns show up as saturation rather than unbounded queueing.
+
+    With ``max_workers=0`` functions run inline on the caller's thread.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        finance_compute_pool_workers.set(max_workers)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process with a running event loop and threads
+            # is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _release(self, segments: list[SharedMemory]) -> None:
+        self._pending -= 1
+        finance_compute_pool_pending.set(self._pending)
+        for segment in segments:
+            segment.close()
+            with contextlib.suppress(FileNotFoundError):
+                segment.unlink()
+
+    async def run(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        tool_name: str,
+        timeout: float | None = None,
+    ) -> T:
+        if self.max_workers == 0:
+            return func(*args)
+        if self._pending >= self.max_pending:
+            finance_compute_pool_rejected_total.labels(tool_name=tool_name).inc()
+            raise ServiceOverloadedError()
+
+        segments: list[SharedMemory] = []
+        self._pending += 1
+        finance_compute_pool_pending.set(self._pending)
+        try:
+            call_args = []
+            for arg in args:
+                if (
+                    HAS_NUMPY
+                    and isinstance(arg, np.ndarray)
+                    and arg.nbytes >= SHARED_MEMORY_MIN_BYTES
+                ):
+                    segment, arg = _share(arg)
+                    segments.append(segment)
+                call_args.append(arg)
+            submitted = time.time()
+            future: Future = self._get_executor().submit(
+                _invoke, func, tuple(call_args)
+            )
+        except BaseException:
+            self._release(segments)
+            raise
+        # The slot and segments are held until the worker is done, even if the
+        # caller stops waiting
+        loop = asyncio.get_running_loop()
+
+        def on_done(_: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(self._release, segments)
+            except RuntimeError:  # The loop is gone; nothing else uses the pool
+                self._release(segments)
+
+        future.add_done_callback(on_done)
+
+        try:
+            started, finished, result = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout
+            )
+        except TimeoutError as e:
+            finance_compute_pool_timeouts_total.labels(tool_name=tool_name).inc()
+            logger.warning(f"{tool_name} computation timed out after {timeout}s")
+            raise ComputeTimeoutError() from e
+        except BrokenProcessPool as e:
+            logger.error(f"Finance compute worker died running {tool_name}: {e}")
+            self.shutdown()
+            raise ServiceOverloadedError("Compute worker failed, please retry") from e
+
+        finance_compute_pool_queue_wait_seconds.observe(max(started - submitted, 0.0))
+        finance_compute_pool_run_seconds.labels(tool_name=tool_name).observe(
+            finished - started
+        )
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+@lru_cache
+def get_compute_pool() -> ComputePool:
+    return ComputePool(
+        max_workers=settings.FINANCE_COMPUTE_WORKERS,
+        max_pending=settings.FINANCE_COMPUTE_MAX_PENDING,
+    )
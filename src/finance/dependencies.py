@@ -2,7 +2,11 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_session
-from src.finance.tools.portfolio_analyzer import PortfolioAnalyzer
+from src.finance.tools.portfolio_analyzer import (
+    BatchPortfolioAnalyzer,
+    PortfolioAnalyzer,
+)
+from src.finance.tools.risk_analyzer import RiskAnalyzer
 from src.subscriptions.dependencies import get_subscription_service
 from src.subscriptions.services import SubscriptionService
 
@@ -14,3 +18,17 @@ async def get_portfolio_analyzer(
     return PortfolioAnalyzer(
         session, None, subscription_service
     )  # user_id will be set in router
+
+
+async def get_batch_portfolio_analyzer(
+    session: AsyncSession = Depends(get_session),
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
+) -> BatchPortfolioAnalyzer:
+    return BatchPortfolioAnalyzer(session, None, subscription_service)
+
+
+async def get_risk_analyzer(
+    session: AsyncSession = Depends(get_session),
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
+) -> RiskAnalyzer:
+    return RiskAnalyzer(session, None, subscription_service)
@@ -0,0 +1,96 @@
+"""Bulk-load daily prices into the local price store.
+
+Input files are in long format with ``symbol``, ``date`` (ISO) and ``close``
+columns, as CSV or Parquet (Parquet needs pandas and pyarrow)::
+
+    python -m src.finance.ingest_prices prices-2024.csv more.parquet
+
+Rows are appended per symbol after its last stored date, so files can be
+re-ingested or overlap. The store is ``PRICE_STORE_DIR`` unless ``--root`` is
+given. Run one ingestion at a time.
+"""
+
+import argparse
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+import csv
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+
+from src.core.config import settings
+from src.finance.prices import PriceStore, PriceStoreError
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = {"symbol", "date", "close"}
+
+
+def _csv_rows(path: Path) -> Iterator[tuple[str, str, str]]:
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = REQUIRED_COLUMNS - set(reader.fieldnames or ())
+        if missing:
+            raise PriceStoreError(f"{path}: missing columns {sorted(missing)}")
+        for row in reader:
+            yield row["symbol"], row["date"], row["close"]
+
+
+def _parquet_rows(path: Path) -> Iterator[tuple[str, str, str]]:
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise PriceStoreError("Parquet input needs pandas and pyarrow") from e
+    frame = pd.read_parquet(path, columns=sorted(REQUIRED_COLUMNS))
+    frame["date"] = pd.to_datetime(frame["date"]).dt.strftime("%Y-%m-%d")
+    yield from frame[["symbol", "date", "close"]].itertuples(index=False, name=None)
+
+
+def read_rows(path: Path) -> Iterator[tuple[str, str, str]]:
+    if path.suffix.lower() in {".parquet", ".pq"}:
+        return _parquet_rows(path)
+    return _csv_rows(path)
+
+
+def ingest(store: PriceStore, rows: Iterable[tuple[str, str, str]]) -> dict[str, int]:
+    """Group rows by symbol and append them; returns rows added per symbol."""
+    grouped: dict[str, tuple[list[str], list[str]]] = defaultdict(lambda: ([], []))
+    for symbol, day, close in rows:
+        dates, closes = grouped[symbol.strip().upper()]
+        dates.append(day)
+        closes.append(close)
+
+    return {
+        symbol: store.append(
+            symbol,
+            np.array(dates, dtype="datetime64[D]"),
+            np.array(closes, dtype=np.float64),
+        )
+        for symbol, (dates, closes) in sorted(grouped.items())
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--root", type=Path, default=Path(settings.PRICE_STORE_DIR))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    store = PriceStore(args.root)
+    for path in args.files:
+        try:
+            added = ingest(store, read_rows(path))
+        except (PriceStoreError, ValueError) as e:
+            logger.error(f"Failed to ingest {path}: {e}")
+            return 1
+        logger.info(
+            f"{path}: {sum(added.values())} rows added for {len(added)} symbols"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
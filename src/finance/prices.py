@@ -0,0 +1,233 @@
+"""Local historical price store with memory-mapped reads.
+
+Each symbol is a partition directory holding one raw file per column
+(``date.bin`` as ``datetime64[D]``, ``close.bin`` as ``float64``), sorted by
+date and only ever appended to. ``index.json`` maps each symbol to its row
+count and date range. Reads memory-map the column files, so a date range is a
+zero-copy slice found by binary search, and the OS page cache is shared by all
+workers on a host.
+
+Appends write the columns first and then atomically replace the index, so
+readers never see a partially written tail: rows past the indexed count are
+ignored, and truncated away by the next append.
+
+Requires NumPy (the ``finance`` extra).
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import threading
+
+import numpy as np
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = {"date": np.dtype("datetime64[D]"), "close": np.dtype(np.float64)}
+INDEX_FILE = "index.json"
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9][A-Z0-9.\-^=]{0,31}$")
+
+
+class PriceStoreError(ValueError):
+    """Raised for invalid symbols or data that would break the store's ordering."""
+
+
+@dataclass(frozen=True)
+class PriceSeries:
+    symbol: str
+    dates: np.ndarray  # datetime64[D], ascending
+    close: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+@dataclass(frozen=True)
+class SymbolIndex:
+    rows: int
+    start: date
+    end: date
+
+
+def _validate_symbol(symbol: str) -> str:
+    symbol = symbol.strip().upper()
+    if not SYMBOL_PATTERN.match(symbol):
+        raise PriceStoreError(f"Invalid symbol: {symbol!r}")
+    return symbol
+
+
+class PriceStore:
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._index: dict[str, SymbolIndex] = {}
+        self._index_mtime: float | None = None
+        # symbol -> (rows mapped, column -> memmap)
+        self._maps: dict[str, tuple[int, dict[str, np.ndarray]]] = {}
+
+    def _partition(self, symbol: str) -> Path:
+        return self.root / symbol
+
+    def index(self) -> dict[str, SymbolIndex]:
+        """The symbol index, reloaded when another process has rewritten it."""
+        path = self.root / INDEX_FILE
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if mtime != self._index_mtime:
+                raw = json.loads(path.read_text())
+                self._index = {
+                    symbol: SymbolIndex(
+                        rows=entry["rows"],
+                        start=date.fromisoformat(entry["start"]),
+                        end=date.fromisoformat(entry["end"]),
+                    )
+                    for symbol, entry in raw.items()
+                }
+                self._index_mtime = mtime
+            return self._index
+
+    def symbols(self) -> list[str]:
+        return sorted(self.index())
+
+    def _columns(self, symbol: str, rows: int) -> dict[str, np.ndarray]:
+        with self._lock:
+            cached = self._maps.get(symbol)
+            if cached is not None and cached[0] == rows:
+                return cached[1]
+            columns = {
+                name: np.memmap(
+                    self._partition(symbol) / f"{name}.bin",
+                    dtype=dtype,
+                    mode="r",
+                    shape=(rows,),
+                )
+                for name, dtype in COLUMNS.items()
+            }
+            self._maps[symbol] = (rows, columns)
+            return columns
+
+    def series(
+        self, symbol: str, start: date | None = None, end: date | None = None
+    ) -> PriceSeries | None:
+        """Prices for ``symbol`` between ``start`` and ``end`` inclusive, or None.
+
+        The arrays are read-only views of the memory-mapped files.
+        """
+        symbol = _validate_symbol(symbol)
+        entry = self.index().get(symbol)
+        if entry is None:
+            return None
+        columns = self._columns(symbol, entry.rows)
+        dates = columns["date"]
+        first = 0 if start is None else np.searchsorted(dates, np.datetime64(start))
+        last = (
+            entry.rows
+            if end is None
+            else np.searchsorted(dates, np.datetime64(end), side="right")
+        )
+        return PriceSeries(symbol, dates[first:last], columns["close"][first:last])
+
+    def aligned_closes(
+        self, symbols: list[str], start: date | None = None, end: date | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Dates every symbol has a price on, and the ``T x M`` closes on them.
+
+        Raises ``KeyError`` naming the symbols that are not in the store.
+        """
+        series = [self.series(symbol, start, end) for symbol in symbols]
+        missing = [s for s, found in zip(symbols, series, strict=True) if not found]
+        if missing:
+            raise KeyError(", ".join(missing))
+
+        dates = series[0].dates
+        for other in series[1:]:
+            dates = np.intersect1d(dates, other.dates, assume_unique=True)
+        closes = np.empty((len(dates), len(series)))
+        for column, s in enumerate(series):
+            closes[:, column] = s.close[np.searchsorted(s.dates, dates)]
+        return np.asarray(dates), closes
+
+    def aligned_returns(
+        self, symbols: list[str], start: date | None = None, end: date | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Simple returns between consecutive common dates, as for ``aligned_closes``."""
+        dates, closes = self.aligned_closes(symbols, start, end)
+        return dates[1:], closes[1:] / closes[:-1] - 1
+
+    def append(self, symbol: str, dates: np.ndarray, close: np.ndarray) -> int:
+        """Append prices after the symbol's last stored date; returns rows added.
+
+        Rows on or before the last stored date are skipped, so re-ingesting an
+        overlapping file is harmless. Single writer: run one ingestion at a time.
+        """
+        symbol = _validate_symbol(symbol)
+        dates = np.asarray(dates, dtype=COLUMNS["date"])
+        close = np.asarray(close, dtype=COLUMNS["close"])
+        if dates.shape != close.shape or dates.ndim != 1:
+            raise PriceStoreError("dates and close must be 1-D and the same length")
+        if not np.all(np.isfinite(close)) or np.any(close <= 0):
+            raise PriceStoreError(f"{symbol}: prices must be positive numbers")
+
+        order = np.argsort(dates, kind="stable")
+        dates, close = dates[order], close[order]
+        if np.any(dates[1:] == dates[:-1]):
+            raise PriceStoreError(f"{symbol}: duplicate dates")
+
+        index = dict(self.index())
+        entry = index.get(symbol)
+        if entry is not None:
+            keep = dates > np.datetime64(entry.end)
+            dates, close = dates[keep], close[keep]
+        if not len(dates):
+            return 0
+
+        partition = self._partition(symbol)
+        partition.mkdir(parents=True, exist_ok=True)
+        rows = entry.rows if entry else 0
+        for name, values in (("date", dates), ("close", close)):
+            with open(partition / f"{name}.bin", "ab") as f:
+                # Drop any tail left by an append that never reached the index
+                f.truncate(rows * COLUMNS[name].itemsize)
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        index[symbol] = SymbolIndex(
+            rows=rows + len(dates),
+            start=entry.start if entry else dates[0].item(),
+            end=dates[-1].item(),
+        )
+        self._write_index(index)
+        return len(dates)
+
+    def _write_index(self, index: dict[str, SymbolIndex]) -> None:
+        path = self.root / INDEX_FILE
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    symbol: {
+                        "rows": entry.rows,
+                        "start": entry.start.isoformat(),
+                        "end": entry.end.isoformat(),
+                    }
+                    for symbol, entry in sorted(index.items())
+                }
+            )
+        )
+        os.replace(tmp, path)
+
+
+@lru_cache
+def get_price_store() -> PriceStore:
+    return PriceStore(Path(settings.PRICE_STORE_DIR))
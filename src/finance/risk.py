@@ -0,0 +1,220 @@
+"""Value-at-Risk and expected shortfall (CVaR) of a buy-and-hold portfolio.
+
+All figures are losses as a fraction of the starting portfolio value over a
+holding period of ``horizon`` trading days, estimated three ways from a
+``T x M`` matrix of daily simple returns:
+
+- historical: the portfolio's returns over every ``horizon``-day window of
+  the history.
+- parametric: the normal approximation of the portfolio return, scaled by
+  the square root of the horizon.
+- Monte Carlo: asset log returns drawn as correlated normals (through the
+  Cholesky factor of their covariance) and compounded per asset, so the
+  portfolio return is a weighted sum of lognormals rather than a normal.
+
+Simulations run in chunks of at most ``CHUNK_DRAWS`` normal draws at a time,
+each with its own seed derived from the request seed, so the result does not
+depend on how chunks are spread across workers. Only the largest losses, those
+the VaR and CVaR depend on, are kept between chunks and sent back from the
+workers, so memory stays bounded for millions of paths.
+
+Requires NumPy (the ``finance`` extra).
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+from .analytics import CovarianceMethod, estimate_covariance
+
+# Normal draws generated at once per chunk (32 MiB of float64)
+CHUNK_DRAWS = 1 << 22
+
+
+def tail_risk(
+    returns: np.ndarray, confidence_levels: list[float]
+) -> tuple[np.ndarray, np.ndarray]:
+    """VaR and CVaR of each column of ``returns`` (``P x H``), as losses.
+
+    Both are ``L x H``, one row per confidence level. CVaR is the mean loss at
+    or beyond the VaR.
+    """
+    losses = -np.asarray(returns, dtype=np.float64).reshape(len(returns), -1)
+    var = np.quantile(losses, confidence_levels, axis=0)
+    cvar = np.empty_like(var)
+    for column in range(losses.shape[1]):
+        for level, threshold in enumerate(var[:, column]):
+            cvar[level, column] = losses[losses[:, column] >= threshold, column].mean()
+    return var, cvar
+
+
+def tail_size(paths: int, confidence_levels: list[float]) -> int:
+    """How many of the largest losses determine VaR and CVaR at every level."""
+    return min(paths - int(np.floor((paths - 1) * min(confidence_levels))) + 1, paths)
+
+
+def largest_losses(losses: np.ndarray, count: int) -> np.ndarray:
+    """The ``count`` largest values of each column of ``losses``, ascending."""
+    if count < len(losses):
+        losses = np.partition(losses, len(losses) - count, axis=0)[-count:]
+    return np.sort(losses, axis=0)
+
+
+def tail_risk_from_largest(
+    losses: np.ndarray, paths: int, confidence_levels: list[float]
+) -> tuple[np.ndarray, np.ndarray]:
+    """``tail_risk`` of ``paths`` returns given only their largest losses (``K x H``).
+
+    ``losses`` may be in any order but must hold at least ``tail_size`` of the
+    largest losses per column. The VaR interpolates between order statistics
+    as ``np.quantile`` does.
+    """
+    tail = largest_losses(losses, tail_size(paths, confidence_levels))
+    offset = paths - len(tail)
+    var = np.empty((len(confidence_levels), tail.shape[1]))
+    cvar = np.empty_like(var)
+    for row, level in enumerate(confidence_levels):
+        position = (paths - 1) * level
+        lower = int(np.floor(position))
+        upper = min(lower + 1, paths - 1)
+        low, high = tail[lower - offset], tail[upper - offset]
+        var[row] = low + (position - lower) * (high - low)
+        for column, threshold in enumerate(var[row]):
+            cvar[row, column] = tail[tail[:, column] >= threshold, column].mean()
+    return var, cvar
+
+
+def historical_returns(
+    returns: np.ndarray, weights: np.ndarray, horizon: int
+) -> np.ndarray:
+    """Buy-and-hold portfolio returns over every ``horizon``-day window."""
+    log_growth = np.zeros((len(returns) + 1, returns.shape[1]))
+    np.cumsum(np.log1p(returns), axis=0, out=log_growth[1:])
+    return np.expm1(log_growth[horizon:] - log_growth[:-horizon]) @ weights
+
+
+def historical_tail_risk(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    horizons: list[int],
+    confidence_levels: list[float],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Historical VaR and CVaR (``L x H``) from overlapping windows.
+
+    NaN for horizons with fewer than two windows in the history.
+    """
+    var = np.full((len(confidence_levels), len(horizons)), np.nan)
+    cvar = var.copy()
+    for column, horizon in enumerate(horizons):
+        if len(returns) - horizon + 1 < 2:
+            continue
+        window_var, window_cvar = tail_risk(
+            historical_returns(returns, weights, horizon), confidence_levels
+        )
+        var[:, column] = window_var[:, 0]
+        cvar[:, column] = window_cvar[:, 0]
+    return var, cvar
+
+
+def parametric_tail_risk(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    horizons: list[int],
+    confidence_levels: list[float],
+    covariance_method: CovarianceMethod = "ledoit_wolf",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Normal VaR and CVaR (``L x H``) with mean and variance scaled by horizon."""
+    mean = returns.mean(axis=0) @ weights
+    variance = estimate_covariance(returns, covariance_method).quadratic_form(
+        weights[None, :]
+    )[0]
+    scale = np.sqrt(np.asarray(horizons) * max(variance, 0.0))
+    drift = np.asarray(horizons) * mean
+
+    normal = NormalDist()
+    tails = np.array([1 - level for level in confidence_levels])[:, None]
+    z = np.array([normal.inv_cdf(tail) for tail in tails.ravel()])[:, None]
+    density = np.array([normal.pdf(value) for value in z.ravel()])[:, None]
+    var = -(drift + z * scale)
+    cvar = -(drift - scale * density / tails)
+    return var, cvar
+
+
+def simulation_model(
+    returns: np.ndarray, covariance_method: CovarianceMethod = "ledoit_wolf"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Daily mean log returns and a factor ``F`` with ``F Fᵀ`` their covariance.
+
+    ``F`` is the Cholesky factor; a singular covariance (the sample estimate
+    with more assets than observations) falls back to its eigendecomposition.
+    """
+    log_returns = np.log1p(returns)
+    covariance = estimate_covariance(log_returns, covariance_method).matrix()
+    try:
+        factor = np.linalg.cholesky(covariance)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        factor = eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+    return log_returns.mean(axis=0), factor
+
+
+def chunk_sizes(paths: int, assets: int) -> list[int]:
+    """Split ``paths`` into chunks of at most ``CHUNK_DRAWS`` draws per horizon."""
+    size = max(CHUNK_DRAWS // assets, 1)
+    return [min(size, paths - start) for start in range(0, paths, size)]
+
+
+def simulate_returns(
+    mean: np.ndarray,
+    factor: np.ndarray,
+    weights: np.ndarray,
+    horizons: list[int],
+    seed: int,
+    first_chunk: int,
+    sizes: list[int],
+) -> np.ndarray:
+    """Simulated portfolio returns (``P x H``) for chunks ``first_chunk`` onwards.
+
+    Each path is one draw of cumulative log returns, extended from one horizon
+    to the next, so the horizons share paths. Chunk ``i`` always draws from
+    ``SeedSequence(seed, spawn_key=(i,))``.
+    """
+    out = np.empty((sum(sizes), len(horizons)))
+    start = 0
+    for offset, size in enumerate(sizes):
+        seed_sequence = np.random.SeedSequence(seed, spawn_key=(first_chunk + offset,))
+        rng = np.random.default_rng(seed_sequence)
+        log_growth = np.zeros((size, len(mean)))
+        elapsed = 0
+        for column, horizon in enumerate(horizons):
+            days = horizon - elapsed
+            draws = rng.standard_normal((size, len(mean)))
+            log_growth += days * mean + np.sqrt(days) * (draws @ factor.T)
+            out[start : start + size, column] = np.expm1(log_growth) @ weights
+            elapsed = horizon
+        start += size
+    return out
+
+
+def simulate_tail_losses(
+    mean: np.ndarray,
+    factor: np.ndarray,
+    weights: np.ndarray,
+    horizons: list[int],
+    seed: int,
+    first_chunk: int,
+    sizes: list[int],
+    count: int,
+) -> np.ndarray:
+    """The ``count`` largest losses (``count x H``) of ``simulate_returns``' paths.
+
+    Chunks are simulated one at a time and only the running tail is kept, so
+    memory does not grow with the number of chunks.
+    """
+    kept = np.empty((0, len(horizons)))
+    for offset, size in enumerate(sizes):
+        returns = simulate_returns(
+            mean, factor, weights, horizons, seed, first_chunk + offset, [size]
+        )
+        kept = largest_losses(np.concatenate([kept, -returns]), count)
+    return kept
@@ -1,24 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException
 
 from src.auth.dependencies import get_current_active_user
-from src.finance.dependencies import get_portfolio_analyzer
-from src.finance.schemas import PortfolioRequest, PortfolioResponse
-from src.finance.tools.portfolio_analyzer import PortfolioAnalyzer
+from src.finance.base import FinanceToolBase
+from src.finance.dependencies import (
+    get_batch_portfolio_analyzer,
+    get_portfolio_analyzer,
+    get_risk_analyzer,
+)
+from src.finance.schemas import (
+    BatchPortfolioRequest,
+    BatchPortfolioResponse,
+    PortfolioRequest,
+    PortfolioResponse,
+    RiskRequest,
+    RiskResponse,
+)
+from src.finance.tools.portfolio_analyzer import (
+    BatchPortfolioAnalyzer,
+    PortfolioAnalyzer,
+)
+from src.finance.tools.risk_analyzer import RiskAnalyzer
 from src.users.models import User
 
 router = APIRouter()
 
 
-@router.post("/portfolio/analyze", response_model=PortfolioResponse)
-async def analyze_portfolio(
-    request: PortfolioRequest,
-    current_user: User = Depends(get_current_active_user),
-    analyzer: PortfolioAnalyzer = Depends(get_portfolio_analyzer),
-):
+async def _run_analysis(analyzer: FinanceToolBase, user: User, request):
     # Set the user_id for the analyzer
-    if current_user.id is None:
+    if user.id is None:
         raise HTTPException(status_code=400, detail="User ID is required")
-    analyzer.user_id = current_user.id
+    analyzer.user_id = user.id
 
     try:
         # Run the analysis (this will check usage limit and log usage)
@@ -28,3 +39,36 @@ async def analyze_portfolio(
         if "Usage limit exceeded" in str(e):
             raise HTTPException(status_code=500, detail="Usage limit exceeded") from e
         raise
+
+
+@router.post("/portfolio/analyze", response_model=PortfolioResponse)
+async def analyze_portfolio(
+    request: PortfolioRequest,
+    current_user: User = Depends(get_current_active_user),
+    analyzer: PortfolioAnalyzer = Depends(get_portfolio_analyzer),
+):
+    return await _run_analysis(analyzer, current_user, request)
+
+
+@router.post("/portfolio/analyze/batch", response_model=BatchPortfolioResponse)
+async def analyze_portfolio_batch(
+    request: BatchPortfolioRequest,
+    current_user: User = Depends(get_current_active_user),
+    analyzer: BatchPortfolioAnalyzer = Depends(get_batch_portfolio_analyzer),
+):
+    """Analyze up to 1000 portfolios over a shared universe in one pass.
+
+    Each portfolio counts as one analysis against the quota; the batch is
+    admitted whole or rejected.
+    """
+    return await _run_analysis(analyzer, current_user, request)
+
+
+@router.post("/risk/var", response_model=RiskResponse)
+async def analyze_risk(
+    request: RiskRequest,
+    current_user: User = Depends(get_current_active_user),
+    analyzer: RiskAnalyzer = Depends(get_risk_analyzer),
+):
+    """Value-at-Risk and CVaR of a portfolio (metered as ``risk_var``)."""
+    return await _run_analysis(analyzer, current_user, request)
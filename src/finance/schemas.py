@@ -1,15 +1,161 @@
-from typing import Any
+from datetime import date
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
+# Weights may be off by rounding, not by a missing allocation
+WEIGHT_SUM_TOLERANCE = 1e-4
+MAX_BATCH_PORTFOLIOS = 1000
+MAX_SIMULATION_PATHS = 2_000_000
 
-class PortfolioRequest(BaseModel):
-    assets: list[
-        dict[str, Any]
-    ]  # e.g., [{"symbol": "AAPL", "weight": 0.5, "price": 150.0}, ...]
+
+class Asset(BaseModel):
+    symbol: str = Field(min_length=1)
+    weight: float
+    price: float | None = Field(default=None, gt=0)
+    # Periodic (e.g. daily) simple returns, oldest first; read from the price
+    # store when omitted
+    returns: list[float] | None = None
+
+
+class HistoryOptions(BaseModel):
+    """Where a request's return history comes from and how it is modeled."""
+
+    # With stored prices: the date range to use
+    start_date: date | None = None
+    end_date: date | None = None
+    covariance_method: Literal["sample", "ledoit_wolf"] = "ledoit_wolf"
+
+    def _check_history(self, series: list[list[float] | None]) -> int:
+        """Inline returns: for every asset or none, over the same periods.
+
+        Returns the number of inline observations (0 for stored prices).
+        """
+        lengths = {len(returns or []) for returns in series}
+        if lengths == {0}:
+            return 0
+        if len(lengths) > 1:
+            raise ValueError("Every asset needs returns over the same periods")
+        (length,) = lengths
+        if length < 2:
+            raise ValueError("At least two return observations are required")
+        return length
+
+
+class AnalysisOptions(HistoryOptions):
+    """Return history and annualization settings shared by analysis requests."""
+
+    # Benchmark returns over the same periods, for beta and tracking error
+    benchmark_returns: list[float] | None = None
+    # With stored prices: the benchmark's symbol
+    benchmark_symbol: str | None = Field(default=None, min_length=1)
+    # Annual rate, subtracted from the expected return for the Sharpe ratio
+    risk_free_rate: float = 0.0
+    periods_per_year: int = Field(default=252, gt=0)
+
+    def _check_history(self, series: list[list[float] | None]) -> int:
+        length = super()._check_history(series)
+        if not length:
+            if self.benchmark_returns is not None:
+                raise ValueError("benchmark_returns requires asset returns")
+            return length
+        if self.benchmark_symbol is not None:
+            raise ValueError("benchmark_symbol only applies to stored prices")
+        if self.benchmark_returns is not None and len(self.benchmark_returns) != length:
+            raise ValueError("benchmark_returns must cover the same periods")
+        return length
+
+
+class PortfolioRequest(AnalysisOptions):
+    # e.g. [{"symbol": "AAPL", "weight": 0.5, "returns": [0.01, -0.002, ...]}, ...]
+    assets: list[Asset] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def check_portfolio(self) -> "PortfolioRequest":
+        if abs(sum(asset.weight for asset in self.assets) - 1) > WEIGHT_SUM_TOLERANCE:
+            raise ValueError("Asset weights must sum to 1")
+        self._check_history([asset.returns for asset in self.assets])
+        return self
 
 
 class PortfolioResponse(BaseModel):
     analysis: dict[
         str, Any
     ]  # e.g., {"expected_return": 0.1, "volatility": 0.2, "sharpe_ratio": 1.5}
+
+
+class UniverseAsset(BaseModel):
+    symbol: str = Field(min_length=1)
+    # As for Asset.returns
+    returns: list[float] | None = None
+
+
+class BatchPortfolio(BaseModel):
+    name: str | None = None
+    # One weight per universe asset, in universe order
+    weights: list[float] = Field(min_length=1)
+
+
+class BatchPortfolioRequest(AnalysisOptions):
+    # Assets shared by every portfolio in the batch
+    universe: list[UniverseAsset] = Field(min_length=1)
+    portfolios: list[BatchPortfolio] = Field(
+        min_length=1, max_length=MAX_BATCH_PORTFOLIOS
+    )
+
+    @model_validator(mode="after")
+    def check_portfolios(self) -> "BatchPortfolioRequest":
+        symbols = [asset.symbol for asset in self.universe]
+        if len(set(symbols)) != len(symbols):
+            raise ValueError("Universe symbols must be unique")
+        for position, portfolio in enumerate(self.portfolios):
+            if len(portfolio.weights) != len(self.universe):
+                raise ValueError(
+                    f"Portfolio {position} needs one weight per universe asset"
+                )
+            if abs(sum(portfolio.weights) - 1) > WEIGHT_SUM_TOLERANCE:
+                raise ValueError(f"Portfolio {position} weights must sum to 1")
+        self._check_history([asset.returns for asset in self.universe])
+        return self
+
+
+class BatchPortfolioResponse(BaseModel):
+    # Shared figures (universe_size, observations, covariance_method, shrinkage),
+    # or a message when risk metrics are unavailable
+    analysis: dict[str, Any]
+    # One entry per portfolio, in request order
+    results: list[dict[str, Any]]
+
+
+class RiskRequest(HistoryOptions):
+    # As for PortfolioRequest; returns are daily
+    assets: list[Asset] = Field(min_length=1)
+    # Holding periods in trading days
+    horizons: list[Annotated[int, Field(ge=1, le=252)]] = Field(
+        default=[1, 10], min_length=1, max_length=5
+    )
+    confidence_levels: list[Annotated[float, Field(gt=0.5, lt=1)]] = Field(
+        default=[0.95, 0.99], min_length=1, max_length=5
+    )
+    methods: list[Literal["monte_carlo", "historical", "parametric"]] = Field(
+        default=["monte_carlo", "historical", "parametric"], min_length=1
+    )
+    paths: int = Field(default=100_000, ge=1000, le=MAX_SIMULATION_PATHS)
+    # Fixes the Monte Carlo draws; a random seed is used (and returned) if omitted
+    seed: int | None = Field(default=None, ge=0, lt=2**63)
+
+    @model_validator(mode="after")
+    def check_request(self) -> "RiskRequest":
+        if abs(sum(asset.weight for asset in self.assets) - 1) > WEIGHT_SUM_TOLERANCE:
+            raise ValueError("Asset weights must sum to 1")
+        self._check_history([asset.returns for asset in self.assets])
+        self.horizons = sorted(set(self.horizons))
+        self.confidence_levels = sorted(set(self.confidence_levels))
+        self.methods = list(dict.fromkeys(self.methods))
+        return self
+
+
+class RiskResponse(BaseModel):
+    # e.g. {"results": [{"method": "historical", "horizon_days": 10,
+    #                    "confidence_level": 0.99, "var": 0.081, "cvar": 0.097}]}
+    analysis: dict[str, Any]
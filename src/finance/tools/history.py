@@ -0,0 +1,105 @@
+from abc import abstractmethod
+from collections.abc import Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.subscriptions.services import SubscriptionService
+
+from ..base import FinanceToolBase
+from ..schemas import Asset, HistoryOptions, UniverseAsset
+
+try:
+    import numpy as np
+
+    from ..prices import PriceStore, PriceStoreError, get_price_store
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+NUMPY_REQUIRED = "NumPy is required for risk metrics"
+
+
+class MissingHistoryError(Exception):
+    """Risk metrics are unavailable; the message says why."""
+
+
+class HistoryToolBase(FinanceToolBase):
+    """Base for tools that work on asset return histories.
+
+    Returns come inline with the request or, when omitted, from the price
+    store. When there is no usable history, ``_execute`` raises
+    ``MissingHistoryError``: the reserved quota is released and the caller
+    gets ``_unavailable``'s response instead, so nothing is charged.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        user_id: UUID | None,
+        subscription_service: SubscriptionService,
+        price_store: "PriceStore | None" = None,
+    ):
+        super().__init__(session, user_id, subscription_service)
+        self.price_store = price_store
+
+    async def run(self, *args, **kwargs):
+        try:
+            return await super().run(*args, **kwargs)
+        except MissingHistoryError as e:
+            return self._unavailable(str(e), *args, **kwargs)
+
+    @abstractmethod
+    def _unavailable(self, message: str, *args, **kwargs):
+        """The response when risk metrics cannot be computed, explaining why."""
+
+    def _stored_returns(
+        self,
+        request: HistoryOptions,
+        symbols: list[str],
+        benchmark_symbol: str | None = None,
+    ):
+        """``(returns, benchmark)`` from the price store, on the dates all symbols share.
+
+        Raises ``KeyError`` naming the symbols with no stored prices.
+        """
+        store = self.price_store or get_price_store()
+        if benchmark_symbol is not None:
+            symbols = [*symbols, benchmark_symbol]
+        _, returns = store.aligned_returns(
+            symbols, request.start_date, request.end_date
+        )
+        if benchmark_symbol is None:
+            return returns, None
+        return returns[:, :-1], returns[:, -1]
+
+    def _history(
+        self,
+        request: HistoryOptions,
+        assets: Sequence[Asset | UniverseAsset],
+        benchmark_symbol: str | None = None,
+        benchmark_returns: list[float] | None = None,
+    ):
+        """``T x M`` returns (one column per asset) and the benchmark, if any.
+
+        Raises ``MissingHistoryError`` when risk metrics cannot be computed.
+        """
+        if not HAS_NUMPY:
+            raise MissingHistoryError(NUMPY_REQUIRED)
+        if assets[0].returns:
+            returns = np.array([asset.returns for asset in assets]).T
+            return returns, benchmark_returns
+
+        try:
+            returns, benchmark = self._stored_returns(
+                request, [asset.symbol for asset in assets], benchmark_symbol
+            )
+        except KeyError as e:
+            raise MissingHistoryError(f"No price history for: {e.args[0]}") from e
+        except PriceStoreError as e:
+            raise MissingHistoryError(str(e)) from e
+        if len(returns) < 2:
+            raise MissingHistoryError("Not enough price history in the date range")
+        return returns, benchmark
@@ -1,52 +1,132 @@
-from ..base import FinanceToolBase
-from ..schemas import PortfolioRequest, PortfolioResponse
+from typing import Any
+
+from ..schemas import (
+    AnalysisOptions,
+    BatchPortfolioRequest,
+    BatchPortfolioResponse,
+    PortfolioRequest,
+    PortfolioResponse,
+)
+from .history import NUMPY_REQUIRED, HistoryToolBase, MissingHistoryError
 
 try:
     import numpy as np
 
-    HAS_NUMPY_PANDAS = True
+    from ..analytics import evaluate_portfolios
+
+    HAS_NUMPY = True
 except ImportError:
-    HAS_NUMPY_PANDAS = False
+    HAS_NUMPY = False
 
 
-class PortfolioAnalyzer(FinanceToolBase):
+class PortfolioAnalyzer(HistoryToolBase):
     feature_name = "portfolio"
+    cpu_bound = True
 
-    async def _execute(self, request: PortfolioRequest) -> PortfolioResponse:
-        if HAS_NUMPY_PANDAS:
-            # Calculate portfolio analysis based on actual asset data
-            weights = np.array([asset.get("weight", 0) for asset in request.assets])
-            prices = np.array([asset.get("price", 0) for asset in request.assets])
-
-            # Calculate returns based on price changes (simplified model)
-            # Use asset prices to create deterministic but different returns
-            base_returns = np.array(
-                [price / 1000.0 for price in prices]
-            )  # Normalize prices
-            # Add some variation based on weights
-            returns = base_returns * (1 + weights * 0.1)  # Weight affects return
-
-            expected_return = np.dot(weights, returns)
-            volatility = np.std(returns)
-            analysis = {
-                "expected_return": float(expected_return),
-                "volatility": float(volatility),
-                "sharpe_ratio": float(expected_return / volatility)
-                if volatility > 0
-                else 0,
-                "assets_count": len(request.assets),
-            }
-        else:
-            # Fallback without numpy/pandas - use deterministic calculation
-            total_weighted_value = sum(
-                asset.get("weight", 0) * asset.get("price", 0)
-                for asset in request.assets
-            )
-            analysis = {
-                "expected_return": total_weighted_value * 0.01,  # 1% of total value
-                "volatility": total_weighted_value * 0.005,  # 0.5% of total value
-                "sharpe_ratio": 2.0,  # Fixed ratio
-                "assets_count": len(request.assets),
-            }
+    async def _analyze(self, request: AnalysisOptions, returns, benchmark, weights):
+        """Shared figures and per-portfolio metrics for ``N x M`` ``weights``."""
+        metrics, shrinkage = await self.compute(
+            evaluate_portfolios,
+            returns,
+            weights,
+            None if benchmark is None else np.asarray(benchmark, dtype=np.float64),
+            request.covariance_method,
+            request.risk_free_rate,
+            request.periods_per_year,
+        )
+        shared = {
+            "observations": returns.shape[0],
+            "covariance_method": request.covariance_method,
+            "shrinkage": shrinkage,
+        }
+        columns = {
+            "expected_return": metrics.expected_return,
+            "volatility": metrics.volatility,
+            "variance": metrics.variance,
+            "sharpe_ratio": metrics.sharpe_ratio,
+        }
+        if metrics.beta is not None and metrics.tracking_error is not None:
+            columns["beta"] = metrics.beta
+            columns["tracking_error"] = metrics.tracking_error
+        # One tolist() per column rather than a float() per cell
+        values = {name: column.tolist() for name, column in columns.items()}
+        rows = [{name: values[name][i] for name in values} for i in range(len(weights))]
+        return shared, rows
 
+    def _unavailable(
+        self, message: str, request: PortfolioRequest
+    ) -> PortfolioResponse:
+        analysis = {
+            "assets_count": len(request.assets),
+            "weights": {asset.symbol: asset.weight for asset in request.assets},
+            "message": message,
+        }
+        return PortfolioResponse(analysis=analysis)
+
+    async def _execute(self, request: PortfolioRequest) -> PortfolioResponse:
+        if not HAS_NUMPY:
+            raise MissingHistoryError(NUMPY_REQUIRED)
+        returns, benchmark = self._history(
+            request,
+            request.assets,
+            request.benchmark_symbol,
+            request.benchmark_returns,
+        )
+        analysis = {
+            "assets_count": len(request.assets),
+            "weights": {asset.symbol: asset.weight for asset in request.assets},
+        }
+        weights = np.array([[asset.weight for asset in request.assets]])
+        shared, (metrics,) = await self._analyze(request, returns, benchmark, weights)
+        analysis.update(metrics)
+        analysis.update(shared)
         return PortfolioResponse(analysis=analysis)
+
+
+class BatchPortfolioAnalyzer(PortfolioAnalyzer):
+    """Analyzes many portfolios over one asset universe in a single pass.
+
+    The covariance is estimated once and the ``N x M`` weight matrix is
+    evaluated in batched matrix products. Each portfolio counts as one
+    analysis against the quota, reserved and logged in one write.
+    """
+
+    def usage_quantity(self, request: BatchPortfolioRequest) -> int:
+        return len(request.portfolios)
+
+    def _unavailable(
+        self, message: str, request: BatchPortfolioRequest
+    ) -> BatchPortfolioResponse:
+        analysis = {
+            "universe_size": len(request.universe),
+            "portfolios_count": len(request.portfolios),
+            "message": message,
+        }
+        return BatchPortfolioResponse(
+            analysis=analysis,
+            results=[{"name": portfolio.name} for portfolio in request.portfolios],
+        )
+
+    async def _execute(self, request: BatchPortfolioRequest) -> BatchPortfolioResponse:
+        if not HAS_NUMPY:
+            raise MissingHistoryError(NUMPY_REQUIRED)
+        returns, benchmark = self._history(
+            request,
+            request.universe,
+            request.benchmark_symbol,
+            request.benchmark_returns,
+        )
+        analysis: dict[str, Any] = {
+            "universe_size": len(request.universe),
+            "portfolios_count": len(request.portfolios),
+        }
+        names = [portfolio.name for portfolio in request.portfolios]
+        weights = np.array([portfolio.weights for portfolio in request.portfolios])
+        shared, rows = await self._analyze(request, returns, benchmark, weights)
+        analysis.update(shared)
+        return BatchPortfolioResponse(
+            analysis=analysis,
+            results=[
+                {"name": name, **row} for name, row in zip(names, rows, strict=True)
+            ],
+        )
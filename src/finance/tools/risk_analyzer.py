@@ -0,0 +1,134 @@
+import asyncio
+import secrets
+
+from ..schemas import RiskRequest, RiskResponse
+from .history import NUMPY_REQUIRED, HistoryToolBase, MissingHistoryError
+
+try:
+    import numpy as np
+
+    from ..risk import (
+        chunk_sizes,
+        historical_tail_risk,
+        parametric_tail_risk,
+        simulate_tail_losses,
+        simulation_model,
+        tail_risk_from_largest,
+        tail_size,
+    )
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+def _finite(value: float) -> float | None:
+    return float(value) if np.isfinite(value) else None
+
+
+class RiskAnalyzer(HistoryToolBase):
+    """Value-at-Risk and CVaR by Monte Carlo, historical and parametric methods."""
+
+    feature_name = "risk_var"
+    cpu_bound = True
+    # A million-path simulation of a large portfolio takes a while
+    timeout_seconds = 120.0
+
+    async def _monte_carlo(
+        self, request: RiskRequest, returns, weights, seed: int
+    ) -> tuple["np.ndarray", "np.ndarray"]:
+        mean, factor = await self.compute(
+            simulation_model, returns, request.covariance_method
+        )
+        sizes = chunk_sizes(request.paths, len(mean))
+        # Contiguous runs of chunks per worker; chunk seeds do not depend on
+        # the split, so neither does the result
+        blocks = np.array_split(
+            np.arange(len(sizes)), min(self.parallelism, len(sizes))
+        )
+        # Each worker sends back only the losses the tail estimates need
+        count = tail_size(request.paths, request.confidence_levels)
+        tails = await asyncio.gather(
+            *(
+                self.compute(
+                    simulate_tail_losses,
+                    mean,
+                    factor,
+                    weights,
+                    request.horizons,
+                    seed,
+                    int(block[0]),
+                    [sizes[i] for i in block],
+                    count,
+                )
+                for block in blocks
+            )
+        )
+        return await self.compute(
+            tail_risk_from_largest,
+            np.concatenate(tails),
+            request.paths,
+            request.confidence_levels,
+        )
+
+    def _unavailable(self, message: str, request: RiskRequest) -> RiskResponse:
+        analysis = {
+            "assets_count": len(request.assets),
+            "weights": {asset.symbol: asset.weight for asset in request.assets},
+            "message": message,
+        }
+        return RiskResponse(analysis=analysis)
+
+    async def _execute(self, request: RiskRequest) -> RiskResponse:
+        if not HAS_NUMPY:
+            raise MissingHistoryError(NUMPY_REQUIRED)
+        returns, _ = self._history(request, request.assets)
+        analysis = {
+            "assets_count": len(request.assets),
+            "weights": {asset.symbol: asset.weight for asset in request.assets},
+        }
+
+        weights = np.array([asset.weight for asset in request.assets])
+        levels = request.confidence_levels
+        analysis.update(
+            {
+                "observations": returns.shape[0],
+                "covariance_method": request.covariance_method,
+            }
+        )
+        # method -> (VaR, CVaR), each levels x horizons
+        estimates = {}
+        if "monte_carlo" in request.methods:
+            seed = request.seed if request.seed is not None else secrets.randbits(63)
+            estimates["monte_carlo"] = await self._monte_carlo(
+                request, returns, weights, seed
+            )
+            analysis.update({"paths": request.paths, "seed": seed})
+        if "historical" in request.methods:
+            estimates["historical"] = await self.compute(
+                historical_tail_risk, returns, weights, request.horizons, levels
+            )
+        if "parametric" in request.methods:
+            estimates["parametric"] = await self.compute(
+                parametric_tail_risk,
+                returns,
+                weights,
+                request.horizons,
+                levels,
+                request.covariance_method,
+            )
+
+        # NaN (too little history for the horizon) becomes null
+        analysis["results"] = [
+            {
+                "method": method,
+                "horizon_days": horizon,
+                "confidence_level": level,
+                "var": _finite(var[row, column]),
+                "cvar": _finite(cvar[row, column]),
+            }
+            for method, (var, cvar) in estimates.items()
+            for column, horizon in enumerate(request.horizons)
+            for row, level in enumerate(levels)
+        ]
+        return RiskResponse(analysis=analysis)
@@ -0,0 +1,189 @@
+"""Cache of LLM completions keyed by the exact prompt.
+
+The key is a hash of the model and the full message list sent upstream, with
+whitespace normalized, so a cached answer is only reused for the same
+question in the same conversation state (typically a conversation's opening
+question). A process-local LRU, bounded by entry count and total size, sits in
+front of an optional Redis tier shared by every worker; both expire entries
+after ``LLM_CACHE_TTL_SECONDS``. Identical requests that miss at the same time
+on one worker share a single upstream call.
+"""
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+import hashlib
+import json
+import logging
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.metrics import llm_response_cache_lookups_total
+from src.core.redis import get_redis, redis_is_configured
+
+logger = logging.getLogger(__name__)
+
+
+def response_cache_key(model: str, messages: list[dict[str, str]]) -> str:
+    normalized = [
+        [message["role"], " ".join(message["content"].split())] for message in messages
+    ]
+    payload = json.dumps([model, normalized], separators=(",", ":"))
+    return f"llm:response:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+class ResponseCache(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, response: str) -> None:
+        pass
+
+
+class InMemoryResponseCache(ResponseCache):
+    """LRU bounded by entry count and total response size, with per-entry expiry."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _pop(self, key: str) -> None:
+        response, _ = self._entries.pop(key)
+        self._bytes -= len(response.encode())
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    async def set(self, key: str, response: str) -> None:
+        size = len(response.encode())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (response, time.monotonic() + self.ttl_seconds)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+
+class RedisResponseCache(ResponseCache):
+    def __init__(self, client: Redis, ttl_seconds: int):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> str | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, response: str) -> None:
+        await self.client.set(key, response, ex=self.ttl_seconds)
+
+
+class TieredResponseCache(ResponseCache):
+    """Local LRU backed by an optional shared tier, with request coalescing.
+
+    Errors from the shared tier are logged and treated as misses.
+    """
+
+    def __init__(self, local: ResponseCache, shared: ResponseCache | None = None):
+        self.local = local
+        self.shared = shared
+        self._in_flight: dict[str, asyncio.Task[str]] = {}
+
+    async def get(self, key: str) -> str | None:
+        response = await self.local.get(key)
+        if response is not None:
+            llm_response_cache_lookups_total.labels(result="local_hit").inc()
+            return response
+
+        if self.shared is not None:
+            try:
+                response = await self.shared.get(key)
+            except RedisError as e:
+                logger.warning(f"LLM response cache unavailable: {e}")
+            if response is not None:
+                llm_response_cache_lookups_total.labels(result="remote_hit").inc()
+                await self.local.set(key, response)
+                return response
+
+        llm_response_cache_lookups_total.labels(result="miss").inc()
+        return None
+
+    async def set(self, key: str, response: str) -> None:
+        await self.local.set(key, response)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, response)
+            except RedisError as e:
+                logger.warning(f"Failed to cache LLM response: {e}")
+
+    async def _fill(self, key: str, generate: Callable[[], Awaitable[str]]) -> str:
+        try:
+            response = await generate()
+            await self.set(key, response)
+            return response
+        finally:
+            del self._in_flight[key]
+
+    async def get_or_generate(
+        self, key: str, generate: Callable[[], Awaitable[str]]
+    ) -> str:
+        """The cached response, or the result of a single shared ``generate()`` call.
+
+        The upstream call runs in its own task, so one caller disconnecting
+        does not cancel it for the others.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            llm_response_cache_lookups_total.labels(result="coalesced").inc()
+            return await asyncio.shield(task)
+
+        response = await self.get(key)
+        if response is not None:
+            return response
+
+        # Another caller may have started the call while we checked Redis
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fill(key, generate))
+            self._in_flight[key] = task
+        return await asyncio.shield(task)
+
+
+@lru_cache
+def get_response_cache() -> TieredResponseCache:
+    local = InMemoryResponseCache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        max_bytes=settings.LLM_CACHE_MAX_BYTES,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    )
+    if redis_is_configured():
+        return TieredResponseCache(
+            local, RedisResponseCache(get_redis(), settings.LLM_CACHE_TTL_SECONDS)
+        )
+    return TieredResponseCache(local)
@@ -1,16 +1,235 @@
+"""Process-wide OpenRouter client.
+
+One ``AsyncOpenAI`` client, and so one httpx connection pool, is shared by all
+requests on a worker, so TLS sessions and HTTP/2 connections are reused rather
+than set up per chat call. At most ``LLM_MAX_CONCURRENCY`` upstream calls run
+at once per worker; callers wait up to ``LLM_QUEUE_TIMEOUT_SECONDS`` for a slot
+before being refused with ``ServiceOverloadedError``.
+
+Each attempt has a deadline of ``LLM_REQUEST_TIMEOUT_SECONDS``. Retryable
+failures (timeouts, connection errors, 429, 5xx) are retried with jittered
+exponential backoff, up to ``LLM_MAX_RETRIES`` times. The whole call, including
+the attempt in progress, is cut off after ``LLM_DEADLINE_SECONDS``. After that,
+or while the circuit breaker is open, calls fail with ``UpstreamUnavailableError``.
+
+``complete`` returns the provider's token usage with the text; providers that
+omit it are estimated locally.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+import importlib.util
+import logging
+import time
+from typing import TypeVar
+
+import httpx
 from openai import AsyncOpenAI
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_random_exponential,
+)
 
 from src.core.config import settings
+from src.core.exceptions import ServiceOverloadedError, UpstreamUnavailableError
+from src.core.metrics import (
+    llm_upstream_attempts_total,
+    llm_upstream_in_flight,
+    llm_upstream_queue_wait_seconds,
+    llm_upstream_rejected_total,
+)
+from src.llm.resilience import CircuitBreaker, LatencyTracker, hedged, is_retryable
+from src.llm.tokens import TokenUsage, estimate_usage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    # HTTP/2 needs the optional h2 package (httpx[http2])
+    http2 = settings.LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+    if settings.LLM_HTTP2 and not http2:
+        logger.warning("h2 is not installed, using HTTP/1.1 for OpenRouter")
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(settings.LLM_REQUEST_TIMEOUT_SECONDS, connect=5.0),
+    )
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    usage: TokenUsage
 
 
 class OpenRouterClient:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = settings.LLM_MAX_CONCURRENCY,
+        queue_timeout: float = settings.LLM_QUEUE_TIMEOUT_SECONDS,
+        http_client: httpx.AsyncClient | None = None,
+        base_url: str = settings.LLM_BASE_URL,
+        attempt_timeout: float = settings.LLM_REQUEST_TIMEOUT_SECONDS,
+        deadline: float = settings.LLM_DEADLINE_SECONDS,
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        retry_backoff: float = settings.LLM_RETRY_BACKOFF_SECONDS,
+        hedge_percentile: float | None = (
+            settings.LLM_HEDGE_PERCENTILE if settings.LLM_HEDGE_ENABLED else None
+        ),
+        breaker: CircuitBreaker | None = None,
+    ):
+        # Retries are done here, not by the SDK, so they share one deadline
         self.client = AsyncOpenAI(
-            api_key=settings.OPENROUTER_API_KEY, base_url="https://openrouter.ai/api/v1"
+            api_key=settings.OPENROUTER_API_KEY,
+            base_url=base_url,
+            http_client=http_client or _build_http_client(),
+            max_retries=0,
         )
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker(
+            settings.LLM_CIRCUIT_FAILURE_THRESHOLD, settings.LLM_CIRCUIT_RESET_SECONDS
+        )
+        self.latency = LatencyTracker()
 
-    async def send_message(self, messages: list[dict]) -> str:
-        response = await self.client.chat.completions.create(
-            model=settings.DEFAULT_LLM_MODEL, messages=messages
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """Hold one of the upstream call slots, waiting for a free one."""
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._slots.acquire()
+        except TimeoutError as e:
+            llm_upstream_rejected_total.inc()
+            raise ServiceOverloadedError() from e
+        finally:
+            llm_upstream_queue_wait_seconds.observe(time.perf_counter() - started)
+
+        llm_upstream_in_flight.inc()
+        try:
+            yield
+        finally:
+            llm_upstream_in_flight.dec()
+            self._slots.release()
+
+    async def _attempt(self, call: Callable[[], Awaitable[T]], hedge: bool) -> T:
+        try:
+            self.breaker.before_call()
+        except UpstreamUnavailableError:
+            llm_upstream_attempts_total.labels(result="circuit_open").inc()
+            raise
+
+        hedge_after = None
+        if hedge and self.hedge_percentile is not None:
+            hedge_after = self.latency.percentile(self.hedge_percentile)
+
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.attempt_timeout):
+                result = await hedged(call, hedge_after)
+        except Exception as e:
+            if is_retryable(e):
+                llm_upstream_attempts_total.labels(result="retryable_error").inc()
+                self.breaker.record_failure()
+            else:
+                # The provider answered; the request itself was bad
+                llm_upstream_attempts_total.labels(result="error").inc()
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            # Cancelled (client disconnect, lost hedge): the probe never finished
+            self.breaker.release_probe()
+            raise
+
+        llm_upstream_attempts_total.labels(result="success").inc()
+        self.breaker.record_success()
+        self.latency.observe(time.perf_counter() - started)
+        return result
+
+    async def _call(self, call: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        """Run ``call`` with the per-attempt deadline, retries and circuit breaker."""
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_retries + 1)
+            | stop_after_delay(self.deadline),
+            wait=wait_random_exponential(multiplier=self.retry_backoff, max=8),
+            retry=retry_if_exception(is_retryable),
+            reraise=True,
+        )
+        try:
+            # Retry stops are only checked between attempts; this also bounds
+            # the one in progress
+            async with asyncio.timeout(self.deadline):
+                async for attempt in retrying:
+                    with attempt:
+                        return await self._attempt(call, hedge)
+        except Exception as e:
+            if is_retryable(e):
+                logger.error(f"LLM provider failed after retries: {e}")
+                raise UpstreamUnavailableError() from e
+            raise
+        raise AssertionError("unreachable")
+
+    async def complete(self, messages: list[dict]) -> Completion:
+        model = settings.DEFAULT_LLM_MODEL
+        async with self._slot():
+            response = await self._call(
+                lambda: self.client.chat.completions.create(
+                    model=model, messages=messages
+                )
+            )
+        text = response.choices[0].message.content
+        if response.usage is None:
+            return Completion(text, estimate_usage(messages, text, model))
+        return Completion(
+            text,
+            TokenUsage(
+                prompt_tokens=response.usage.prompt_tokens,
+                completion_tokens=response.usage.completion_tokens,
+            ),
         )
-        return response.choices[0].message.content
+
+    async def send_message(self, messages: list[dict]) -> str:
+        return (await self.complete(messages)).text
+
+    async def stream_message(self, messages: list[dict]) -> AsyncIterator[str]:
+        """Yield the completion's text deltas as the provider sends them.
+
+        The slot is held until the stream ends. Opening the stream is retried,
+        but it is never hedged, and a stream that fails midway is not resumed.
+        """
+        async with self._slot():
+            stream = await self._call(
+                lambda: self.client.chat.completions.create(
+                    model=settings.DEFAULT_LLM_MODEL, messages=messages, stream=True
+                ),
+                hedge=False,
+            )
+            async with stream:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+@lru_cache
+def get_llm_client() -> OpenRouterClient:
+    return OpenRouterClient()
@@ -0,0 +1,122 @@
+"""Per-user conversation history shared by every worker.
+
+Each user's history is capped at ``LLM_CONTEXT_MAX_MESSAGES`` messages of at
+most ``LLM_CONTEXT_MAX_MESSAGE_CHARS`` characters (oldest turns are dropped
+first) and expires after ``LLM_CONTEXT_TTL_SECONDS`` without activity, so
+memory per user is bounded. Redis holds the histories when configured; the
+in-process store additionally caps how many users it keeps (LRU).
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+import json
+import time
+from typing import Any
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from src.core.config import settings
+from src.core.redis import get_redis, redis_is_configured
+
+Message = dict[str, Any]
+
+
+def context_key(user_id: UUID) -> str:
+    return f"llm:context:{user_id}"
+
+
+class ConversationContextStore(ABC):
+    def __init__(
+        self,
+        max_messages: int = settings.LLM_CONTEXT_MAX_MESSAGES,
+        max_message_chars: int = settings.LLM_CONTEXT_MAX_MESSAGE_CHARS,
+        ttl_seconds: int = settings.LLM_CONTEXT_TTL_SECONDS,
+    ):
+        self.max_messages = max_messages
+        self.max_message_chars = max_message_chars
+        self.ttl_seconds = ttl_seconds
+
+    def _clip(self, message: Message) -> Message:
+        if len(message["content"]) <= self.max_message_chars:
+            return message
+        # A token count taken before clipping no longer applies
+        clipped = {k: v for k, v in message.items() if k != "tokens"}
+        return {**clipped, "content": message["content"][: self.max_message_chars]}
+
+    @abstractmethod
+    async def get(self, user_id: UUID) -> list[Message]:
+        """The user's history, oldest first (empty if none or expired)."""
+
+    @abstractmethod
+    async def append(self, user_id: UUID, messages: list[Message]) -> None:
+        """Add a completed exchange, trimming the oldest messages over the cap."""
+
+    @abstractmethod
+    async def clear(self, user_id: UUID) -> None:
+        pass
+
+
+class InMemoryContextStore(ConversationContextStore):
+    """LRU over users, for tests and single-process deployments."""
+
+    def __init__(self, max_users: int = settings.LLM_CONTEXT_MAX_USERS, **kwargs):
+        super().__init__(**kwargs)
+        self.max_users = max_users
+        self._contexts: OrderedDict[UUID, tuple[list[Message], float]] = OrderedDict()
+
+    async def get(self, user_id: UUID) -> list[Message]:
+        entry = self._contexts.get(user_id)
+        if entry is None:
+            return []
+        messages, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._contexts[user_id]
+            return []
+        self._contexts.move_to_end(user_id)
+        return list(messages)
+
+    async def append(self, user_id: UUID, messages: list[Message]) -> None:
+        history = await self.get(user_id)
+        history.extend(self._clip(message) for message in messages)
+        self._contexts[user_id] = (
+            history[-self.max_messages :],
+            time.monotonic() + self.ttl_seconds,
+        )
+        self._contexts.move_to_end(user_id)
+        while len(self._contexts) > self.max_users:
+            self._contexts.popitem(last=False)
+
+    async def clear(self, user_id: UUID) -> None:
+        self._contexts.pop(user_id, None)
+
+
+class RedisContextStore(ConversationContextStore):
+    """One capped Redis list of JSON messages per user."""
+
+    def __init__(self, client: Redis, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+
+    async def get(self, user_id: UUID) -> list[Message]:
+        values = await self.client.lrange(context_key(user_id), 0, -1)
+        return [json.loads(value) for value in values]
+
+    async def append(self, user_id: UUID, messages: list[Message]) -> None:
+        key = context_key(user_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *(json.dumps(self._clip(m)) for m in messages))
+            pipe.ltrim(key, -self.max_messages, -1)
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def clear(self, user_id: UUID) -> None:
+        await self.client.delete(context_key(user_id))
+
+
+@lru_cache
+def get_context_store() -> ConversationContextStore:
+    if redis_is_configured():
+        return RedisContextStore(get_redis())
+    return InMemoryContextStore()
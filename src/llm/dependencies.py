@@ -1,5 +1,16 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_session
+from src.llm.history import ConversationHistoryService
 from src.llm.services import LLMService
 
 
 def get_llm_service() -> LLMService:
     return LLMService()
+
+
+async def get_conversation_history_service(
+    session: AsyncSession = Depends(get_session),
+) -> ConversationHistoryService:
+    return ConversationHistoryService(session)
@@ -0,0 +1,99 @@
+from datetime import date, datetime, time, timedelta
+from uuid import UUID
+
+from sqlalchemy import func, literal_column, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.pagination import decode_cursor, encode_cursor
+from src.llm.context import Message
+from src.llm.models import ConversationLog
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class ConversationHistoryService:
+    """Reads back stored conversation logs."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _matches(self, search: str):
+        """Full-text match on Postgres (``search_vector``), substring match elsewhere."""
+        if self.session.bind.dialect.name == "postgresql":
+            return literal_column("search_vector").op("@@")(
+                func.websearch_to_tsquery("english", search)
+            )
+        pattern = f"%{_escape_like(search)}%"
+        return or_(
+            ConversationLog.message.ilike(pattern, escape="\\"),  # type: ignore[attr-defined]
+            ConversationLog.response.ilike(pattern, escape="\\"),  # type: ignore[attr-defined]
+        )
+
+    async def list_conversations(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        search: str | None = None,
+    ) -> tuple[list[ConversationLog], str | None]:
+        """One page of logs, newest first, keyset-paginated on (timestamp, id).
+
+        Returns the rows and the cursor for the next page (None on the last one).
+        """
+        statement = select(ConversationLog).where(ConversationLog.user_id == user_id)
+        if start_date is not None:
+            statement = statement.where(
+                ConversationLog.timestamp >= datetime.combine(start_date, time.min)
+            )
+        if end_date is not None:
+            statement = statement.where(
+                ConversationLog.timestamp
+                < datetime.combine(end_date + timedelta(days=1), time.min)
+            )
+        if search:
+            statement = statement.where(self._matches(search))
+        if cursor is not None:
+            statement = statement.where(
+                tuple_(ConversationLog.timestamp, ConversationLog.id)
+                < tuple_(*decode_cursor(cursor))
+            )
+        statement = statement.order_by(
+            ConversationLog.timestamp.desc(),  # type: ignore[attr-defined]
+            ConversationLog.id.desc(),  # type: ignore[union-attr]
+        ).limit(limit + 1)
+
+        result = await self.session.execute(statement)
+        logs = list(result.scalars().all())
+        if len(logs) <= limit:
+            return logs, None
+        logs = logs[:limit]
+        last = logs[-1]
+        return logs, encode_cursor(last.timestamp, last.id)
+
+    async def recent_messages(
+        self, user_id: UUID, since: datetime, max_messages: int
+    ) -> list[Message]:
+        """The user's latest exchanges since ``since`` as chat messages, oldest first."""
+        statement = (
+            select(ConversationLog)
+            .where(
+                ConversationLog.user_id == user_id,
+                ConversationLog.timestamp >= since,
+            )
+            .order_by(
+                ConversationLog.timestamp.desc(),  # type: ignore[attr-defined]
+                ConversationLog.id.desc(),  # type: ignore[union-attr]
+            )
+            .limit(max(1, max_messages // 2))
+        )
+        result = await self.session.execute(statement)
+        messages: list[Message] = []
+        for log in reversed(result.scalars().all()):
+            messages.append({"role": "user", "content": log.message})
+            messages.append({"role": "assistant", "content": log.response})
+        return messages
@@ -0,0 +1,21 @@
+from functools import lru_cache
+from pathlib import Path
+
+from src.core.batch_writer import BatchWriter
+from src.core.config import settings
+from src.llm.models import ConversationLog
+
+
+@lru_cache
+def get_conversation_log_writer() -> BatchWriter:
+    """Write-behind buffer for ConversationLog rows, started and drained by ``lifespan``."""
+    return BatchWriter(
+        ConversationLog,
+        name="conversation_log",
+        batch_size=settings.LLM_LOG_BATCH_SIZE,
+        flush_interval=settings.LLM_LOG_FLUSH_INTERVAL_SECONDS,
+        max_pending=settings.LLM_LOG_MAX_PENDING,
+        spool_dir=Path(settings.BATCH_WRITER_SPOOL_DIR)
+        if settings.BATCH_WRITER_SPOOL_DIR
+        else None,
+    )
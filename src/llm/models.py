@@ -1,12 +1,48 @@
 from datetime import datetime
+from typing import Any
 from uuid import UUID, uuid4
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+from src.llm.tokens import TokenUsage
+
 
 class ConversationLog(SQLModel, table=True):
+    # Keyset pagination order for /llm/conversations. On Postgres the table also
+    # has a generated ``search_vector`` tsvector column with a GIN index (see
+    # migration 20261017_140000); it is not mapped here so SQLite tests work,
+    # and alembic/env.py keeps autogenerate from dropping it.
+    __table_args__ = (
+        Index("ix_conversationlog_user_timestamp_id", "user_id", "timestamp", "id"),
+    )
+
     id: UUID | None = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
+    # Stored as plain text: Postgres compresses large values itself (TOAST),
+    # and search_vector is generated from these columns
     message: str
     response: str
+    # Upstream usage; None when the response was served from the cache
+    prompt_tokens: int | None = Field(default=None)
+    completion_tokens: int | None = Field(default=None)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+    @classmethod
+    def row(
+        cls,
+        user_id: UUID,
+        message: str,
+        response: str,
+        usage: TokenUsage | None = None,
+    ) -> dict[str, Any]:
+        """Column values for a new log entry."""
+        return {
+            "id": uuid4(),
+            "user_id": user_id,
+            "message": message,
+            "response": response,
+            "prompt_tokens": usage.prompt_tokens if usage else None,
+            "completion_tokens": usage.completion_tokens if usage else None,
+            "timestamp": datetime.utcnow(),
+        }
@@ -0,0 +1,128 @@
+"""Failure isolation for upstream LLM calls.
+
+``CircuitBreaker`` fails calls fast once the provider has failed
+``LLM_CIRCUIT_FAILURE_THRESHOLD`` times in a row, then lets a single probe
+through every ``LLM_CIRCUIT_RESET_SECONDS``. ``LatencyTracker`` keeps recent
+call latencies so hedged requests can be sent once a call is slower than the
+usual ``LLM_HEDGE_PERCENTILE``.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+import math
+import time
+from typing import TypeVar
+
+import openai
+
+from src.core.exceptions import UpstreamUnavailableError
+from src.core.metrics import llm_circuit_open, llm_hedged_requests_total
+
+T = TypeVar("T")
+
+# Timeouts, connection failures, 429 and 5xx; other 4xx would fail again
+RETRYABLE_ERRORS = (
+    TimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self) -> None:
+        """Raise ``UpstreamUnavailableError`` unless a call may go upstream."""
+        if self._opened_at is None:
+            return
+        if time.monotonic() - self._opened_at < self.reset_seconds or self._probing:
+            raise UpstreamUnavailableError()
+        # Half-open: let one call through to test the provider
+        self._probing = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        llm_circuit_open.set(0)
+
+    def release_probe(self) -> None:
+        """The call was abandoned (e.g. cancelled) before the provider answered.
+
+        Neither outcome is recorded; the next call may probe again.
+        """
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            llm_circuit_open.set(1)
+        self._probing = False
+
+
+class LatencyTracker:
+    """Latencies of the most recent successful calls."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> float | None:
+        """``None`` until enough calls have been seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = math.ceil(percentile / 100 * len(ordered)) - 1
+        return ordered[max(0, min(index, len(ordered) - 1))]
+
+
+async def hedged(  # noqa: UP047
+    call: Callable[[], Awaitable[T]], hedge_after: float | None
+) -> T:
+    """Run ``call``, starting a second copy if the first takes over ``hedge_after``.
+
+    The first copy to succeed wins and the other is cancelled.
+    """
+    if hedge_after is None:
+        return await call()
+
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            llm_hedged_requests_total.inc()
+            tasks.append(asyncio.ensure_future(call()))
+
+        pending = set(tasks)
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    return task.result()
+        raise error  # type: ignore[misc]
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -1,16 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
+from asyncio import CancelledError
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from datetime import date
+import json
+import logging
+import time
+from uuid import UUID
+
+from anyio import CancelScope
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.auth.dependencies import get_current_active_user
-from src.llm.dependencies import get_llm_service
-from src.llm.schemas import LLMRequest, LLMResponse
-from src.llm.services import LLMService
+from src.core.database import get_session_factory
+from src.core.exceptions import UsageLimitExceededError
+from src.core.metrics import llm_stream_first_token_seconds, llm_streams_total
+from src.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.llm.dependencies import get_conversation_history_service, get_llm_service
+from src.llm.history import ConversationHistoryService
+from src.llm.schemas import (
+    ConversationLogResponse,
+    ConversationPage,
+    LLMRequest,
+    LLMResponse,
+)
+from src.llm.services import LLMService, UsageCallback
+from src.llm.tokens import TokenUsage
 from src.subscriptions.dependencies import get_subscription_service
-from src.subscriptions.services import SubscriptionService
+from src.subscriptions.services import SubscriptionService, UsageReservation
 from src.users.models import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
+async def _check_token_budget(
+    subscription_service: SubscriptionService, user_id: UUID
+) -> None:
+    """Refuse the request if the token budget is spent.
+
+    A call's tokens are only known once it finishes, so the last call admitted
+    under the budget may overshoot it.
+    """
+    if not await subscription_service.check_usage_limit(user_id, "llm_tokens"):
+        raise HTTPException(
+            status_code=429, detail="Token budget exceeded for LLM requests"
+        )
+
+
+def _token_charger(
+    subscription_service: SubscriptionService, reservation: UsageReservation
+) -> UsageCallback:
+    """The hook that charges a finished call's tokens to the request's window."""
+
+    async def charge(usage: TokenUsage) -> None:
+        await subscription_service.charge_usage(
+            reservation, "llm_tokens", usage.total_tokens
+        )
+
+    return charge
+
+
 @router.post("/chat", response_model=LLMResponse)
 async def chat_with_llm(
     request: LLMRequest,
@@ -21,21 +73,157 @@ async def chat_with_llm(
     # Ensure user can only chat for themselves
     if request.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Cannot chat for another user")
+    await _check_token_budget(subscription_service, current_user.id)
 
-    # Check usage limit for LLM requests
-    if not await subscription_service.check_usage_limit(
-        current_user.id, "llm_requests"
-    ):
+    # Reserve an LLM request, generate the response, then commit usage
+    try:
+        async with subscription_service.metered(
+            current_user.id, "llm_requests"
+        ) as reservation:
+            response_text = await llm_service.generate_response(
+                current_user.id,
+                request.message,
+                use_cache=request.use_cache,
+                on_usage=_token_charger(subscription_service, reservation),
+            )
+    except UsageLimitExceededError as e:
         raise HTTPException(
             status_code=429, detail="Usage limit exceeded for LLM requests"
+        ) from e
+
+    return LLMResponse(response=response_text)
+
+
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def _chat_events(
+    llm_service: LLMService,
+    session_factory: async_sessionmaker[AsyncSession],
+    reservation: UsageReservation,
+    request: LLMRequest,
+    started: float,
+) -> AsyncIterator[str]:
+    """SSE frames for a streamed response, settling the usage reservation.
+
+    Usage is recorded once the stream completes or the client disconnects, and
+    released if the provider fails. The request's session is closed before the
+    body is sent, so these writes use a session of their own.
+    """
+    session = session_factory()
+    subscription_service = SubscriptionService(session)
+    first_token = True
+    try:
+        try:
+            async with aclosing(
+                llm_service.stream_response(
+                    reservation.user_id,
+                    request.message,
+                    use_cache=request.use_cache,
+                    on_usage=_token_charger(subscription_service, reservation),
+                )
+            ) as deltas:
+                async for delta in deltas:
+                    if first_token:
+                        llm_stream_first_token_seconds.observe(
+                            time.perf_counter() - started
+                        )
+                        first_token = False
+                    yield _sse({"delta": delta})
+        except (GeneratorExit, CancelledError):
+            llm_streams_total.labels(result="cancelled").inc()
+            with CancelScope(shield=True):
+                await subscription_service.commit_usage(reservation)
+            raise
+        except Exception as e:
+            logger.error(f"LLM stream failed for user {reservation.user_id}: {e}")
+            llm_streams_total.labels(result="error").inc()
+            await subscription_service.release_usage(reservation)
+            yield _sse({"error": "LLM provider error"}, event="error")
+            return
+
+        llm_streams_total.labels(result="completed").inc()
+        await subscription_service.commit_usage(reservation)
+        yield _sse({}, event="done")
+    finally:
+        with CancelScope(shield=True):
+            await session.close()
+
+
+@router.post("/chat/stream")
+async def stream_chat_with_llm(
+    request: LLMRequest,
+    current_user: User = Depends(get_current_active_user),
+    llm_service: LLMService = Depends(get_llm_service),
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+):
+    """Stream the response as server-sent events.
+
+    Each ``data`` frame carries ``{"delta": "..."}``; the stream ends with a
+    ``done`` event, or an ``error`` event if the provider fails mid-response.
+    """
+    started = time.perf_counter()
+    if request.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Cannot chat for another user")
+
+    # Quota is checked before streaming starts so a refusal is a plain 429
+    await _check_token_budget(subscription_service, current_user.id)
+    try:
+        reservation = await subscription_service.reserve_usage(
+            current_user.id, "llm_requests"
         )
+    except UsageLimitExceededError as e:
+        raise HTTPException(
+            status_code=429, detail="Usage limit exceeded for LLM requests"
+        ) from e
 
-    # Generate response
-    response_text = await llm_service.generate_response(
-        current_user.id, request.message
+    return StreamingResponse(
+        _chat_events(llm_service, session_factory, reservation, request, started),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream, which would delay the first byte
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    # Log usage
-    await subscription_service.log_usage(current_user.id, "llm_requests")
 
-    return LLMResponse(response=response_text)
+@router.get("/conversations", response_model=ConversationPage)
+async def list_conversations(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    q: str | None = Query(None, min_length=1, max_length=200),
+    current_user: User = Depends(get_current_active_user),
+    history_service: ConversationHistoryService = Depends(
+        get_conversation_history_service
+    ),
+):
+    """Page through the user's conversation history, newest first.
+
+    ``q`` searches messages and responses. Pass ``next_cursor`` back as
+    ``cursor`` for the following page.
+    """
+    logs, next_cursor = await history_service.list_conversations(
+        current_user.id,
+        limit,
+        cursor=cursor,
+        start_date=start_date,
+        end_date=end_date,
+        search=q,
+    )
+    return ConversationPage(
+        items=[
+            ConversationLogResponse(
+                id=log.id,
+                message=log.message,
+                response=log.response,
+                prompt_tokens=log.prompt_tokens,
+                completion_tokens=log.completion_tokens,
+                timestamp=log.timestamp,
+            )
+            for log in logs
+        ],
+        next_cursor=next_cursor,
+    )
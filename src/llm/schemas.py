@@ -1,3 +1,4 @@
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -6,7 +7,23 @@ from pydantic import BaseModel
 class LLMRequest(BaseModel):
     user_id: UUID
     message: str
+    # Set to false to always get a fresh completion (and not cache this one)
+    use_cache: bool = True
 
 
 class LLMResponse(BaseModel):
     response: str
+
+
+class ConversationLogResponse(BaseModel):
+    id: UUID
+    message: str
+    response: str
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    timestamp: datetime
+
+
+class ConversationPage(BaseModel):
+    items: list[ConversationLogResponse]
+    next_cursor: str | None = None
@@ -1,36 +1,223 @@
+from asyncio import CancelledError
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime, timedelta
 from uuid import UUID
 
+from anyio import CancelScope
+
+from src.core.batch_writer import BatchWriter
+from src.core.config import settings
 from src.core.database import get_session
-from src.llm.clients import OpenRouterClient
+from src.core.metrics import llm_completion_tokens, llm_prompt_tokens
+from src.llm.cache import TieredResponseCache, get_response_cache, response_cache_key
+from src.llm.clients import OpenRouterClient, get_llm_client
+from src.llm.context import ConversationContextStore, Message, get_context_store
+from src.llm.history import ConversationHistoryService
+from src.llm.ingestion import get_conversation_log_writer
 from src.llm.models import ConversationLog
+from src.llm.tokens import (
+    TokenUsage,
+    estimate_usage,
+    fit_to_budget,
+    prompt_messages,
+    with_token_count,
+)
+
+# Called with the upstream usage of each response that was not served from cache
+UsageCallback = Callable[[TokenUsage], Awaitable[None]]
 
 
 class LLMService:
-    def __init__(self) -> None:
-        self.client: OpenRouterClient = OpenRouterClient()
-        self.conversation_contexts: dict[UUID, list[dict[str, str]]] = {}
+    def __init__(
+        self,
+        context_store: ConversationContextStore | None = None,
+        client: OpenRouterClient | None = None,
+        response_cache: TieredResponseCache | None = None,
+        log_writer: BatchWriter | None = None,
+    ) -> None:
+        self.client = client or get_llm_client()
+        self.context_store = context_store or get_context_store()
+        self.response_cache = response_cache or get_response_cache()
+        self.log_writer = log_writer or get_conversation_log_writer()
 
-    async def generate_response(self, user_id: UUID, message: str) -> str:
-        # Get or create conversation context
-        if user_id not in self.conversation_contexts:
-            self.conversation_contexts[user_id] = []
+    async def _prompt(
+        self, user_id: UUID, message: str
+    ) -> tuple[Message, list[Message]]:
+        """The user's message with its token count, and the window to send."""
+        model = settings.DEFAULT_LLM_MODEL
+        user_message = with_token_count({"role": "user", "content": message}, model)
+        context = await self.context_store.get(user_id)
+        if not context and settings.LLM_CONTEXT_REHYDRATE:
+            context = await self._rehydrate(user_id)
+        return user_message, fit_to_budget(context, user_message, model)
 
-        context = self.conversation_contexts[user_id]
-        context.append({"role": "user", "content": message})
+    async def _rehydrate(self, user_id: UUID) -> list[Message]:
+        """Reload recent exchanges from the conversation log into an empty context.
 
-        # Send to LLM
-        response_content = await self.client.send_message(context)
+        Only exchanges from the last ``LLM_CONTEXT_TTL_SECONDS`` are restored,
+        i.e. what the context would still hold had it not been evicted.
+        """
+        since = datetime.utcnow() - timedelta(seconds=settings.LLM_CONTEXT_TTL_SECONDS)
+        messages: list[Message] = []
+        async for session in get_session():
+            messages = await ConversationHistoryService(session).recent_messages(
+                user_id, since, self.context_store.max_messages
+            )
+            break
+        if not messages:
+            return []
 
-        # Add response to context
-        context.append({"role": "assistant", "content": response_content})
+        model = settings.DEFAULT_LLM_MODEL
+        await self.context_store.append(
+            user_id, [with_token_count(m, model) for m in messages]
+        )
+        return await self.context_store.get(user_id)
+
+    async def _remember(
+        self, user_id: UUID, user_message: Message, response: str
+    ) -> None:
+        assistant_message = {"role": "assistant", "content": response}
+        await self.context_store.append(
+            user_id,
+            [
+                user_message,
+                with_token_count(assistant_message, settings.DEFAULT_LLM_MODEL),
+            ],
+        )
+
+    async def _meter(
+        self, usage: TokenUsage | None, on_usage: UsageCallback | None
+    ) -> None:
+        if usage is None:
+            return
+        model = settings.DEFAULT_LLM_MODEL
+        source = "estimate" if usage.estimated else "provider"
+        llm_prompt_tokens.labels(model=model, source=source).observe(
+            usage.prompt_tokens
+        )
+        llm_completion_tokens.labels(model=model, source=source).observe(
+            usage.completion_tokens
+        )
+        if on_usage is not None:
+            await on_usage(usage)
+
+    async def _log_conversation(
+        self,
+        user_id: UUID,
+        message: str,
+        response: str,
+        usage: TokenUsage | None = None,
+    ) -> None:
+        """Hand the log entry to the write-behind buffer, or write it directly.
+
+        The buffer only runs inside the API process (see ``lifespan``), so the
+        request does not wait on a connection checkout and commit.
+        """
+        row = ConversationLog.row(user_id, message, response, usage)
+        if self.log_writer.running:
+            self.log_writer.enqueue(row)
+            return
 
-        # Log to database
         async for session in get_session():
-            log_entry = ConversationLog(
-                user_id=user_id, message=message, response=response_content
-            )
-            session.add(log_entry)
+            session.add(ConversationLog(**row))
             await session.commit()
             break
 
+    def _cache_key(self, prompt: list[dict[str, str]], use_cache: bool) -> str | None:
+        if not (use_cache and settings.LLM_CACHE_ENABLED):
+            return None
+        return response_cache_key(settings.DEFAULT_LLM_MODEL, prompt)
+
+    async def generate_response(
+        self,
+        user_id: UUID,
+        message: str,
+        use_cache: bool = True,
+        on_usage: UsageCallback | None = None,
+    ) -> str:
+        """Answer ``message`` in the user's conversation.
+
+        ``on_usage`` receives the tokens the call used upstream; it is not
+        called when the response comes from the cache.
+        """
+        user_message, window = await self._prompt(user_id, message)
+        prompt = prompt_messages(window)
+        usage: TokenUsage | None = None
+
+        async def generate() -> str:
+            nonlocal usage
+            completion = await self.client.complete(prompt)
+            usage = completion.usage
+            return completion.text
+
+        # Send to LLM, unless an identical prompt was answered recently
+        cache_key = self._cache_key(prompt, use_cache)
+        if cache_key is None:
+            response_content = await generate()
+        else:
+            response_content = await self.response_cache.get_or_generate(
+                cache_key, generate
+            )
+
+        # Store the exchange, with token counts, only once it has succeeded
+        await self._remember(user_id, user_message, response_content)
+
+        # Log to database
+        await self._log_conversation(user_id, message, response_content, usage)
+        await self._meter(usage, on_usage)
+
         return response_content
+
+    async def stream_response(
+        self,
+        user_id: UUID,
+        message: str,
+        use_cache: bool = True,
+        on_usage: UsageCallback | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield the response's text as it is generated.
+
+        The provider is only read as fast as the caller consumes, so a slow
+        client slows the upstream stream instead of buffering it here. If the
+        caller stops early, the partial response is still logged and metered,
+        but it is not added to the conversation context. A cached response is
+        sent as one delta; completed streams are cached. Streamed usage is a
+        tiktoken estimate.
+        """
+        user_message, window = await self._prompt(user_id, message)
+        prompt = prompt_messages(window)
+        cache_key = self._cache_key(prompt, use_cache)
+        cached = (
+            await self.response_cache.get(cache_key) if cache_key is not None else None
+        )
+
+        def usage_for(response: str) -> TokenUsage | None:
+            if cached is not None:
+                return None
+            return estimate_usage(window, response, settings.DEFAULT_LLM_MODEL)
+
+        parts: list[str] = []
+        try:
+            if cached is not None:
+                parts.append(cached)
+                yield cached
+            else:
+                async for delta in self.client.stream_message(prompt):
+                    parts.append(delta)
+                    yield delta
+        except (GeneratorExit, CancelledError):
+            # Finish logging even though the request's task is being cancelled
+            with CancelScope(shield=True):
+                partial = "".join(parts)
+                usage = usage_for(partial)
+                await self._log_conversation(user_id, message, partial, usage)
+                await self._meter(usage, on_usage)
+            raise
+
+        response_content = "".join(parts)
+        usage = usage_for(response_content)
+        if cache_key is not None and cached is None:
+            await self.response_cache.set(cache_key, response_content)
+        await self._remember(user_id, user_message, response_content)
+        await self._log_conversation(user_id, message, response_content, usage)
+        await self._meter(usage, on_usage)
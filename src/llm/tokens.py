@@ -0,0 +1,122 @@
+"""Token counting and budget-based context windowing.
+
+Counts use tiktoken. Models without a tiktoken mapping (most non-OpenAI models
+on OpenRouter) are counted with ``o200k_base``, which is close enough for
+budgeting. If the encoding files cannot be loaded (tiktoken downloads them on
+first use unless ``TIKTOKEN_CACHE_DIR`` is pre-populated), counts fall back to
+a characters-per-token estimate rather than failing the request.
+
+Each message's count is stored on the message itself under ``"tokens"`` when it
+enters the context store, so a turn only tokenizes the new text.
+
+``TokenUsage`` is what a request cost upstream, as reported by the provider or,
+for streamed responses, estimated from the same counts.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+import math
+
+import tiktoken
+
+from src.core.config import settings
+from src.llm.context import Message
+
+logger = logging.getLogger(__name__)
+
+# Chat formatting overhead (role and separators) per message, and for priming
+# the assistant's reply, as documented for OpenAI chat models
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+FALLBACK_ENCODING = "o200k_base"
+FALLBACK_CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class TokenUsage:
+    prompt_tokens: int
+    completion_tokens: int
+    # True when counted locally rather than reported by the provider
+    estimated: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@lru_cache
+def get_encoding(model: str) -> tiktoken.Encoding | None:
+    model_name = model.rsplit("/", 1)[-1]
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable for {model}, estimating: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / FALLBACK_CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def with_token_count(message: Message, model: str) -> Message:
+    """``message`` with its cached ``"tokens"`` count, computing it if missing."""
+    if "tokens" in message:
+        return message
+    tokens = TOKENS_PER_MESSAGE + count_tokens(message["content"], model)
+    return {**message, "tokens": tokens}
+
+
+def token_budget(model: str) -> int:
+    return settings.LLM_MODEL_TOKEN_BUDGETS.get(
+        model, settings.LLM_CONTEXT_TOKEN_BUDGET
+    )
+
+
+def fit_to_budget(
+    history: list[Message], message: Message, model: str
+) -> list[Message]:
+    """The newest turns of ``history`` plus ``message`` that fit the model's budget.
+
+    Older messages are dropped first, and the window never starts with an
+    assistant reply. The new message is always included.
+    """
+    message = with_token_count(message, model)
+    used = TOKENS_PER_REPLY + message["tokens"]
+    budget = token_budget(model)
+
+    window: list[Message] = []
+    for previous in reversed(history):
+        previous = with_token_count(previous, model)
+        if used + previous["tokens"] > budget:
+            break
+        used += previous["tokens"]
+        window.append(previous)
+    window.reverse()
+
+    while window and window[0]["role"] != "user":
+        window.pop(0)
+    return [*window, message]
+
+
+def prompt_messages(window: list[Message]) -> list[dict[str, str]]:
+    """Strip bookkeeping fields before sending messages to the provider."""
+    return [{"role": m["role"], "content": m["content"]} for m in window]
+
+
+def estimate_usage(window: list[Message], completion: str, model: str) -> TokenUsage:
+    """Local estimate of the usage for sending ``window`` and receiving ``completion``."""
+    prompt_tokens = TOKENS_PER_REPLY + sum(
+        with_token_count(m, model)["tokens"] for m in window
+    )
+    return TokenUsage(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=count_tokens(completion, model),
+        estimated=True,
+    )
@@ -4,10 +4,6 @@ from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-from slowapi.util import get_remote_address
 
 from src.auth.router import router as auth_router
 from src.core.config import settings
@@ -17,10 +13,18 @@ from src.core.exceptions import (
     api_exception_handler,
     general_exception_handler,
 )
+from src.core.keyring import get_keyring
+from src.core.rate_limit import RateLimitMiddleware
+from src.core.redis import close_redis
+from src.core.security import get_password_hasher
+from src.finance.compute import get_compute_pool
 from src.finance.router import router as finance_router
+from src.llm.clients import get_llm_client
+from src.llm.ingestion import get_conversation_log_writer
 from src.llm.router import router as llm_router
 from src.privacy.router import router as privacy_router
 from src.shared.health import router as health_router
+from src.subscriptions.ingestion import get_usage_log_writer
 from src.subscriptions.router import router as subscriptions_router
 from src.users.router import router as users_router
 
@@ -30,9 +34,19 @@ async def lifespan(app: FastAPI):
     # Startup
     if settings.ENVIRONMENT == "development":
         await create_db_and_tables()
+    usage_log_writer = get_usage_log_writer()
+    usage_log_writer.start()
+    conversation_log_writer = get_conversation_log_writer()
+    conversation_log_writer.start()
+    llm_client = get_llm_client()
     yield
     # Shutdown
-    pass
+    await usage_log_writer.stop()
+    await conversation_log_writer.stop()
+    await llm_client.close()
+    await close_redis()
+    get_password_hasher().shutdown()
+    get_compute_pool().shutdown()
 
 
 # Create FastAPI app
@@ -44,25 +58,17 @@ app = FastAPI(
     redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
 )
 
-# Initialize rate limiter
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=[
-        f"{settings.RATE_LIMIT_TIMES} per {settings.RATE_LIMIT_SECONDS} seconds"
-    ],
-)
-
-# Store limiter in app state for middleware access
-app.state.limiter = limiter
-
 # Add exception handlers
 app.add_exception_handler(BaseAPIError, api_exception_handler)  # type: ignore
 app.add_exception_handler(Exception, general_exception_handler)  # type: ignore
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)  # type: ignore
 
 # Add middleware
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
 
+# Registered before CORSMiddleware so that CORS wraps it: 429s carry CORS
+# headers and preflights are answered without taking a token
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS if settings.CORS_ORIGINS else ["*"],
@@ -71,8 +77,6 @@ app.add_middleware(
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
 
-app.add_middleware(SlowAPIMiddleware)
-
 # Include routers
 app.include_router(health_router, prefix="/health", tags=["health"])
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
@@ -91,6 +95,13 @@ async def metrics():
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
+@app.get("/.well-known/jwks.json")
+async def jwks(response: Response):
+    """Public keys for verifying access tokens without calling the API."""
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return get_keyring().jwks()
+
+
 @app.get("/")
 async def root():
     return {"message": f"Welcome to {settings.APP_NAME}"}
@@ -0,0 +1,135 @@
+"""Per-(user, feature, period) usage counters.
+
+``check_usage_limit`` used to ``COUNT(*)`` the user's whole ``UsageLog`` history
+on every metered request. The counters below make that check O(1): Redis holds
+the hot counters, the ``usagecounter`` table is the durable copy they are seeded
+from (and the fallback when Redis is unreachable), and the
+``reconcile_usage_counters`` task periodically raises both to the
+``usagedaily`` rollups.
+"""
+
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import time
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from src.core.config import settings
+from src.core.redis import get_redis, redis_is_configured
+
+
+def usage_counter_key(user_id: UUID, feature_name: str, period: str) -> str:
+    """Key for one window's counter, ``period`` as given by ``UsageWindow.period``."""
+    return f"usage:{user_id}:{feature_name}:{period}"
+
+
+class UsageCounterStore(ABC):
+    """Cache of usage counts.
+
+    Counters are only ever created by ``seed``/``set_many`` from an authoritative
+    count. Increments on an absent counter are dropped, so a cold key is always
+    reseeded from the database instead of silently restarting at zero.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> int | None:
+        pass
+
+    @abstractmethod
+    async def seed(self, key: str, value: int) -> None:
+        """Set the counter unless another caller seeded it first."""
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1) -> int | None:
+        """Add ``amount`` to an existing counter; returns None if it is absent."""
+
+    @abstractmethod
+    async def set_many(self, values: dict[str, int]) -> None:
+        pass
+
+
+class InMemoryUsageCounterStore(UsageCounterStore):
+    """Process-local store used in tests and when Redis is not configured."""
+
+    def __init__(self, ttl_seconds: int = settings.USAGE_COUNTER_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._values: dict[str, tuple[int, float]] = {}
+
+    def _read(self, key: str) -> int | None:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    def _write(self, key: str, value: int) -> None:
+        self._values[key] = (value, time.monotonic() + self.ttl_seconds)
+
+    async def get(self, key: str) -> int | None:
+        return self._read(key)
+
+    async def seed(self, key: str, value: int) -> None:
+        if self._read(key) is None:
+            self._write(key, value)
+
+    async def incr(self, key: str, amount: int = 1) -> int | None:
+        current = self._read(key)
+        if current is None:
+            return None
+        self._values[key] = (current + amount, self._values[key][1])
+        return current + amount
+
+    async def set_many(self, values: dict[str, int]) -> None:
+        for key, value in values.items():
+            self._write(key, value)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+# KEYS[1] = counter key, ARGV[1] = amount
+_INCR_IF_EXISTS = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+class RedisUsageCounterStore(UsageCounterStore):
+    """Counters shared by every worker and node, updated with a Lua script."""
+
+    def __init__(
+        self, client: Redis, ttl_seconds: int = settings.USAGE_COUNTER_TTL_SECONDS
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self._incr_if_exists = client.register_script(_INCR_IF_EXISTS)
+
+    async def get(self, key: str) -> int | None:
+        value = await self.client.get(key)
+        return int(value) if value is not None else None
+
+    async def seed(self, key: str, value: int) -> None:
+        await self.client.set(key, value, ex=self.ttl_seconds, nx=True)
+
+    async def incr(self, key: str, amount: int = 1) -> int | None:
+        value = await self._incr_if_exists(keys=[key], args=[amount])
+        return int(value) if value is not None else None
+
+    async def set_many(self, values: dict[str, int]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=self.ttl_seconds)
+            await pipe.execute()
+
+
+@lru_cache
+def get_usage_counter_store() -> UsageCounterStore:
+    if redis_is_configured():
+        return RedisUsageCounterStore(get_redis())
+    return InMemoryUsageCounterStore()
@@ -0,0 +1,23 @@
+from functools import lru_cache
+from pathlib import Path
+
+from src.core.batch_writer import BatchWriter
+from src.core.config import settings
+from src.subscriptions.models import UsageLog
+from src.subscriptions.rollups import record_usage_log_batch
+
+
+@lru_cache
+def get_usage_log_writer() -> BatchWriter:
+    """Write-behind buffer for UsageLog rows, started and drained by ``lifespan``."""
+    return BatchWriter(
+        UsageLog,
+        name="usage_log",
+        batch_size=settings.USAGE_LOG_BATCH_SIZE,
+        flush_interval=settings.USAGE_LOG_FLUSH_INTERVAL_SECONDS,
+        max_pending=settings.USAGE_LOG_MAX_PENDING,
+        on_flush=record_usage_log_batch,
+        spool_dir=Path(settings.BATCH_WRITER_SPOOL_DIR)
+        if settings.BATCH_WRITER_SPOOL_DIR
+        else None,
+    )
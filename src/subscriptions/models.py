@@ -1,7 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID, uuid4
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -19,7 +20,37 @@ class Subscription(SQLModel, table=True):
 
 
 class UsageLog(SQLModel, table=True):
+    # Range-partitioned by month on timestamp in Postgres (see migrations)
+    __table_args__ = (
+        Index(
+            "ix_usagelog_user_feature_timestamp", "user_id", "feature_name", "timestamp"
+        ),
+        # Keyset pagination order for /subscriptions/usage
+        Index("ix_usagelog_user_timestamp_id", "user_id", "timestamp", "id"),
+    )
+
     id: UUID | None = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
     feature_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # Units consumed, e.g. tokens for llm_tokens; 1 for per-request features
+    quantity: int = 1
+    # Part of the primary key, as Postgres requires of the partition key
+    timestamp: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
+
+
+class UsageCounter(SQLModel, table=True):
+    """Durable running usage count per user, feature and period."""
+
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    feature_name: str = Field(primary_key=True)
+    period: str = Field(primary_key=True)
+    count: int = 0
+
+
+class UsageDaily(SQLModel, table=True):
+    """Daily rollup of UsageLog, maintained as usage events are written."""
+
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    feature_name: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    count: int = 0
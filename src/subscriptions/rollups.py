@@ -0,0 +1,52 @@
+from collections import Counter
+from collections.abc import Iterable
+from datetime import date, datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import dialect_insert
+from src.subscriptions.models import UsageDaily
+
+
+async def record_daily_usage(
+    session: AsyncSession, events: Iterable[tuple[UUID, str, datetime, int]]
+) -> None:
+    """Add ``(user_id, feature_name, timestamp, quantity)`` events to the daily rollups.
+
+    Events are aggregated first, so a batch costs one upsert row per
+    user/feature/day. Runs in the caller's transaction alongside the
+    UsageLog insert.
+    """
+    totals: Counter[tuple[UUID, str, date]] = Counter()
+    for user_id, feature_name, timestamp, quantity in events:
+        totals[user_id, feature_name, timestamp.date()] += quantity
+    if not totals:
+        return
+
+    insert = dialect_insert(session, UsageDaily).values(
+        [
+            {"user_id": user_id, "feature_name": feature_name, "day": day, "count": n}
+            for (user_id, feature_name, day), n in totals.items()
+        ]
+    )
+    await session.execute(
+        insert.on_conflict_do_update(
+            index_elements=["user_id", "feature_name", "day"],
+            set_={"count": UsageDaily.count + insert.excluded.count},
+        )
+    )
+
+
+async def record_usage_log_batch(
+    session: AsyncSession, rows: list[dict[str, Any]]
+) -> None:
+    """``BatchWriter`` flush hook keeping the rollups in step with UsageLog."""
+    await record_daily_usage(
+        session,
+        (
+            (r["user_id"], r["feature_name"], r["timestamp"], r.get("quantity", 1))
+            for r in rows
+        ),
+    )
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 import stripe
 from stripe import SignatureVerificationError
 
 from src.auth.dependencies import get_current_active_user
 from src.core.config import settings
-from src.core.database import get_session
+from src.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from src.subscriptions.dependencies import get_subscription_service
-from src.subscriptions.models import UsageLog
-from src.subscriptions.schemas import SubscriptionResponse, UsageLogResponse
+from src.subscriptions.schemas import (
+    SubscriptionResponse,
+    UsageAggregateResponse,
+    UsageAggregation,
+    UsageGroupResponse,
+    UsageLogPage,
+    UsageLogResponse,
+    UsageSummaryResponse,
+)
 from src.subscriptions.services import SubscriptionService
 from src.subscriptions.tasks import process_stripe_event
 from src.users.models import User
@@ -32,15 +39,64 @@ async def get_subscription(
     return SubscriptionResponse.model_validate(subscription)
 
 
-@router.get("/usage", response_model=list[UsageLogResponse])
+@router.get("/usage", response_model=UsageLogPage | UsageAggregateResponse)
 async def get_usage_logs(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    feature_name: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    aggregate: UsageAggregation | None = None,
+    current_user: User = Depends(get_current_active_user),
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
+):
+    """Page through usage logs, newest first, or get counts grouped in SQL.
+
+    Pass ``next_cursor`` back as ``cursor`` for the following page. With
+    ``aggregate``, at most ``limit`` groups are returned; page back through
+    daily counts with ``end_date``.
+    """
+    if current_user.id is None:
+        raise HTTPException(status_code=400, detail="User ID is required")
+
+    if aggregate is not None:
+        groups = await subscription_service.aggregate_usage(
+            current_user.id,
+            aggregate.value,
+            limit,
+            feature_name=feature_name,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return UsageAggregateResponse(
+            aggregate=aggregate,
+            groups=[UsageGroupResponse.model_validate(group) for group in groups],
+        )
+
+    usage_logs, next_cursor = await subscription_service.list_usage_logs(
+        current_user.id,
+        limit,
+        cursor=cursor,
+        feature_name=feature_name,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    return UsageLogPage(
+        items=[UsageLogResponse.model_validate(log) for log in usage_logs],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/usage/summary", response_model=list[UsageSummaryResponse])
+async def get_usage_summary(
     current_user: User = Depends(get_current_active_user),
-    session: AsyncSession = Depends(get_session),
+    subscription_service: SubscriptionService = Depends(get_subscription_service),
 ):
-    statement = select(UsageLog).where(UsageLog.user_id == current_user.id)
-    result = await session.execute(statement)
-    usage_logs = result.scalars().all()
-    return [UsageLogResponse.model_validate(log) for log in usage_logs]
+    """Current-window usage and limit per feature, served from the daily rollups."""
+    if current_user.id is None:
+        raise HTTPException(status_code=400, detail="User ID is required")
+    summary = await subscription_service.get_usage_summary(current_user.id)
+    return [UsageSummaryResponse.model_validate(item) for item in summary]
 
 
 @router.post("/webhook")
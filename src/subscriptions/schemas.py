@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import StrEnum
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -19,6 +20,38 @@ class UsageLogResponse(BaseModel):
     id: UUID
     user_id: UUID
     feature_name: str
+    quantity: int
     timestamp: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UsageLogPage(BaseModel):
+    items: list[UsageLogResponse]
+    next_cursor: str | None = None
+
+
+class UsageAggregation(StrEnum):
+    DAY = "day"
+    FEATURE = "feature"
+
+
+class UsageGroupResponse(BaseModel):
+    group: str
+    count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UsageAggregateResponse(BaseModel):
+    aggregate: UsageAggregation
+    groups: list[UsageGroupResponse]
+
+
+class UsageSummaryResponse(BaseModel):
+    feature_name: str
+    period: str
+    used: int
+    limit: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,17 +1,74 @@
-from uuid import UUID
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+import logging
+from uuid import UUID, uuid4
 
+from redis.exceptions import RedisError
+from sqlalchemy import case, literal, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import func, select
 
-from src.core.exceptions import NotFoundError
-from src.core.metrics import subscriptions_active_total
-from src.subscriptions.models import Subscription, UsageLog
-from src.subscriptions.tiers import TIER_LIMITS, SubscriptionTier
+from src.core.batch_writer import BatchWriter
+from src.core.database import dialect_insert
+from src.core.exceptions import NotFoundError, UsageLimitExceededError
+from src.core.metrics import subscriptions_active_total, usage_counter_lookups_total
+from src.core.pagination import decode_cursor, encode_cursor
+from src.subscriptions.counters import (
+    UsageCounterStore,
+    get_usage_counter_store,
+    usage_counter_key,
+)
+from src.subscriptions.ingestion import get_usage_log_writer
+from src.subscriptions.models import Subscription, UsageCounter, UsageDaily, UsageLog
+from src.subscriptions.rollups import record_daily_usage
+from src.subscriptions.tiers import (
+    FEATURE_LIMITS,
+    TIER_LIMITS,
+    SubscriptionTier,
+    TierLimits,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows per upsert statement, well below the bind parameter limits
+RECONCILE_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class UsageReservation:
+    user_id: UUID
+    feature_name: str
+    period: str
+    count: int
+    quantity: int = 1
+
+
+@dataclass(frozen=True)
+class UsageGroup:
+    group: str
+    count: int
+
+
+@dataclass(frozen=True)
+class UsageSummary:
+    feature_name: str
+    period: str
+    used: int
+    limit: int
 
 
 class SubscriptionService:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        counters: UsageCounterStore | None = None,
+        usage_log_writer: BatchWriter | None = None,
+    ):
         self.session = session
+        self.counters = counters or get_usage_counter_store()
+        self.usage_log_writer = usage_log_writer or get_usage_log_writer()
 
     async def create_free_tier_for_user(self, user_id: UUID) -> Subscription:
         # Check if subscription already exists
@@ -35,32 +92,444 @@ class SubscriptionService:
         return result.scalar_one_or_none()
 
     async def check_usage_limit(self, user_id: UUID, feature_name: str) -> bool:
+        """Whether the user has quota left, without claiming any.
+
+        A read-only pre-check; metered calls are admitted atomically by
+        ``reserve_usage``.
+        """
         subscription = await self.get_subscription_by_user_id(user_id)
         if not subscription:
             raise NotFoundError("Subscription not found for user")
 
-        tier = SubscriptionTier(subscription.tier)
-        limits = TIER_LIMITS[tier]
+        limits = TIER_LIMITS[SubscriptionTier(subscription.tier)]
+        limit = limits.limit_for(feature_name)
+        period = limits.window.period(datetime.utcnow())
+        usage_count = await self.get_usage_count(user_id, feature_name, period)
+
+        return usage_count < limit
+
+    async def get_usage_count(
+        self, user_id: UUID, feature_name: str, period: str | None = None
+    ) -> int:
+        """Usage for the feature in ``period`` (default: the current window).
+
+        Read from the counter cache; a cold counter is seeded from the
+        ``usagecounter`` table, which is also read directly if Redis is
+        unavailable.
+        """
+        if period is None:
+            period = (await self._get_limits(user_id)).window.period(datetime.utcnow())
+
+        key = usage_counter_key(user_id, feature_name, period)
+        try:
+            cached = await self.counters.get(key)
+        except RedisError as e:
+            logger.warning(f"Usage counter store unavailable, using database: {e}")
+            usage_counter_lookups_total.labels(result="fallback").inc()
+            return await self._get_stored_count(user_id, feature_name, period)
+
+        if cached is not None:
+            usage_counter_lookups_total.labels(result="hit").inc()
+            return cached
+
+        usage_counter_lookups_total.labels(result="miss").inc()
+        usage_count = await self._get_stored_count(user_id, feature_name, period)
+        try:
+            await self.counters.seed(key, usage_count)
+        except RedisError as e:
+            logger.warning(f"Failed to seed usage counter {key}: {e}")
+        return usage_count
+
+    async def get_usage_summary(self, user_id: UUID) -> list[UsageSummary]:
+        """Usage of every metered feature in the current window, from the rollups."""
+        limits = await self._get_limits(user_id)
+        now = datetime.utcnow()
+
+        statement = (
+            select(UsageDaily.feature_name, func.sum(UsageDaily.count))
+            .where(UsageDaily.user_id == user_id)
+            .group_by(UsageDaily.feature_name)
+        )
+        window_start = limits.window.start(now)
+        if window_start is not None:
+            statement = statement.where(UsageDaily.day >= window_start)
+        result = await self.session.execute(statement)
+        used = dict(result.all())
+
+        return [
+            UsageSummary(
+                feature_name=feature_name,
+                period=limits.window.period(now),
+                used=used.get(feature_name, 0),
+                limit=limits.limit_for(feature_name),
+            )
+            for feature_name in FEATURE_LIMITS
+        ]
+
+    async def list_usage_logs(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+        feature_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> tuple[list[UsageLog], str | None]:
+        """One page of usage logs, newest first, keyset-paginated on (timestamp, id).
+
+        Returns the rows and the cursor for the next page (None on the last one).
+        """
+        statement = select(UsageLog).where(UsageLog.user_id == user_id)
+        if feature_name is not None:
+            statement = statement.where(UsageLog.feature_name == feature_name)
+        if start_date is not None:
+            statement = statement.where(
+                UsageLog.timestamp >= datetime.combine(start_date, time.min)
+            )
+        if end_date is not None:
+            statement = statement.where(
+                UsageLog.timestamp
+                < datetime.combine(end_date + timedelta(days=1), time.min)
+            )
+        if cursor is not None:
+            statement = statement.where(
+                tuple_(UsageLog.timestamp, UsageLog.id) < tuple_(*decode_cursor(cursor))
+            )
+        statement = statement.order_by(
+            UsageLog.timestamp.desc(),  # type: ignore[attr-defined]
+            UsageLog.id.desc(),  # type: ignore[union-attr]
+        ).limit(limit + 1)
 
-        # Map feature_name to limit attribute
-        if feature_name == "portfolio":
-            limit = limits.portfolio_limit
-        elif feature_name == "llm_requests":
-            limit = limits.llm_requests_limit
+        result = await self.session.execute(statement)
+        usage_logs = list(result.scalars().all())
+        if len(usage_logs) <= limit:
+            return usage_logs, None
+        usage_logs = usage_logs[:limit]
+        last = usage_logs[-1]
+        return usage_logs, encode_cursor(last.timestamp, last.id)
+
+    async def aggregate_usage(
+        self,
+        user_id: UUID,
+        by: str,
+        limit: int,
+        feature_name: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[UsageGroup]:
+        """Usage counts grouped by ``"day"`` (newest first) or ``"feature"``.
+
+        Grouped in SQL over the daily rollups, so the cost depends on the
+        number of days in range rather than the number of events.
+        """
+        if by == "day":
+            column = UsageDaily.day
+            order_by = UsageDaily.day.desc()  # type: ignore[attr-defined]
+        elif by == "feature":
+            column = UsageDaily.feature_name
+            order_by = UsageDaily.feature_name
         else:
-            raise ValueError(f"Unknown feature: {feature_name}")
+            raise ValueError(f"Unknown aggregation: {by}")
 
-        # Count usage
-        statement = select(func.count(UsageLog.id)).where(  # type: ignore
-            UsageLog.user_id == user_id, UsageLog.feature_name == feature_name
+        statement = select(column, func.sum(UsageDaily.count)).where(
+            UsageDaily.user_id == user_id
         )
+        if feature_name is not None:
+            statement = statement.where(UsageDaily.feature_name == feature_name)
+        if start_date is not None:
+            statement = statement.where(UsageDaily.day >= start_date)
+        if end_date is not None:
+            statement = statement.where(UsageDaily.day <= end_date)
+        statement = statement.group_by(column).order_by(order_by).limit(limit)
+
         result = await self.session.execute(statement)
-        usage_count = result.scalar() or 0
+        return [
+            UsageGroup(
+                group=key.isoformat() if isinstance(key, date) else key,
+                count=usage_count,
+            )
+            for key, usage_count in result.all()
+        ]
 
-        return usage_count < limit
+    async def log_usage(self, user_id: UUID, feature_name: str, quantity: int = 1):
+        """Record ``quantity`` units of usage without checking the limit.
+
+        Usage known after a reserved call has run goes through
+        ``charge_usage`` instead, which skips the tier lookup and commit.
+        """
+        period = (await self._get_limits(user_id)).window.period(datetime.utcnow())
+        await self._add_usage_log(user_id, feature_name, quantity)
+        await self._increment_stored_count(user_id, feature_name, period, quantity)
+        await self.session.commit()
+
+        await self._adjust_cached_count(user_id, feature_name, period, quantity)
+
+    async def reserve_usage(
+        self, user_id: UUID, feature_name: str, quantity: int = 1
+    ) -> UsageReservation:
+        """Claim ``quantity`` units of quota, or raise ``UsageLimitExceededError``.
+
+        The tier lookup, limit check and increment are a single conditional
+        upsert on ``usagecounter``, so concurrent requests cannot overshoot the
+        limit; a batch is admitted whole or not at all. Follow up with
+        ``commit_usage`` or ``release_usage``.
+        """
+        if quantity < 1:
+            raise ValueError("quantity must be positive")
+        now = datetime.utcnow()
+        tier_limit = case(
+            {
+                tier.value: limits.limit_for(feature_name)
+                for tier, limits in TIER_LIMITS.items()
+            },
+            value=Subscription.tier,
+            else_=0,
+        )
+        tier_period = case(
+            {
+                tier.value: limits.window.period(now)
+                for tier, limits in TIER_LIMITS.items()
+            },
+            value=Subscription.tier,
+        )
+        subscription_limit = (
+            select(tier_limit)
+            .where(Subscription.user_id == user_id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        insert = dialect_insert(self.session, UsageCounter).from_select(
+            ["user_id", "feature_name", "period", "count"],
+            select(
+                Subscription.user_id,
+                literal(feature_name),
+                tier_period,
+                literal(quantity),
+            )
+            .where(Subscription.user_id == user_id, tier_limit >= quantity)
+            .limit(1),
+        )
+        statement = insert.on_conflict_do_update(
+            index_elements=["user_id", "feature_name", "period"],
+            set_={"count": UsageCounter.count + quantity},
+            where=UsageCounter.count + quantity <= subscription_limit,
+        ).returning(UsageCounter.count, UsageCounter.period)
+
+        result = await self.session.execute(statement)
+        row = result.first()
+        await self.session.commit()
+
+        if row is None:
+            if not await self.get_subscription_by_user_id(user_id):
+                raise NotFoundError("Subscription not found for user")
+            raise UsageLimitExceededError()
+
+        usage_count, period = row
+        await self._adjust_cached_count(user_id, feature_name, period, quantity)
+        return UsageReservation(
+            user_id=user_id,
+            feature_name=feature_name,
+            period=period,
+            count=usage_count,
+            quantity=quantity,
+        )
+
+    async def commit_usage(self, reservation: UsageReservation) -> None:
+        """Record the usage event for a reservation; the counter is already up to date."""
+        await self._add_usage_log(
+            reservation.user_id, reservation.feature_name, reservation.quantity
+        )
+        await self.session.commit()
+
+    async def charge_usage(
+        self, reservation: UsageReservation, feature_name: str, quantity: int
+    ) -> None:
+        """Add usage only known once the reserved call has run, such as LLM tokens.
+
+        It is counted in the reservation's window, so the tier is not looked
+        up again. The counter increment is staged on the session and lands
+        with ``commit_usage`` or ``release_usage``; the event goes through the
+        same write-behind path as the reservation's own.
+        """
+        await self._add_usage_log(reservation.user_id, feature_name, quantity)
+        await self._increment_stored_count(
+            reservation.user_id, feature_name, reservation.period, quantity
+        )
+        await self._adjust_cached_count(
+            reservation.user_id, feature_name, reservation.period, quantity
+        )
+
+    async def release_usage(self, reservation: UsageReservation) -> None:
+        """Give back reserved quota after the metered call failed."""
+        await self.session.execute(
+            update(UsageCounter)
+            .where(
+                UsageCounter.user_id == reservation.user_id,  # type: ignore[arg-type]
+                UsageCounter.feature_name == reservation.feature_name,  # type: ignore[arg-type]
+                UsageCounter.period == reservation.period,  # type: ignore[arg-type]
+                UsageCounter.count >= reservation.quantity,  # type: ignore[arg-type]
+            )
+            .values(count=UsageCounter.count - reservation.quantity)
+        )
+        await self.session.commit()
+        await self._adjust_cached_count(
+            reservation.user_id,
+            reservation.feature_name,
+            reservation.period,
+            -reservation.quantity,
+        )
 
-    async def log_usage(self, user_id: UUID, feature_name: str):
-        usage_log = UsageLog(user_id=user_id, feature_name=feature_name)
-        self.session.add(usage_log)
+    @asynccontextmanager
+    async def metered(
+        self, user_id: UUID, feature_name: str, quantity: int = 1
+    ) -> AsyncIterator[UsageReservation]:
+        """Reserve quota around a metered call, releasing it if the call fails."""
+        reservation = await self.reserve_usage(user_id, feature_name, quantity)
+        try:
+            yield reservation
+        except BaseException:
+            await self.session.rollback()
+            await self.release_usage(reservation)
+            raise
+        await self.commit_usage(reservation)
+
+    async def reconcile_usage_counters(self) -> int:
+        """Bring current-window counters up to the daily rollups.
+
+        The window is still open, so a counter may be ahead of the rollups by
+        reservations in flight and events not yet flushed; it is only ever
+        raised. Returns how many counters were written.
+        """
+        now = datetime.utcnow()
+        rows = []
+        for window in {limits.window for limits in TIER_LIMITS.values()}:
+            statement = select(
+                UsageDaily.user_id,
+                UsageDaily.feature_name,
+                func.sum(UsageDaily.count),
+            ).group_by(UsageDaily.user_id, UsageDaily.feature_name)
+            window_start = window.start(now)
+            if window_start is not None:
+                statement = statement.where(UsageDaily.day >= window_start)
+            result = await self.session.execute(statement)
+            rows.extend(
+                {
+                    "user_id": user_id,
+                    "feature_name": feature_name,
+                    "period": window.period(now),
+                    "count": usage_count,
+                }
+                for user_id, feature_name, usage_count in result.all()
+            )
+        if not rows:
+            return 0
+
+        reconciled = {}
+        for start in range(0, len(rows), RECONCILE_BATCH_SIZE):
+            insert = dialect_insert(self.session, UsageCounter).values(
+                rows[start : start + RECONCILE_BATCH_SIZE]
+            )
+            result = await self.session.execute(
+                insert.on_conflict_do_update(
+                    index_elements=["user_id", "feature_name", "period"],
+                    set_={
+                        "count": case(
+                            (
+                                UsageCounter.count > insert.excluded.count,
+                                UsageCounter.count,
+                            ),
+                            else_=insert.excluded.count,
+                        )
+                    },
+                ).returning(
+                    UsageCounter.user_id,
+                    UsageCounter.feature_name,
+                    UsageCounter.period,
+                    UsageCounter.count,
+                )
+            )
+            reconciled.update(
+                {
+                    usage_counter_key(user_id, feature_name, period): usage_count
+                    for user_id, feature_name, period, usage_count in result.all()
+                }
+            )
         await self.session.commit()
-        await self.session.refresh(usage_log)
+
+        await self.counters.set_many(reconciled)
+        return len(rows)
+
+    async def _get_limits(self, user_id: UUID) -> TierLimits:
+        subscription = await self.get_subscription_by_user_id(user_id)
+        tier = SubscriptionTier(subscription.tier) if subscription else None
+        return TIER_LIMITS[tier or SubscriptionTier.FREE]
+
+    async def _add_usage_log(
+        self, user_id: UUID, feature_name: str, quantity: int = 1
+    ) -> None:
+        """Hand the event to the write-behind buffer, or stage it on the session.
+
+        The buffer only runs inside the API process (see ``lifespan``); Celery
+        tasks, scripts and tests write through the session as before, updating
+        the daily rollups in the same transaction.
+        """
+        timestamp = datetime.utcnow()
+        if self.usage_log_writer.running:
+            self.usage_log_writer.enqueue(
+                {
+                    "id": uuid4(),
+                    "user_id": user_id,
+                    "feature_name": feature_name,
+                    "quantity": quantity,
+                    "timestamp": timestamp,
+                }
+            )
+            return
+
+        self.session.add(
+            UsageLog(
+                user_id=user_id,
+                feature_name=feature_name,
+                quantity=quantity,
+                timestamp=timestamp,
+            )
+        )
+        await record_daily_usage(
+            self.session, [(user_id, feature_name, timestamp, quantity)]
+        )
+
+    async def _get_stored_count(
+        self, user_id: UUID, feature_name: str, period: str
+    ) -> int:
+        statement = select(UsageCounter.count).where(
+            UsageCounter.user_id == user_id,
+            UsageCounter.feature_name == feature_name,
+            UsageCounter.period == period,
+        )
+        result = await self.session.execute(statement)
+        return result.scalar() or 0
+
+    async def _increment_stored_count(
+        self, user_id: UUID, feature_name: str, period: str, amount: int = 1
+    ) -> None:
+        insert = dialect_insert(self.session, UsageCounter).values(
+            user_id=user_id,
+            feature_name=feature_name,
+            period=period,
+            count=amount,
+        )
+        await self.session.execute(
+            insert.on_conflict_do_update(
+                index_elements=["user_id", "feature_name", "period"],
+                set_={"count": UsageCounter.count + amount},
+            )
+        )
+
+    async def _adjust_cached_count(
+        self, user_id: UUID, feature_name: str, period: str, amount: int
+    ) -> None:
+        key = usage_counter_key(user_id, feature_name, period)
+        try:
+            await self.counters.incr(key, amount)
+        except RedisError as e:
+            logger.warning(f"Failed to update usage counter {key}: {e}")
@@ -1,16 +1,22 @@
 import asyncio
+from datetime import date, timedelta
 import logging
 from typing import Any
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from src.core.celery_app import celery_app
 from src.core.database import AsyncSessionLocal
 from src.subscriptions.models import Subscription
+from src.subscriptions.services import SubscriptionService
 
 logger = logging.getLogger(__name__)
 
+# Monthly usagelog partitions to keep ready beyond the current month
+USAGE_LOG_PARTITIONS_AHEAD = 2
+
 
 @celery_app.task(bind=True, max_retries=3)
 def process_stripe_event(self, event_data: dict[str, Any]) -> str:
@@ -27,6 +33,87 @@ def process_stripe_event(self, event_data: dict[str, Any]) -> str:
         raise self.retry(countdown=60 * (2**self.request.retries), exc=exc) from exc
 
 
+@celery_app.task(bind=True, max_retries=3)
+def reconcile_usage_counters(self) -> str:
+    """
+    Raise the usage counters (database table and Redis) to the usagedaily
+    rollups.
+    Runs periodically via Celery beat to repair drift, e.g. after a Redis
+    flush or a failed counter increment. Counters are never lowered.
+    """
+    try:
+        return asyncio.run(_reconcile_usage_counters_async())
+    except Exception as exc:
+        logger.error(f"Error reconciling usage counters: {exc}")
+        raise self.retry(countdown=60 * (2**self.request.retries), exc=exc) from exc
+
+
+async def _reconcile_usage_counters_async() -> str:
+    async with AsyncSessionLocal() as session:
+        reconciled = await SubscriptionService(session).reconcile_usage_counters()
+
+    logger.info(f"Reconciled {reconciled} usage counters")
+    return f"Reconciled {reconciled} usage counters"
+
+
+@celery_app.task(bind=True, max_retries=3)
+def ensure_usage_log_partitions(self) -> str:
+    """
+    Create the monthly usagelog partitions for the current and coming months.
+    Idempotent; rows outside any partition land in usagelog_default and are
+    moved into their month's partition when it is created.
+    """
+    try:
+        return asyncio.run(_ensure_usage_log_partitions_async())
+    except Exception as exc:
+        logger.error(f"Error creating usagelog partitions: {exc}")
+        raise self.retry(countdown=60 * (2**self.request.retries), exc=exc) from exc
+
+
+async def _ensure_usage_log_partitions_async() -> str:
+    async with AsyncSessionLocal() as session:
+        if session.bind.dialect.name != "postgresql":
+            return "Skipped: usagelog is only partitioned on PostgreSQL"
+
+        month = date.today().replace(day=1)
+        for _ in range(USAGE_LOG_PARTITIONS_AHEAD + 1):
+            next_month = (month + timedelta(days=32)).replace(day=1)
+            partition = f"usagelog_{month:%Y_%m}"
+            exists = await session.scalar(
+                text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partition}
+            )
+            if not exists:
+                # CREATE ... PARTITION OF fails while usagelog_default holds
+                # rows in the new range, so build the table, move those rows
+                # into it and attach it in one transaction
+                await session.execute(
+                    text(
+                        f"CREATE TABLE {partition} "
+                        f"(LIKE usagelog INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                    )
+                )
+                await session.execute(
+                    text(
+                        f"WITH moved AS ("
+                        f"DELETE FROM usagelog_default "
+                        f"WHERE timestamp >= '{month}' AND timestamp < '{next_month}' "
+                        f"RETURNING *"
+                        f") INSERT INTO {partition} SELECT * FROM moved"
+                    )
+                )
+                await session.execute(
+                    text(
+                        f"ALTER TABLE usagelog ATTACH PARTITION {partition} "
+                        f"FOR VALUES FROM ('{month}') TO ('{next_month}')"
+                    )
+                )
+            month = next_month
+        await session.commit()
+
+    logger.info(f"Ensured usagelog partitions up to {month:%Y-%m}")
+    return f"Ensured usagelog partitions up to {month:%Y-%m}"
+
+
 async def _process_event_async(event_data: dict[str, Any]) -> str:
     event_id = event_data.get("id")
     event_type = event_data.get("type")
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -7,13 +8,63 @@ class SubscriptionTier(Enum):
     PREMIUM = "premium"
 
 
+class UsageWindow(Enum):
+    """Time window a usage limit applies to."""
+
+    MONTH = "month"
+    LIFETIME = "lifetime"
+
+    def period(self, at: datetime) -> str:
+        """Counter period key for the window containing ``at``, e.g. ``2024-01``."""
+        if self is UsageWindow.MONTH:
+            return at.strftime("%Y-%m")
+        return "all"
+
+    def start(self, at: datetime) -> date | None:
+        """First day of the window containing ``at`` (None for lifetime)."""
+        if self is UsageWindow.MONTH:
+            return at.date().replace(day=1)
+        return None
+
+
+# Metered feature name -> TierLimits attribute
+FEATURE_LIMITS = {
+    "portfolio": "portfolio_limit",
+    "llm_requests": "llm_requests_limit",
+    # Prompt plus completion tokens, charged after each call
+    "llm_tokens": "llm_tokens_limit",
+    # Value-at-Risk / CVaR simulations
+    "risk_var": "risk_var_limit",
+}
+
+
 @dataclass
 class TierLimits:
     portfolio_limit: int
     llm_requests_limit: int
+    llm_tokens_limit: int
+    risk_var_limit: int
+    requests_per_minute: int = 100
+    window: UsageWindow = field(default=UsageWindow.MONTH)
+
+    def limit_for(self, feature_name: str) -> int:
+        if feature_name not in FEATURE_LIMITS:
+            raise ValueError(f"Unknown feature: {feature_name}")
+        return getattr(self, FEATURE_LIMITS[feature_name])
 
 
 TIER_LIMITS = {
-    SubscriptionTier.FREE: TierLimits(portfolio_limit=5, llm_requests_limit=10),
-    SubscriptionTier.PREMIUM: TierLimits(portfolio_limit=100, llm_requests_limit=1000),
+    SubscriptionTier.FREE: TierLimits(
+        portfolio_limit=5,
+        llm_requests_limit=10,
+        llm_tokens_limit=50_000,
+        risk_var_limit=3,
+    ),
+    SubscriptionTier.PREMIUM: TierLimits(
+        portfolio_limit=100,
+        llm_requests_limit=1000,
+        llm_tokens_limit=5_000_000,
+        risk_var_limit=50,
+        requests_per_minute=1000,
+    ),
 }
@@ -4,8 +4,9 @@ from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from src.auth.principals import get_principal_cache
 from src.core.exceptions import NotFoundError, ValidationError
-from src.core.security import get_password_hash
+from src.core.security import hash_password
 from src.subscriptions.models import Subscription
 from src.subscriptions.services import SubscriptionService
 from src.users.models import User
@@ -24,7 +25,7 @@ class UserService:
 
         user = User(
             email=user_create.email,
-            hashed_password=get_password_hash(user_create.password),
+            hashed_password=await hash_password(user_create.password),
         )
         self.session.add(user)
         await self.session.commit()
@@ -59,6 +60,7 @@ class UserService:
 
         user.updated_at = datetime.utcnow()
         await self.session.commit()
+        await get_principal_cache().invalidate(user_id)
         await self.session.refresh(user)
         return user
 
@@ -74,4 +76,5 @@ class UserService:
         await self.session.execute(stmt)
         await self.session.delete(user)
         await self.session.commit()
+        await get_principal_cache().invalidate(user_id)
         return True
@@ -14,7 +14,9 @@ os.environ["REDIS_URL"] = "redis://fake-redis:6379"
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///./test.db"
 os.environ["ENVIRONMENT"] = "development"
 
-from src.core.database import get_session
+from src.core.database import get_session, get_session_factory
+from src.core.rate_limit import get_token_bucket_store
+from src.llm.cache import get_response_cache
 from src.main import app
 
 # Test database
@@ -83,7 +85,7 @@ async def test_session(test_engine):
 
 
 @pytest_asyncio.fixture
-async def client(test_session):
+async def client(test_session, test_engine):
     logger.debug(
         f"client: Starting fixture, event loop: {id(asyncio.get_running_loop())}"
     )
@@ -92,6 +94,12 @@ async def client(test_session):
         yield test_session
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_session_factory] = lambda: async_sessionmaker(
+        test_engine, expire_on_commit=False
+    )
+    # Rate limit buckets are process-wide; start every test with full buckets
+    get_token_bucket_store.cache_clear()
+    get_response_cache.cache_clear()
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
@@ -0,0 +1,92 @@
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from httpx import AsyncClient
+import jwt
+import pytest
+
+from src.core.keyring import Keyring, load_key
+
+
+def _pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def _public_pem(private_key) -> str:
+    return (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+
+
+def test_keyring_rotation_and_jwks():
+    """Test that tokens from a retired key still verify and JWKS verifies them"""
+    old_private = ed25519.Ed25519PrivateKey.generate()
+    new_private = ec.generate_private_key(ec.SECP256R1())
+
+    old_ring = Keyring(
+        [load_key({"kid": "old", "alg": "EdDSA", "private_key": _pem(old_private)})],
+        active_kid="old",
+    )
+    old_token = old_ring.sign({"sub": "user"})
+    assert jwt.get_unverified_header(old_token)["kid"] == "old"
+
+    ring = Keyring(
+        [
+            load_key({"kid": "new", "alg": "ES256", "private_key": _pem(new_private)}),
+            load_key(
+                {"kid": "old", "alg": "EdDSA", "public_key": _public_pem(old_private)}
+            ),
+        ],
+        active_kid="new",
+    )
+    new_token = ring.sign({"sub": "user"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert ring.verify(old_token)["sub"] == "user"
+    assert ring.verify(new_token)["sub"] == "user"
+
+    # Unkeyed and unknown-kid tokens are refused when there is no fallback key
+    with pytest.raises(jwt.InvalidTokenError):
+        ring.verify(jwt.encode({"sub": "user"}, "x" * 32, algorithm="HS256"))
+
+    jwks = ring.jwks()
+    assert {key["kid"] for key in jwks["keys"]} == {"new", "old"}
+    assert all("d" not in key for key in jwks["keys"])
+
+    # A third party verifies with nothing but the published document
+    key_set = jwt.PyJWKSet.from_dict(jwks)
+    for token in (old_token, new_token):
+        header = jwt.get_unverified_header(token)
+        signing_key = key_set[header["kid"]]
+        payload = jwt.decode(token, signing_key, algorithms=[header["alg"]])
+        assert payload["sub"] == "user"
+
+
+def test_public_only_key_cannot_be_active():
+    """Test that the active key must be able to sign"""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    with pytest.raises(ValueError):
+        Keyring(
+            [
+                load_key(
+                    {"kid": "k", "alg": "ES256", "public_key": _public_pem(private_key)}
+                )
+            ],
+            active_kid="k",
+        )
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint(client: AsyncClient):
+    """Test that the JWKS document is published (empty for HMAC-only setups)"""
+    response = await client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+    assert "max-age" in response.headers["cache-control"]
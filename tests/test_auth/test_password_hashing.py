@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+from httpx import AsyncClient
+from passlib.context import CryptContext  # type: ignore
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.exceptions import ServiceOverloadedError
+from src.core.security import PasswordHasher, hash_password, verify_and_update_password
+from src.users.models import User
+
+
+@pytest.mark.asyncio
+async def test_hashing_does_not_block_event_loop():
+    """Test that other coroutines keep running while bcrypt works"""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    hashed = await hash_password("testpassword123")
+    task.cancel()
+
+    assert ticks >= 3
+    assert await verify_and_update_password("testpassword123", hashed) == (True, None)
+    assert (await verify_and_update_password("wrong", hashed))[0] is False
+
+
+@pytest.mark.asyncio
+async def test_hasher_refuses_work_beyond_max_pending():
+    """Test admission control on the password hashing pool"""
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    try:
+        slow_job = asyncio.create_task(hasher._run(time.sleep, 0.2))
+        await asyncio.sleep(0)
+        assert hasher.pending == 1
+
+        with pytest.raises(ServiceOverloadedError):
+            await hasher.hash("testpassword123")
+
+        await slow_job
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password_hash(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that a hash made with a different bcrypt cost is replaced on login"""
+    user_data = {"email": "rehash@example.com", "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+
+    result = await test_session.execute(
+        select(User).where(User.email == user_data["email"])
+    )
+    user = result.scalar_one()
+    weak_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    user.hashed_password = weak_context.hash(user_data["password"])
+    await test_session.commit()
+
+    response = await client.post("/auth/login", json=user_data)
+    assert response.status_code == 200
+
+    await test_session.refresh(user)
+    assert not user.hashed_password.startswith("$2b$04$")
+    is_valid, new_hash = await verify_and_update_password(
+        user_data["password"], user.hashed_password
+    )
+    assert is_valid and new_hash is None
@@ -0,0 +1,88 @@
+from uuid import UUID
+
+from httpx import AsyncClient
+import pytest
+
+from src.auth.principals import CachedUser, InMemoryPrincipalCache, get_principal_cache
+from src.core.security import create_access_token, decode_token
+from src.users.service import UserService
+
+
+@pytest.mark.asyncio
+async def test_in_memory_principal_cache_evicts_least_recently_used():
+    """Test that the local tier is bounded and evicts the oldest entry"""
+    cache = InMemoryPrincipalCache(max_entries=2, ttl_seconds=60)
+    principals = [
+        CachedUser.model_validate(
+            {
+                "id": UUID(int=i),
+                "email": f"user{i}@example.com",
+                "created_at": "2024-01-01T00:00:00",
+            }
+        )
+        for i in range(3)
+    ]
+
+    await cache.set(principals[0])
+    await cache.set(principals[1])
+    assert await cache.get(principals[0].id) == principals[0]
+    await cache.set(principals[2])
+
+    assert await cache.get(principals[1].id) is None
+    assert await cache.get(principals[0].id) == principals[0]
+    user = principals[2].to_user()
+    assert user.id == UUID(int=2) and user.email == "user2@example.com"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_current_user_is_cached_until_updated(client: AsyncClient, monkeypatch):
+    """Test that authenticated requests skip the user query until the user changes"""
+    user_data = {"email": "cached@example.com", "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+    user_id = UUID(response.json()["id"])
+
+    login_response = await client.post("/auth/login", json=user_data)
+    token = login_response.json()["access_token"]
+    claims = decode_token(token)
+    assert claims is not None
+    assert claims["sub"] == str(user_id)
+    assert claims["active"] is True
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert await get_principal_cache().get(user_id) is not None
+
+    async def unexpected_lookup(self, user_id):
+        raise AssertionError("user should be served from the principal cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(UserService, "get_user_by_id", unexpected_lookup)
+        response = await client.get("/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == "cached@example.com"
+
+    response = await client.put(f"/users/{user_id}", json={"is_active": False})
+    assert response.status_code == 200
+    assert await get_principal_cache().get(user_id) is None
+
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_email_subject_tokens_still_resolve(client: AsyncClient):
+    """Test that tokens issued with the email as subject keep working"""
+    user_data = {"email": "legacytoken@example.com", "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+
+    token = create_access_token(subject=user_data["email"])
+    response = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["email"] == user_data["email"]
@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+from httpx import AsyncClient
+import pytest
+
+from src.auth.revocation import BloomFilter
+
+
+async def _login(client: AsyncClient, email: str) -> dict:
+    user_data = {"email": email, "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+
+    response = await client.post("/auth/login", json=user_data)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added id is reported present and most others are not"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [uuid4().hex for _ in range(1000)]
+    for token_id in added:
+        bloom.add(token_id)
+
+    assert all(token_id in bloom for token_id in added)
+    false_positives = sum(uuid4().hex in bloom for _ in range(1000))
+    assert false_positives < 50
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_refresh_rotates_tokens(client: AsyncClient):
+    """Test that a refresh token is single-use and replay revokes its family"""
+    tokens = await _login(client, "refresh@example.com")
+    assert tokens["refresh_token"]
+
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    response = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}
+    )
+    assert response.status_code == 200
+
+    # Replaying the spent token is refused and takes the rotated one down too
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": rotated["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_refresh_token_is_not_an_access_token(client: AsyncClient):
+    """Test that refresh tokens are rejected as bearer credentials"""
+    tokens = await _login(client, "refreshbearer@example.com")
+
+    response = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {tokens['refresh_token']}"}
+    )
+    assert response.status_code == 401
+
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["access_token"]}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token(client: AsyncClient):
+    """Test that logging out ends the refresh token family"""
+    tokens = await _login(client, "logout@example.com")
+
+    response = await client.post(
+        "/auth/logout", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
@@ -0,0 +1,68 @@
+from httpx import AsyncClient
+import pytest
+
+from src.core.config import settings
+from src.core.rate_limit import InMemoryTokenBucketStore
+from src.subscriptions.tiers import TIER_LIMITS, SubscriptionTier
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_refuses_when_empty():
+    """Test that a bucket allows its capacity and then asks the caller to wait"""
+    store = InMemoryTokenBucketStore()
+
+    assert (await store.take("bucket", capacity=2, refill_per_second=1)).allowed
+    assert (await store.take("bucket", capacity=2, refill_per_second=1)).allowed
+    result = await store.take("bucket", capacity=2, refill_per_second=1)
+    assert not result.allowed
+    assert 0 < result.retry_after <= 1
+    assert (await store.take("other", capacity=2, refill_per_second=1)).allowed
+
+
+@pytest.mark.asyncio
+async def test_anonymous_requests_are_limited_per_address(
+    client: AsyncClient, monkeypatch
+):
+    """Test that anonymous callers get 429 with Retry-After once over the limit"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_TIMES", 2)
+
+    assert (await client.get("/")).status_code == 200
+    # CORS preflights are answered before the limiter and cost nothing
+    preflight = await client.options(
+        "/",
+        headers={
+            "Origin": "https://app.example.com",
+            "Access-Control-Request-Method": "GET",
+        },
+    )
+    assert preflight.status_code == 200
+    assert (await client.get("/")).status_code == 200
+    response = await client.get("/", headers={"Origin": "https://app.example.com"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.json()["error"] == "Rate limit exceeded"
+    # Browsers can read the 429
+    assert "access-control-allow-origin" in response.headers
+
+    # Health probes are never limited
+    assert (await client.get("/health/")).status_code != 429
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_authenticated_requests_use_tier_bucket(client: AsyncClient, monkeypatch):
+    """Test that users are limited by their own tier bucket, not their address"""
+    user_data = {"email": "ratelimit@example.com", "password": "testpassword123"}
+    await client.post("/users/", json=user_data)
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_TIMES", 1)
+    monkeypatch.setattr(TIER_LIMITS[SubscriptionTier.FREE], "requests_per_minute", 3)
+
+    for _i in range(3):
+        response = await client.get("/auth/me", headers=headers)
+        assert response.status_code == 200
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 429
+    assert response.headers["x-ratelimit-limit"] == "3"
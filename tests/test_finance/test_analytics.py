@@ -0,0 +1,176 @@
+from httpx import AsyncClient
+import numpy as np
+import pytest
+
+from src.finance.analytics import estimate_covariance, portfolio_metrics
+
+
+def _returns(observations: int, assets: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0004, 0.01, size=(observations, 1))
+    return market + rng.normal(0.0002, 0.015, size=(observations, assets))
+
+
+def test_ledoit_wolf_matches_the_reference_formula():
+    """Test the factored shrinkage estimate against a direct computation"""
+    returns = _returns(60, 120)
+    estimate = estimate_covariance(returns)
+
+    x = returns - returns.mean(axis=0)
+    t, m = x.shape
+    sample = x.T @ x / t
+    mu = np.trace(sample) / m
+    d2 = np.sum((sample - mu * np.eye(m)) ** 2)
+    b2 = sum(np.sum((np.outer(row, row) - sample) ** 2) for row in x) / t**2
+    expected = min(b2, d2) / d2
+
+    assert estimate.shrinkage == pytest.approx(expected)
+    assert 0 < estimate.shrinkage < 1
+    sigma = estimate.matrix()
+    np.testing.assert_allclose(
+        sigma, (1 - expected) * sample + expected * mu * np.eye(m)
+    )
+    # More assets than observations: the sample covariance is singular, the
+    # shrunk one is not
+    assert np.linalg.eigvalsh(sigma).min() > 0
+
+    weights = np.random.default_rng(1).dirichlet(np.ones(m), size=3)
+    np.testing.assert_allclose(
+        estimate.quadratic_form(weights),
+        np.einsum("nm,mk,nk->n", weights, sigma, weights),
+    )
+
+
+def test_portfolio_metrics():
+    """Test metrics against NumPy's sample covariance and the benchmark itself"""
+    returns = _returns(250, 4)
+    weights = np.array([0.4, 0.3, 0.2, 0.1])
+    covariance = estimate_covariance(returns, "sample")
+    metrics = portfolio_metrics(
+        returns, weights, risk_free_rate=0.02, covariance=covariance
+    )
+
+    variance = weights @ np.cov(returns, rowvar=False) @ weights * 252
+    assert metrics.variance[0] == pytest.approx(variance)
+    assert metrics.expected_return[0] == pytest.approx((returns @ weights).mean() * 252)
+    assert metrics.sharpe_ratio[0] == pytest.approx(
+        (metrics.expected_return[0] - 0.02) / np.sqrt(variance)
+    )
+    assert metrics.beta is None
+
+    # Stacked portfolios; the second one is the benchmark itself
+    benchmark = returns @ weights
+    stacked = np.array([[1.0, 0.0, 0.0, 0.0], weights])
+    metrics = portfolio_metrics(returns, stacked, benchmark=benchmark)
+    assert metrics.beta is not None and metrics.tracking_error is not None
+    assert metrics.beta[1] == pytest.approx(1.0)
+    assert metrics.tracking_error[1] == pytest.approx(0.0)
+    assert metrics.tracking_error[0] > 0
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_analyze_portfolio_with_return_history(client: AsyncClient):
+    """Test the analyze endpoint with return series, and without them"""
+    user_data = {"email": "analytics@example.com", "password": "testpassword123"}
+    await client.post("/users/", json=user_data)
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    returns = _returns(30, 2)
+    portfolio = {
+        "assets": [
+            {"symbol": "AAPL", "weight": 0.6, "returns": returns[:, 0].tolist()},
+            {"symbol": "MSFT", "weight": 0.4, "returns": returns[:, 1].tolist()},
+        ],
+        "benchmark_returns": returns.mean(axis=1).tolist(),
+    }
+    response = await client.post(
+        "/finance/portfolio/analyze", json=portfolio, headers=headers
+    )
+    assert response.status_code == 200
+    analysis = response.json()["analysis"]
+    assert analysis["observations"] == 30
+    assert analysis["volatility"] > 0
+    assert {"beta", "tracking_error", "shrinkage"} <= set(analysis)
+
+    response = await client.post(
+        "/finance/portfolio/analyze",
+        json={"assets": [{"symbol": "AAPL", "weight": 1.0, "price": 150.0}]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert "message" in response.json()["analysis"]
+
+    portfolio["assets"][1]["returns"] = portfolio["assets"][1]["returns"][:-1]
+    response = await client.post(
+        "/finance/portfolio/analyze", json=portfolio, headers=headers
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_analyze_portfolio_batch(client: AsyncClient):
+    """Test that a batch matches single analyses and is charged per portfolio"""
+    user_data = {"email": "batch@example.com", "password": "testpassword123"}
+    await client.post("/users/", json=user_data)
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    returns = _returns(40, 3)
+    universe = [
+        {"symbol": symbol, "returns": returns[:, i].tolist()}
+        for i, symbol in enumerate(["AAPL", "MSFT", "SPY"])
+    ]
+    batch = {
+        "universe": universe,
+        "portfolios": [
+            {"name": "balanced", "weights": [0.4, 0.4, 0.2]},
+            {"name": "index", "weights": [0.0, 0.0, 1.0]},
+            {"weights": [0.5, 0.5, 0.0]},
+        ],
+        "risk_free_rate": 0.02,
+    }
+    response = await client.post(
+        "/finance/portfolio/analyze/batch", json=batch, headers=headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["analysis"]["observations"] == 40
+    assert body["analysis"]["portfolios_count"] == 3
+    assert [r["name"] for r in body["results"]] == ["balanced", "index", None]
+
+    single = {
+        "assets": [
+            {**asset, "weight": weight}
+            for asset, weight in zip(universe, [0.4, 0.4, 0.2], strict=True)
+        ],
+        "risk_free_rate": 0.02,
+    }
+    response = await client.post(
+        "/finance/portfolio/analyze", json=single, headers=headers
+    )
+    analysis = response.json()["analysis"]
+    for metric in ("expected_return", "volatility", "sharpe_ratio"):
+        assert body["results"][0][metric] == pytest.approx(analysis[metric])
+
+    # Three batched portfolios plus one single analysis
+    response = await client.get("/subscriptions/usage/summary", headers=headers)
+    (portfolio_usage,) = [
+        item for item in response.json() if item["feature_name"] == "portfolio"
+    ]
+    assert portfolio_usage["used"] == 4
+
+    # Invalid weights are rejected before any quota is reserved; a valid batch
+    # larger than the remaining quota is rejected whole
+    batch["portfolios"][2]["weights"] = [0.5, 0.6, 0.0]
+    response = await client.post(
+        "/finance/portfolio/analyze/batch", json=batch, headers=headers
+    )
+    assert response.status_code == 422
+    batch["portfolios"][2]["weights"] = [0.5, 0.5, 0.0]
+    response = await client.post(
+        "/finance/portfolio/analyze/batch", json=batch, headers=headers
+    )
+    assert "Usage limit exceeded" in response.json()["detail"]
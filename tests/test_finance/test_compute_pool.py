@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from src.core.exceptions import ComputeTimeoutError, ServiceOverloadedError
+from src.finance.compute import SHARED_MEMORY_MIN_BYTES, ComputePool
+
+
+def _describe(array: np.ndarray) -> tuple[bool, float]:
+    return array.flags.writeable, float(array.sum())
+
+
+@pytest.fixture
+def pool():
+    pool = ComputePool(max_workers=1, max_pending=1)
+    yield pool
+    pool.shutdown()
+
+
+async def _drained(pool: ComputePool) -> bool:
+    for _ in range(100):
+        if pool.pending == 0:
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+@pytest.mark.asyncio
+async def test_arrays_are_passed_through_shared_memory(pool: ComputePool):
+    """Test that large arrays reach the worker as read-only shared mappings"""
+    large = np.arange(SHARED_MEMORY_MIN_BYTES // 8 * 2, dtype=np.float64)
+    writeable, total = await pool.run(_describe, large, tool_name="test")
+    assert (writeable, total) == (False, float(large.sum()))
+    assert await _drained(pool)
+
+    # Small arrays are pickled as usual
+    writeable, _ = await pool.run(_describe, np.ones(4), tool_name="test")
+    assert writeable is True
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_queue_cap(pool: ComputePool):
+    """Test that overruns time out but hold their slot, and excess jobs are refused"""
+    with pytest.raises(ComputeTimeoutError):
+        await pool.run(time.sleep, 0.5, tool_name="test", timeout=0.05)
+    # The worker is still sleeping, so the pool is saturated until it finishes
+    assert pool.pending == 1
+    with pytest.raises(ServiceOverloadedError):
+        await pool.run(time.sleep, 0, tool_name="test")
+
+    assert await _drained(pool)
+    assert await pool.run(max, 1, 2, tool_name="test") == 2
+
+
+@pytest.mark.asyncio
+async def test_inline_pool_runs_on_the_caller():
+    """Test that a pool without workers calls functions directly"""
+    pool = ComputePool(max_workers=0, max_pending=1)
+    assert await pool.run(_describe, np.ones(3), tool_name="test") == (True, 3.0)
+    assert pool.pending == 0
@@ -36,8 +36,18 @@ async def test_users_have_isolated_data(
     # User1 analyzes portfolio
     portfolio_data = {
         "assets": [
-            {"symbol": "AAPL", "weight": 0.6, "price": 150.0},
-            {"symbol": "GOOGL", "weight": 0.4, "price": 2500.0},
+            {
+                "symbol": "AAPL",
+                "weight": 0.6,
+                "price": 150.0,
+                "returns": [0.01, -0.02, 0.015],
+            },
+            {
+                "symbol": "GOOGL",
+                "weight": 0.4,
+                "price": 2500.0,
+                "returns": [0.02, 0.01, -0.01],
+            },
         ]
     }
 
@@ -50,8 +60,18 @@ async def test_users_have_isolated_data(
     # User2 analyzes different portfolio
     portfolio_data2 = {
         "assets": [
-            {"symbol": "MSFT", "weight": 0.5, "price": 300.0},
-            {"symbol": "AMZN", "weight": 0.5, "price": 3200.0},
+            {
+                "symbol": "MSFT",
+                "weight": 0.5,
+                "price": 300.0,
+                "returns": [-0.01, 0.03, 0.0],
+            },
+            {
+                "symbol": "AMZN",
+                "weight": 0.5,
+                "price": 3200.0,
+                "returns": [0.005, -0.015, 0.02],
+            },
         ]
     }
 
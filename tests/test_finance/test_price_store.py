@@ -0,0 +1,133 @@
+from datetime import date
+
+from httpx import AsyncClient
+import numpy as np
+import pytest
+
+from src.core.config import settings
+from src.finance.ingest_prices import main as ingest_main
+from src.finance.prices import PriceStore, PriceStoreError, get_price_store
+
+
+def _days(start: str, count: int) -> np.ndarray:
+    return np.datetime64(start) + np.arange(count)
+
+
+@pytest.fixture
+def price_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PRICE_STORE_DIR", str(tmp_path))
+    get_price_store.cache_clear()
+    yield get_price_store()
+    get_price_store.cache_clear()
+
+
+def test_append_and_memory_mapped_reads(tmp_path):
+    """Test appends, date-range slicing and reloading from another instance"""
+    store = PriceStore(tmp_path)
+    assert store.append("aapl", _days("2024-01-01", 5), np.arange(1.0, 6.0)) == 5
+    # Overlapping rows are skipped; only the new days are appended
+    assert store.append("AAPL", _days("2024-01-04", 4), np.arange(4.0, 8.0)) == 2
+    with pytest.raises(PriceStoreError):
+        store.append("AAPL", _days("2024-02-01", 1), np.array([-1.0]))
+
+    series = store.series("AAPL", start=date(2024, 1, 3), end=date(2024, 1, 6))
+    assert series is not None
+    assert series.close.tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert isinstance(series.close, np.memmap)
+    assert not series.close.flags.writeable
+
+    # A tail written without reaching the index is ignored, then overwritten
+    with open(tmp_path / "AAPL" / "close.bin", "ab") as f:
+        f.write(np.array([99.0]).tobytes())
+    reader = PriceStore(tmp_path)
+    assert len(reader.series("AAPL")) == 7
+    store.append("AAPL", _days("2024-01-08", 1), np.array([8.0]))
+    assert reader.series("AAPL").close.tolist() == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert reader.index()["AAPL"].end == date(2024, 1, 8)
+    assert reader.series("MSFT") is None
+
+
+def test_ingest_csv_and_align_returns(tmp_path):
+    """Test the ingestion command and returns aligned on shared dates"""
+    csv_path = tmp_path / "prices.csv"
+    csv_path.write_text(
+        "symbol,date,close\n"
+        "AAPL,2024-01-02,100\n"
+        "AAPL,2024-01-03,110\n"
+        "AAPL,2024-01-04,99\n"
+        "MSFT,2024-01-03,200\n"
+        "MSFT,2024-01-04,210\n"
+        "MSFT,2024-01-05,220\n"
+        "AAPL,2024-01-05,99\n"
+    )
+    root = tmp_path / "store"
+    assert ingest_main([str(csv_path), "--root", str(root)]) == 0
+    # Re-ingesting the same file adds nothing
+    assert ingest_main([str(csv_path), "--root", str(root)]) == 0
+
+    store = PriceStore(root)
+    assert store.symbols() == ["AAPL", "MSFT"]
+    dates, returns = store.aligned_returns(["AAPL", "MSFT"])
+    assert dates.tolist() == [date(2024, 1, 4), date(2024, 1, 5)]
+    np.testing.assert_allclose(returns, [[-0.1, 0.05], [0.0, 220 / 210 - 1]])
+    with pytest.raises(KeyError, match="TSLA"):
+        store.aligned_returns(["AAPL", "TSLA"])
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_analysis_reads_stored_prices(
+    client: AsyncClient, price_store: PriceStore
+):
+    """Test that portfolios without inline returns are analyzed from the store"""
+    rng = np.random.default_rng(0)
+    for symbol in ("AAPL", "MSFT", "SPY"):
+        closes = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, 500))
+        price_store.append(symbol, _days("2022-01-01", 500), closes)
+
+    user_data = {"email": "pricestore@example.com", "password": "testpassword123"}
+    await client.post("/users/", json=user_data)
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    portfolio = {
+        "assets": [
+            {"symbol": "AAPL", "weight": 0.5},
+            {"symbol": "MSFT", "weight": 0.5},
+        ],
+        "benchmark_symbol": "SPY",
+        "start_date": "2022-06-01",
+    }
+    response = await client.post(
+        "/finance/portfolio/analyze", json=portfolio, headers=headers
+    )
+    assert response.status_code == 200
+    analysis = response.json()["analysis"]
+    assert analysis["observations"] == 500 - 151 - 1
+    assert "beta" in analysis
+
+    portfolio["assets"][1]["symbol"] = "TSLA"
+    response = await client.post(
+        "/finance/portfolio/analyze", json=portfolio, headers=headers
+    )
+    assert response.json()["analysis"]["message"] == "No price history for: TSLA"
+
+    response = await client.post(
+        "/finance/portfolio/analyze/batch",
+        json={
+            "universe": [{"symbol": "AAPL"}, {"symbol": "TSLA"}],
+            "portfolios": [{"name": "a", "weights": [0.5, 0.5]}] * 3,
+        },
+        headers=headers,
+    )
+    assert response.json()["analysis"]["message"] == "No price history for: TSLA"
+    response = await client.post(
+        "/finance/risk/var", json={"assets": portfolio["assets"]}, headers=headers
+    )
+    assert response.json()["analysis"]["message"] == "No price history for: TSLA"
+
+    # Requests without history are not charged
+    response = await client.get("/subscriptions/usage/summary", headers=headers)
+    used = {item["feature_name"]: item["used"] for item in response.json()}
+    assert used["portfolio"] == 1
+    assert used["risk_var"] == 0
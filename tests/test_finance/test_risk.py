@@ -0,0 +1,141 @@
+from statistics import NormalDist
+
+from httpx import AsyncClient
+import numpy as np
+import pytest
+
+from src.finance.risk import (
+    chunk_sizes,
+    historical_returns,
+    parametric_tail_risk,
+    simulate_returns,
+    simulate_tail_losses,
+    simulation_model,
+    tail_risk,
+    tail_risk_from_largest,
+    tail_size,
+)
+from src.subscriptions.tiers import TIER_LIMITS, SubscriptionTier
+
+
+def _returns(observations: int, assets: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0004, 0.008, size=(observations, 1))
+    return market + rng.normal(0.0, 0.01, size=(observations, assets))
+
+
+def test_historical_and_parametric_tail_risk():
+    """Test windowed buy-and-hold returns and the normal closed form"""
+    returns = np.array([[0.1, 0.0], [-0.1, 0.2], [0.05, -0.1]])
+    weights = np.array([0.5, 0.5])
+    expected = [
+        0.5 * (1.1 * 0.9 - 1) + 0.5 * (1.0 * 1.2 - 1),
+        0.5 * (0.9 * 1.05 - 1) + 0.5 * (1.2 * 0.9 - 1),
+    ]
+    np.testing.assert_allclose(historical_returns(returns, weights, 2), expected)
+
+    losses = np.arange(1, 101, dtype=float)
+    var, cvar = tail_risk(-losses, [0.9])
+    assert var[0, 0] == pytest.approx(np.quantile(losses, 0.9))
+    assert cvar[0, 0] == pytest.approx(losses[losses >= var[0, 0]].mean())
+
+    history = _returns(500, 1)
+    var, cvar = parametric_tail_risk(
+        history, np.array([1.0]), [1, 4], [0.99], covariance_method="sample"
+    )
+    mean, sigma = history.mean(), history.std(ddof=1)
+    z = NormalDist().inv_cdf(0.01)
+    assert var[0, 0] == pytest.approx(-(mean + z * sigma))
+    assert var[0, 1] == pytest.approx(-(4 * mean + z * sigma * 2))
+    assert cvar[0, 0] > var[0, 0]
+
+
+def test_monte_carlo_is_reproducible_and_matches_the_normal_case():
+    """Test that chunked draws do not depend on the split, and agree with theory"""
+    history = _returns(750, 5)
+    weights = np.full(5, 0.2)
+    mean, factor = simulation_model(history)
+    sizes = [3000, 3000, 2000]
+
+    whole = simulate_returns(mean, factor, weights, [1, 10], 42, 0, sizes)
+    split = np.concatenate(
+        [
+            simulate_returns(mean, factor, weights, [1, 10], 42, 0, sizes[:1]),
+            simulate_returns(mean, factor, weights, [1, 10], 42, 1, sizes[1:]),
+        ]
+    )
+    np.testing.assert_array_equal(whole, split)
+    assert whole.shape == (8000, 2)
+    assert chunk_sizes(10, 4) == [10]
+
+    # Workers keep only the tail, which gives the same estimates
+    levels = [0.95, 0.99]
+    count = tail_size(8000, levels)
+    tails = np.concatenate(
+        [
+            simulate_tail_losses(
+                mean, factor, weights, [1, 10], 42, 0, sizes[:2], count
+            ),
+            simulate_tail_losses(
+                mean, factor, weights, [1, 10], 42, 2, sizes[2:], count
+            ),
+        ]
+    )
+    np.testing.assert_allclose(
+        tail_risk_from_largest(tails, 8000, levels), tail_risk(whole, levels)
+    )
+
+    # Over one day the lognormal portfolio return is close to normal
+    var, _ = tail_risk(whole, [0.95])
+    normal_var, _ = parametric_tail_risk(history, weights, [1, 10], [0.95])
+    np.testing.assert_allclose(var, normal_var, rtol=0.1)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_risk_endpoint(client: AsyncClient):
+    """Test VaR results, seeded reproducibility and the risk_var quota"""
+    user_data = {"email": "risk@example.com", "password": "testpassword123"}
+    await client.post("/users/", json=user_data)
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    history = _returns(120, 2)
+    request = {
+        "assets": [
+            {"symbol": "AAPL", "weight": 0.7, "returns": history[:, 0].tolist()},
+            {"symbol": "MSFT", "weight": 0.3, "returns": history[:, 1].tolist()},
+        ],
+        "horizons": [10, 1],
+        "confidence_levels": [0.99],
+        "paths": 5000,
+        "seed": 7,
+    }
+    response = await client.post("/finance/risk/var", json=request, headers=headers)
+    assert response.status_code == 200
+    analysis = response.json()["analysis"]
+    assert analysis["seed"] == 7
+    assert analysis["observations"] == 120
+    results = analysis["results"]
+    assert [(r["method"], r["horizon_days"]) for r in results] == [
+        ("monte_carlo", 1),
+        ("monte_carlo", 10),
+        ("historical", 1),
+        ("historical", 10),
+        ("parametric", 1),
+        ("parametric", 10),
+    ]
+    for result in results:
+        assert 0 < result["var"] < result["cvar"]
+
+    response = await client.post("/finance/risk/var", json=request, headers=headers)
+    assert response.json()["analysis"]["results"] == results
+
+    response = await client.get("/subscriptions/usage/summary", headers=headers)
+    (usage,) = [item for item in response.json() if item["feature_name"] == "risk_var"]
+    assert usage["used"] == 2
+    assert usage["limit"] == TIER_LIMITS[SubscriptionTier.FREE].risk_var_limit
+
+    request["confidence_levels"] = [0.3]
+    response = await client.post("/finance/risk/var", json=request, headers=headers)
+    assert response.status_code == 422
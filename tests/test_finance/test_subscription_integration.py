@@ -26,7 +26,17 @@ async def test_finance_tools_respect_free_tier_limits(
     token = login_response.json()["access_token"]
     headers = {"Authorization": f"Bearer {token}"}
 
-    portfolio_data = {"assets": [{"symbol": "AAPL", "weight": 1.0, "price": 150.0}]}
+    # Inline returns, so each request is a chargeable analysis
+    portfolio_data = {
+        "assets": [
+            {
+                "symbol": "AAPL",
+                "weight": 1.0,
+                "price": 150.0,
+                "returns": [0.01, -0.02, 0.015],
+            }
+        ]
+    }
 
     # Use up the free tier limit
     free_limit = TIER_LIMITS[SubscriptionTier.FREE].portfolio_limit
@@ -71,7 +81,16 @@ async def test_premium_tier_unlimited_portfolio_access(
     token = login_response.json()["access_token"]
     headers = {"Authorization": f"Bearer {token}"}
 
-    portfolio_data = {"assets": [{"symbol": "AAPL", "weight": 1.0, "price": 150.0}]}
+    portfolio_data = {
+        "assets": [
+            {
+                "symbol": "AAPL",
+                "weight": 1.0,
+                "price": 150.0,
+                "returns": [0.01, -0.02, 0.015],
+            }
+        ]
+    }
 
     # Use more than free limit
     free_limit = TIER_LIMITS[SubscriptionTier.FREE].portfolio_limit
@@ -112,7 +131,16 @@ async def test_usage_logging_on_finance_tool_usage(
     assert can_use_before is True
 
     # Use the tool
-    portfolio_data = {"assets": [{"symbol": "AAPL", "weight": 1.0, "price": 150.0}]}
+    portfolio_data = {
+        "assets": [
+            {
+                "symbol": "AAPL",
+                "weight": 1.0,
+                "price": 150.0,
+                "returns": [0.01, -0.02, 0.015],
+            }
+        ]
+    }
 
     response = await client.post(
         "/finance/portfolio/analyze", json=portfolio_data, headers=headers
@@ -142,7 +170,16 @@ async def test_usage_logging_on_finance_tool_usage(
 @pytest.mark.asyncio
 async def test_finance_tool_requires_authentication(client: AsyncClient):
     """Test that finance tools require authentication"""
-    portfolio_data = {"assets": [{"symbol": "AAPL", "weight": 1.0, "price": 150.0}]}
+    portfolio_data = {
+        "assets": [
+            {
+                "symbol": "AAPL",
+                "weight": 1.0,
+                "price": 150.0,
+                "returns": [0.01, -0.02, 0.015],
+            }
+        ]
+    }
 
     # Try without authentication
     response = await client.post("/finance/portfolio/analyze", json=portfolio_data)
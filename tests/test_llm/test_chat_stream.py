@@ -0,0 +1,219 @@
+import json
+from uuid import UUID, uuid4
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_session
+from src.llm.context import InMemoryContextStore
+from src.llm.models import ConversationLog
+from src.llm.services import LLMService
+from src.main import app
+from src.subscriptions.models import UsageLog
+
+COMPLETIONS_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+def _provider_stream(*deltas: str) -> bytes:
+    chunks = [
+        {
+            "id": "chatcmpl-test",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "openai/gpt-4o",
+            "choices": [{"index": 0, "delta": {"content": delta}}],
+        }
+        for delta in deltas
+    ]
+    frames = [f"data: {json.dumps(chunk)}\n\n" for chunk in chunks]
+    return "".join([*frames, "data: [DONE]\n\n"]).encode()
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields.get("event", "message"), json.loads(fields["data"])))
+    return events
+
+
+class StubStreamClient:
+    def __init__(self, *deltas: str):
+        self.deltas = deltas
+
+    async def stream_message(self, messages):
+        for delta in self.deltas:
+            yield delta
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_chat_stream_forwards_deltas_and_records_usage(
+    client: AsyncClient, test_session: AsyncSession, respx_mock
+):
+    """Test that deltas are streamed as SSE and the exchange is logged and metered"""
+    user_data = {"email": "streamer@example.com", "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    user_id = UUID(response.json()["id"])
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    respx_mock.post(COMPLETIONS_URL).respond(
+        content=_provider_stream("Hel", "lo!"),
+        headers={"content-type": "text/event-stream"},
+    )
+
+    response = await client.post(
+        "/llm/chat/stream",
+        json={"user_id": str(user_id), "message": "Hi"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _events(response.text) == [
+        ("message", {"delta": "Hel"}),
+        ("message", {"delta": "lo!"}),
+        ("done", {}),
+    ]
+
+    logs = (
+        (
+            await test_session.execute(
+                select(ConversationLog).where(ConversationLog.user_id == user_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert [(log.message, log.response) for log in logs] == [("Hi", "Hello!")]
+    # Streamed usage is estimated locally
+    assert logs[0].prompt_tokens > 0
+    assert logs[0].completion_tokens > 0
+
+    usage = (
+        (
+            await test_session.execute(
+                select(UsageLog).where(UsageLog.user_id == user_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    quantities = {entry.feature_name: entry.quantity for entry in usage}
+    assert quantities == {
+        "llm_requests": 1,
+        "llm_tokens": logs[0].prompt_tokens + logs[0].completion_tokens,
+    }
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_chat_stream_provider_error_releases_usage(
+    client: AsyncClient, test_session: AsyncSession, respx_mock
+):
+    """Test that a provider failure ends the stream with an error event and no usage"""
+    user_data = {"email": "streamfail@example.com", "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    user_id = UUID(response.json()["id"])
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    respx_mock.post(COMPLETIONS_URL).respond(status_code=400, json={"error": "bad"})
+
+    response = await client.post(
+        "/llm/chat/stream",
+        json={"user_id": str(user_id), "message": "Hi"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert _events(response.text) == [("error", {"error": "LLM provider error"})]
+
+    usage = (
+        (
+            await test_session.execute(
+                select(UsageLog).where(UsageLog.user_id == user_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert usage == []
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_chat_stream_settles_usage_outside_the_request_session(
+    client: AsyncClient, test_session: AsyncSession, respx_mock
+):
+    """Test that usage is recorded after the request's session has been closed"""
+    user_data = {"email": "streamsession@example.com", "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    user_id = UUID(response.json()["id"])
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    async def closed_after_request():
+        yield test_session
+        test_session.sync_session.info["closed"] = True
+
+    async def refuse_commit():
+        if test_session.sync_session.info.get("closed"):
+            raise AssertionError("request session used after the dependency exited")
+        await commit()
+
+    commit = test_session.commit
+    app.dependency_overrides[get_session] = closed_after_request
+    test_session.commit = refuse_commit  # type: ignore[method-assign]
+    respx_mock.post(COMPLETIONS_URL).respond(
+        content=_provider_stream("Hi"), headers={"content-type": "text/event-stream"}
+    )
+
+    try:
+        response = await client.post(
+            "/llm/chat/stream",
+            json={"user_id": str(user_id), "message": "Hi"},
+            headers=headers,
+        )
+    finally:
+        test_session.commit = commit  # type: ignore[method-assign]
+    assert _events(response.text)[-1] == ("done", {})
+
+    usage = (
+        (
+            await test_session.execute(
+                select(UsageLog).where(UsageLog.user_id == user_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert {entry.feature_name for entry in usage} == {"llm_requests", "llm_tokens"}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_stream_logs_partial_response(
+    test_engine, test_session: AsyncSession
+):
+    """Test that a stream closed early is logged but kept out of the context"""
+    store = InMemoryContextStore()
+    service = LLMService(context_store=store)
+    service.client = StubStreamClient("Partial ", "answer")
+    user_id = uuid4()
+
+    stream = service.stream_response(user_id, "Question")
+    assert await anext(stream) == "Partial "
+    await stream.aclose()
+
+    logs = (
+        (
+            await test_session.execute(
+                select(ConversationLog).where(ConversationLog.user_id == user_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert [log.response for log in logs] == ["Partial "]
+    assert await store.get(user_id) == []
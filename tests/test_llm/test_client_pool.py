@@ -0,0 +1,28 @@
+import pytest
+
+from src.core.exceptions import ServiceOverloadedError
+from src.llm.clients import OpenRouterClient, get_llm_client
+from src.llm.services import LLMService
+
+
+@pytest.mark.asyncio
+async def test_upstream_calls_wait_for_a_slot():
+    """Test that calls beyond the concurrency cap queue, then are refused"""
+    client = OpenRouterClient(max_concurrency=1, queue_timeout=0.05)
+    try:
+        async with client._slot():
+            with pytest.raises(ServiceOverloadedError):
+                async with client._slot():
+                    pass
+
+        # Once released, the slot can be taken again
+        async with client._slot():
+            pass
+    finally:
+        await client.close()
+
+
+def test_services_share_one_client():
+    """Test that every service reuses the process-wide client and its pool"""
+    assert LLMService().client is get_llm_client()
+    assert LLMService().client is LLMService().client
@@ -0,0 +1,81 @@
+import json
+from uuid import UUID, uuid4
+
+from httpx import AsyncClient
+import pytest
+
+from src.llm.context import InMemoryContextStore
+
+
+def _exchange(n: int) -> list[dict[str, str]]:
+    return [
+        {"role": "user", "content": f"question {n}"},
+        {"role": "assistant", "content": f"answer {n}"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_context_store_caps_history_and_users():
+    """Test that history is trimmed per user and idle users are evicted"""
+    store = InMemoryContextStore(
+        max_users=2, max_messages=4, max_message_chars=10, ttl_seconds=60
+    )
+    alice, bob, carol = uuid4(), uuid4(), uuid4()
+
+    for n in range(3):
+        await store.append(alice, _exchange(n))
+    history = await store.get(alice)
+    assert [m["content"] for m in history] == [
+        "question 1",
+        "answer 1",
+        "question 2",
+        "answer 2",
+    ]
+
+    await store.append(bob, [{"role": "user", "content": "x" * 50}])
+    assert (await store.get(bob))[0]["content"] == "x" * 10
+
+    # alice was used more recently than bob, so bob is evicted first
+    await store.get(alice)
+    await store.append(carol, _exchange(0))
+    assert await store.get(bob) == []
+    assert len(await store.get(alice)) == 4
+
+
+@pytest.mark.asyncio
+async def test_context_store_expires_idle_history():
+    """Test that history expires after the idle TTL"""
+    store = InMemoryContextStore(ttl_seconds=0)
+    user_id = uuid4()
+    await store.append(user_id, _exchange(0))
+    assert await store.get(user_id) == []
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_chat_sends_previous_turns(client: AsyncClient, respx_mock):
+    """Test that a second chat request carries the first exchange as context"""
+    user_data = {"email": "multiturn@example.com", "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    user_id = UUID(response.json()["id"])
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    route = respx_mock.post("https://openrouter.ai/api/v1/chat/completions").respond(
+        json={"choices": [{"message": {"content": "Noted."}}]}, status_code=200
+    )
+
+    for message in ("My budget is 500", "What is my budget?"):
+        response = await client.post(
+            "/llm/chat",
+            json={"user_id": str(user_id), "message": message},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    sent = json.loads(route.calls.last.request.content)["messages"]
+    assert sent == [
+        {"role": "user", "content": "My budget is 500"},
+        {"role": "assistant", "content": "Noted."},
+        {"role": "user", "content": "What is my budget?"},
+    ]
@@ -0,0 +1,79 @@
+from uuid import uuid4
+
+import pytest
+
+from src.core.config import settings
+from src.llm import tokens
+from src.llm.context import InMemoryContextStore
+from src.llm.tokens import fit_to_budget, prompt_messages, with_token_count
+
+MODEL = "openai/gpt-4o"
+
+
+def _message(role: str, content: str, count: int) -> dict:
+    return {"role": role, "content": content, "tokens": count}
+
+
+def test_fit_to_budget_keeps_newest_turns(monkeypatch):
+    """Test that the oldest turns are dropped first and the window starts with a user turn"""
+    monkeypatch.setattr(settings, "LLM_CONTEXT_TOKEN_BUDGET", 100)
+    history = [
+        _message("user", "q1", 30),
+        _message("assistant", "a1", 30),
+        _message("user", "q2", 30),
+        _message("assistant", "a2", 30),
+    ]
+    new = _message("user", "q3", 20)
+
+    window = fit_to_budget(history, new, MODEL)
+    # a1 fits after q3 + a2 + q2, but the window may not start with a reply
+    assert [m["content"] for m in window] == ["q2", "a2", "q3"]
+
+    # The new message is always sent, even on its own
+    assert fit_to_budget(history, _message("user", "big", 500), MODEL) == [
+        _message("user", "big", 500)
+    ]
+
+    monkeypatch.setattr(settings, "LLM_MODEL_TOKEN_BUDGETS", {MODEL: 1000})
+    assert len(fit_to_budget(history, new, MODEL)) == 5
+
+    assert prompt_messages(window)[0] == {"role": "user", "content": "q2"}
+
+
+def test_token_counts_are_cached_on_messages(monkeypatch):
+    """Test that a message is only tokenized once"""
+    message = with_token_count({"role": "user", "content": "hello there"}, MODEL)
+    assert message["tokens"] > tokens.TOKENS_PER_MESSAGE
+
+    def fail(*args):
+        raise AssertionError("recounted")
+
+    monkeypatch.setattr(tokens, "count_tokens", fail)
+    assert with_token_count(message, MODEL) is message
+
+
+def test_count_falls_back_without_encoding(monkeypatch):
+    """Test that counting still works when tiktoken cannot load an encoding"""
+
+    def unavailable(*args):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(tokens.tiktoken, "encoding_for_model", unavailable)
+    tokens.get_encoding.cache_clear()
+    try:
+        assert tokens.count_tokens("x" * 40, "some/model") == 10
+    finally:
+        tokens.get_encoding.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_clipping_drops_stale_token_count():
+    """Test that a clipped message is recounted rather than using its old count"""
+    store = InMemoryContextStore(max_message_chars=5)
+    user_id = uuid4()
+    await store.append(
+        user_id, [_message("user", "x" * 50, 99), _message("user", "ok", 4)]
+    )
+    clipped, kept = await store.get(user_id)
+    assert "tokens" not in clipped
+    assert kept["tokens"] == 4
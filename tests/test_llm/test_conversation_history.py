@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.llm.clients import Completion
+from src.llm.context import InMemoryContextStore
+from src.llm.models import ConversationLog
+from src.llm.services import LLMService
+from src.llm.tokens import TokenUsage
+
+
+async def _login(client: AsyncClient, email: str) -> tuple[UUID, dict[str, str]]:
+    user_data = {"email": email, "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    user_id = UUID(response.json()["id"])
+    login_response = await client.post("/auth/login", json=user_data)
+    return user_id, {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+def _log(user_id: UUID, message: str, response: str, timestamp: datetime):
+    row = ConversationLog.row(user_id, message, response)
+    return ConversationLog(**{**row, "timestamp": timestamp})
+
+
+class CapturingClient:
+    def __init__(self):
+        self.prompts: list[list[dict]] = []
+
+    async def complete(self, messages):
+        self.prompts.append(messages)
+        return Completion("ok", TokenUsage(prompt_tokens=10, completion_tokens=1))
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_conversation_history_pages_and_filters(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test keyset pagination, date filters and search over conversation logs"""
+    user_id, headers = await _login(client, "history@example.com")
+    other_id, _ = await _login(client, "history-other@example.com")
+
+    base = datetime(2026, 3, 1, 12, 0)
+    test_session.add_all(
+        [
+            _log(user_id, "What is a bond?", "A loan to an issuer.", base),
+            _log(
+                user_id,
+                "Explain the Sharpe ratio",
+                "Return per risk.",
+                base + timedelta(days=1),
+            ),
+            _log(
+                user_id,
+                "What about 100%_leverage?",
+                "Risky " * 400 + "Expect a margin call.",
+                base + timedelta(days=2),
+            ),
+            _log(other_id, "Explain the Sharpe ratio", "Not yours.", base),
+        ]
+    )
+    await test_session.commit()
+
+    response = await client.get("/llm/conversations?limit=2", headers=headers)
+    assert response.status_code == 200
+    page = response.json()
+    assert [item["message"] for item in page["items"]] == [
+        "What about 100%_leverage?",
+        "Explain the Sharpe ratio",
+    ]
+    assert page["items"][0]["response"] == "Risky " * 400 + "Expect a margin call."
+
+    response = await client.get(
+        f"/llm/conversations?limit=2&cursor={page['next_cursor']}", headers=headers
+    )
+    page = response.json()
+    assert [item["message"] for item in page["items"]] == ["What is a bond?"]
+    assert page["next_cursor"] is None
+
+    response = await client.get("/llm/conversations?q=sharpe", headers=headers)
+    assert [item["response"] for item in response.json()["items"]] == [
+        "Return per risk."
+    ]
+
+    # Long bodies are searched in full
+    response = await client.get("/llm/conversations?q=margin+call", headers=headers)
+    assert [item["message"] for item in response.json()["items"]] == [
+        "What about 100%_leverage?"
+    ]
+
+    # LIKE wildcards in the query are matched literally
+    response = await client.get("/llm/conversations?q=0%25_l", headers=headers)
+    assert len(response.json()["items"]) == 1
+
+    response = await client.get(
+        "/llm/conversations?start_date=2026-03-02&end_date=2026-03-02", headers=headers
+    )
+    assert [item["message"] for item in response.json()["items"]] == [
+        "Explain the Sharpe ratio"
+    ]
+
+    response = await client.get("/llm/conversations?cursor=bogus", headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_evicted_context_is_rehydrated(test_engine, test_session: AsyncSession):
+    """Test that recent logged exchanges are restored into an empty context"""
+    user_id = uuid4()
+    now = datetime.utcnow()
+    test_session.add_all(
+        [
+            _log(user_id, "Too old", "Forgotten", now - timedelta(days=2)),
+            _log(user_id, "My budget is 500", "Noted.", now - timedelta(minutes=5)),
+        ]
+    )
+    await test_session.commit()
+
+    store = InMemoryContextStore()
+    llm_client = CapturingClient()
+    service = LLMService(context_store=store, client=llm_client)
+    await service.generate_response(user_id, "What is my budget?", use_cache=False)
+
+    assert llm_client.prompts[0] == [
+        {"role": "user", "content": "My budget is 500"},
+        {"role": "assistant", "content": "Noted."},
+        {"role": "user", "content": "What is my budget?"},
+    ]
+    assert len(await store.get(user_id)) == 4
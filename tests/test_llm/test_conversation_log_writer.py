@@ -0,0 +1,92 @@
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.batch_writer import BatchWriter
+from src.llm.clients import Completion
+from src.llm.context import InMemoryContextStore
+from src.llm.models import ConversationLog
+from src.llm.services import LLMService
+from src.llm.tokens import TokenUsage
+
+
+class StubClient:
+    def __init__(self, response: str):
+        self.response = response
+
+    async def complete(self, messages):
+        return Completion(
+            self.response, TokenUsage(prompt_tokens=5, completion_tokens=600)
+        )
+
+
+def _writer(session_factory, **kwargs) -> BatchWriter:
+    return BatchWriter(
+        ConversationLog,
+        name="conversation_log_test",
+        batch_size=10,
+        flush_interval=60,
+        max_pending=100,
+        session_factory=session_factory,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_chat_logs_are_written_behind(test_engine, test_session: AsyncSession):
+    """Test that the request only enqueues its log entry and stop drains it"""
+    writer = _writer(async_sessionmaker(test_engine, expire_on_commit=False))
+    writer.start()
+    service = LLMService(
+        context_store=InMemoryContextStore(),
+        client=StubClient("detailed answer " * 300),
+        log_writer=writer,
+    )
+    user_id = uuid4()
+
+    await service.generate_response(user_id, "Explain diversification", use_cache=False)
+    assert writer.pending == 1
+
+    await writer.stop()
+    result = await test_session.execute(
+        select(ConversationLog).where(ConversationLog.user_id == user_id)
+    )
+    (log,) = result.scalars().all()
+    assert log.message == "Explain diversification"
+    assert log.response == "detailed answer " * 300
+
+
+@pytest.mark.asyncio
+async def test_unwritten_rows_are_spooled_and_restored(
+    test_engine, test_session: AsyncSession, tmp_path
+):
+    """Test that rows survive a shutdown while the database is unreachable"""
+
+    def unavailable():
+        raise ConnectionError("database is down")
+
+    user_id = uuid4()
+    writer = _writer(unavailable, spool_dir=tmp_path)
+    writer.start()
+    writer.enqueue(ConversationLog.row(user_id, "question", "answer"))
+    await writer.stop()
+    assert writer.pending == 0
+    (spool,) = tmp_path.glob("conversation_log_test-*.spool")
+    # Plain JSON lines, never unpickled
+    assert json.loads(spool.read_text())["user_id"] == {"$uuid": str(user_id)}
+
+    writer = _writer(
+        async_sessionmaker(test_engine, expire_on_commit=False), spool_dir=tmp_path
+    )
+    writer.start()
+    assert writer.pending == 1
+    await writer.stop()
+    assert list(tmp_path.iterdir()) == []
+
+    result = await test_session.execute(
+        select(ConversationLog).where(ConversationLog.user_id == user_id)
+    )
+    assert [log.response for log in result.scalars().all()] == ["answer"]
@@ -0,0 +1,61 @@
+import httpx
+from httpx import AsyncClient
+import pytest
+
+from benchmarks.llm_load import percentile, register_users, run_benchmark
+from benchmarks.mock_llm import MockLLMConfig, create_app
+from src.core.exceptions import UpstreamUnavailableError
+from src.llm.clients import OpenRouterClient
+
+MESSAGES = [{"role": "user", "content": "How should I invest?"}]
+
+
+def _client(**config) -> OpenRouterClient:
+    app = create_app(MockLLMConfig(ttft_ms=1, tokens_per_second=0, seed=7, **config))
+    return OpenRouterClient(
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)),
+        base_url="http://mock-llm/v1",
+        retry_backoff=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_mock_llm_speaks_the_chat_completions_protocol():
+    """Test that the mock answers plain and streamed completions with usage"""
+    client = _client(completion_tokens=12)
+    completion = await client.complete(MESSAGES)
+    assert len(completion.text.split()) == 12
+    assert completion.usage.prompt_tokens == 5
+    assert completion.usage.completion_tokens == 12
+    assert not completion.usage.estimated
+
+    deltas = [delta async for delta in client.stream_message(MESSAGES)]
+    assert len(deltas) == 12
+    assert "".join(deltas) == completion.text
+
+
+@pytest.mark.asyncio
+async def test_mock_llm_injects_errors():
+    """Test that injected provider errors go through the client's retries"""
+    client = _client(error_rate=1.0, error_statuses=(503,))
+    client.max_retries = 1
+    with pytest.raises(UpstreamUnavailableError):
+        await client.complete(MESSAGES)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_load_harness_reports_latency(client: AsyncClient, respx_mock):
+    """Test that the benchmark drives the chat endpoint and summarizes latencies"""
+    respx_mock.post("https://openrouter.ai/api/v1/chat/completions").respond(
+        json={"choices": [{"message": {"content": "Rebalance."}}]}
+    )
+    # The test app shares one database session, so requests go one at a time
+    users = await register_users(client, count=2, concurrency=1)
+    results = await run_benchmark(client, users, requests=6, concurrency=1)
+
+    summary = results.summary()
+    assert summary["statuses"] == {"200": 6}
+    assert set(summary["latency_ms"]) == {"p50", "p95", "p99", "max"}
+    assert summary["throughput_rps"] > 0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.0
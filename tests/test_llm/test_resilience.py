@@ -0,0 +1,165 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from src.core.exceptions import UpstreamUnavailableError
+from src.llm.clients import OpenRouterClient
+from src.llm.resilience import CircuitBreaker, LatencyTracker, hedged
+
+COMPLETIONS_URL = "https://openrouter.ai/api/v1/chat/completions"
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def _completion(content: str = "Hello") -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def _client(**kwargs) -> OpenRouterClient:
+    kwargs.setdefault("retry_backoff", 0)
+    return OpenRouterClient(**kwargs)
+
+
+@pytest.mark.asyncio
+async def test_retryable_errors_are_retried(respx_mock):
+    """Test that 5xx and 429 responses are retried until one succeeds"""
+    route = respx_mock.post(COMPLETIONS_URL).mock(
+        side_effect=[
+            httpx.Response(503, json={"error": "unavailable"}),
+            httpx.Response(429, json={"error": "slow down"}),
+            _completion(),
+        ]
+    )
+    client = _client(max_retries=2)
+    assert await client.send_message(MESSAGES) == "Hello"
+    assert route.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_exhausted_and_bad_requests(respx_mock):
+    """Test that exhausted retries become 503s and client errors are not retried"""
+    route = respx_mock.post(COMPLETIONS_URL).respond(500, json={"error": "boom"})
+    with pytest.raises(UpstreamUnavailableError):
+        await _client(max_retries=1).send_message(MESSAGES)
+    assert route.call_count == 2
+
+    respx_mock.reset()
+    route = respx_mock.post(COMPLETIONS_URL).respond(400, json={"error": "bad"})
+    with pytest.raises(openai.BadRequestError):
+        await _client(max_retries=3).send_message(MESSAGES)
+    assert route.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_attempts_have_a_deadline(respx_mock):
+    """Test that a hung attempt is abandoned and retried"""
+
+    attempts = 0
+
+    async def hang_once(request):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            await asyncio.sleep(5)
+        return _completion(f"Attempt {attempts}")
+
+    respx_mock.post(COMPLETIONS_URL).mock(side_effect=hang_once)
+    client = _client(max_retries=1, attempt_timeout=0.05)
+    assert await client.send_message(MESSAGES) == "Attempt 2"
+
+
+@pytest.mark.asyncio
+async def test_deadline_covers_the_attempt_in_progress(respx_mock):
+    """Test that the call deadline cuts off a slow attempt, not just retries"""
+
+    async def slow(request):
+        await asyncio.sleep(5)
+        return _completion()
+
+    respx_mock.post(COMPLETIONS_URL).mock(side_effect=slow)
+    client = _client(max_retries=3, attempt_timeout=10, deadline=0.1)
+    started = asyncio.get_running_loop().time()
+    with pytest.raises(UpstreamUnavailableError):
+        await client.send_message(MESSAGES)
+    assert asyncio.get_running_loop().time() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(respx_mock):
+    """Test that a failing provider trips the breaker and further calls skip it"""
+    route = respx_mock.post(COMPLETIONS_URL).respond(502, json={"error": "bad gateway"})
+    client = _client(max_retries=0, breaker=CircuitBreaker(2, reset_seconds=60))
+
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailableError):
+            await client.send_message(MESSAGES)
+    assert client.breaker.is_open
+
+    with pytest.raises(UpstreamUnavailableError):
+        await client.send_message(MESSAGES)
+    assert route.call_count == 2
+
+
+def test_breaker_half_open_probe():
+    """Test that one probe is allowed after the reset period and closes the circuit"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.is_open
+
+    breaker.before_call()
+    # Only one probe at a time
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.before_call()
+    breaker.record_success()
+    assert not breaker.is_open
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_wedge_the_breaker(respx_mock):
+    """Test that cancelling a half-open probe lets the next call probe again"""
+
+    probing = asyncio.Event()
+
+    async def hang(request):
+        probing.set()
+        await asyncio.sleep(5)
+        return _completion()
+
+    route = respx_mock.post(COMPLETIONS_URL).mock(side_effect=hang)
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    client = _client(max_retries=0, breaker=breaker)
+
+    probe = asyncio.create_task(client.send_message(MESSAGES))
+    await asyncio.wait_for(probing.wait(), 1)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    route.mock(side_effect=None, return_value=_completion("Recovered"))
+    assert await client.send_message(MESSAGES) == "Recovered"
+    assert not breaker.is_open
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_takes_the_faster_copy():
+    """Test that a slow call is hedged and the duplicate's result is used"""
+    delays = [1.0, 0.0]
+    started = []
+
+    async def call() -> int:
+        attempt = len(started)
+        started.append(attempt)
+        await asyncio.sleep(delays[attempt])
+        return attempt
+
+    assert await hedged(call, hedge_after=0.02) == 1
+    assert started == [0, 1]
+
+    tracker = LatencyTracker(window=10, min_samples=3)
+    assert tracker.percentile(95) is None
+    for seconds in (0.1, 0.2, 0.3, 2.0):
+        tracker.observe(seconds)
+    assert tracker.percentile(50) == 0.2
+    assert tracker.percentile(95) == 2.0
@@ -0,0 +1,106 @@
+import asyncio
+
+from httpx import AsyncClient
+import pytest
+
+from src.llm.cache import InMemoryResponseCache, TieredResponseCache, response_cache_key
+
+
+def _messages(content: str) -> list[dict[str, str]]:
+    return [{"role": "user", "content": content}]
+
+
+def test_cache_key_normalizes_whitespace():
+    """Test that keys ignore whitespace differences but not model or content"""
+    key = response_cache_key("openai/gpt-4o", _messages("explain Sharpe ratio"))
+    assert key == response_cache_key(
+        "openai/gpt-4o", _messages("  explain   Sharpe\nratio ")
+    )
+    assert key != response_cache_key(
+        "openai/gpt-4o-mini", _messages("explain Sharpe ratio")
+    )
+    assert key != response_cache_key(
+        "openai/gpt-4o", _messages("explain Sortino ratio")
+    )
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_by_size():
+    """Test that the least recently used entries go once the byte budget is exceeded"""
+    cache = InMemoryResponseCache(max_entries=10, max_bytes=10, ttl_seconds=60)
+    await cache.set("a", "xxxx")
+    await cache.set("b", "yyyy")
+    await cache.get("a")
+    await cache.set("c", "zzzz")
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "xxxx"
+    assert cache.size_bytes == 8
+
+    # Responses larger than the whole budget are not cached
+    await cache.set("d", "w" * 11)
+    assert await cache.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call():
+    """Test that identical concurrent requests trigger a single upstream call"""
+    cache = TieredResponseCache(
+        InMemoryResponseCache(max_entries=10, max_bytes=1000, ttl_seconds=60)
+    )
+    calls = 0
+
+    async def generate() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    results = await asyncio.gather(
+        *(cache.get_or_generate("key", generate) for _ in range(5))
+    )
+    assert results == ["answer"] * 5
+    assert calls == 1
+
+    assert await cache.get_or_generate("key", generate) == "answer"
+    assert calls == 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_chat_serves_repeated_questions_from_cache(
+    client: AsyncClient, respx_mock
+):
+    """Test that a canned question is answered once and opting out bypasses the cache"""
+    route = respx_mock.post("https://openrouter.ai/api/v1/chat/completions").respond(
+        json={
+            "choices": [
+                {"message": {"content": "It is excess return per unit of risk."}}
+            ]
+        },
+        status_code=200,
+    )
+
+    async def ask(email: str, use_cache: bool = True) -> str:
+        user_data = {"email": email, "password": "testpassword123"}
+        response = await client.post("/users/", json=user_data)
+        user_id = response.json()["id"]
+        login_response = await client.post("/auth/login", json=user_data)
+        headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+        response = await client.post(
+            "/llm/chat",
+            json={
+                "user_id": user_id,
+                "message": "Explain the Sharpe ratio",
+                "use_cache": use_cache,
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+        return response.json()["response"]
+
+    first = await ask("cache1@example.com")
+    assert await ask("cache2@example.com") == first
+    assert route.call_count == 1
+
+    await ask("cache3@example.com", use_cache=False)
+    assert route.call_count == 2
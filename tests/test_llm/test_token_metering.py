@@ -0,0 +1,86 @@
+from uuid import UUID
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.llm.clients import OpenRouterClient
+from src.llm.models import ConversationLog
+from src.llm.tokens import estimate_usage
+from src.subscriptions.models import UsageLog
+from src.subscriptions.tiers import TIER_LIMITS, SubscriptionTier
+
+COMPLETIONS_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+def _completion(prompt_tokens: int | None, completion_tokens: int | None) -> dict:
+    body: dict = {"choices": [{"message": {"content": "Diversify."}}]}
+    if prompt_tokens is not None:
+        body["usage"] = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+    return body
+
+
+@pytest.mark.asyncio
+async def test_client_reports_provider_usage(respx_mock):
+    """Test that provider usage is captured and missing usage is estimated"""
+    messages = [{"role": "user", "content": "How should I invest?"}]
+    respx_mock.post(COMPLETIONS_URL).respond(json=_completion(120, 30))
+    completion = await OpenRouterClient(retry_backoff=0).complete(messages)
+    assert completion.text == "Diversify."
+    assert completion.usage.total_tokens == 150
+    assert not completion.usage.estimated
+
+    respx_mock.reset()
+    respx_mock.post(COMPLETIONS_URL).respond(json=_completion(None, None))
+    completion = await OpenRouterClient(retry_backoff=0).complete(messages)
+    assert completion.usage.estimated
+    assert completion.usage == estimate_usage(messages, "Diversify.", "any/model")
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_chat_is_metered_against_the_token_budget(
+    client: AsyncClient, test_session: AsyncSession, respx_mock
+):
+    """Test that chat tokens are charged and a spent budget refuses further chats"""
+    user_data = {"email": "tokens@example.com", "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    user_id = UUID(response.json()["id"])
+    login_response = await client.post("/auth/login", json=user_data)
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    budget = TIER_LIMITS[SubscriptionTier.FREE].llm_tokens_limit
+    respx_mock.post(COMPLETIONS_URL).respond(json=_completion(budget - 10, 20))
+    chat_data = {"user_id": str(user_id), "message": "Summarize my history"}
+
+    response = await client.post("/llm/chat", json=chat_data, headers=headers)
+    assert response.status_code == 200
+
+    result = await test_session.execute(
+        select(ConversationLog).where(ConversationLog.user_id == user_id)
+    )
+    (log,) = result.scalars().all()
+    assert (log.prompt_tokens, log.completion_tokens) == (budget - 10, 20)
+
+    result = await test_session.execute(
+        select(UsageLog.feature_name, UsageLog.quantity).where(
+            UsageLog.user_id == user_id
+        )
+    )
+    assert dict(result.all()) == {"llm_requests": 1, "llm_tokens": budget + 10}
+
+    response = await client.get("/subscriptions/usage/summary", headers=headers)
+    summary = {item["feature_name"]: item for item in response.json()}
+    assert summary["llm_tokens"]["used"] == budget + 10
+    assert summary["llm_tokens"]["limit"] == budget
+
+    # The call that crossed the budget was allowed; the next one is not
+    chat_data["message"] = "And now?"
+    response = await client.post("/llm/chat", json=chat_data, headers=headers)
+    assert response.status_code == 429
+    assert response.json()["detail"] == "Token budget exceeded for LLM requests"
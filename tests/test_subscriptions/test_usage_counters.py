@@ -0,0 +1,158 @@
+from datetime import datetime
+from uuid import UUID
+
+from httpx import AsyncClient
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.subscriptions.counters import (
+    InMemoryUsageCounterStore,
+    usage_counter_key,
+)
+from src.subscriptions.models import UsageCounter, UsageLog
+from src.subscriptions.services import SubscriptionService
+from src.subscriptions.tiers import TIER_LIMITS, SubscriptionTier, UsageWindow
+
+
+class UnavailableCounterStore(InMemoryUsageCounterStore):
+    async def get(self, key: str) -> int | None:
+        raise RedisConnectionError("connection refused")
+
+
+async def _create_user(client: AsyncClient, email: str) -> UUID:
+    response = await client.post(
+        "/users/", json={"email": email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+    return UUID(response.json()["id"])
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_seed_and_increment():
+    """Test that increments require a seeded key and seeding never overwrites"""
+    store = InMemoryUsageCounterStore()
+
+    assert await store.incr("usage:test") is None
+
+    await store.seed("usage:test", 1)
+    await store.seed("usage:test", 5)  # Already seeded, ignored
+    assert await store.incr("usage:test") == 2
+    assert await store.get("usage:test") == 2
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_check_usage_limit_reads_counters(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that the limit check uses the counter, not the usage history"""
+    user_id = await _create_user(client, "counters@example.com")
+    subscription_service = SubscriptionService(
+        test_session, counters=InMemoryUsageCounterStore()
+    )
+
+    for _i in range(TIER_LIMITS[SubscriptionTier.FREE].portfolio_limit):
+        await subscription_service.log_usage(user_id, "portfolio")
+
+    # Dropping the raw history does not affect the check
+    await test_session.execute(delete(UsageLog).where(UsageLog.user_id == user_id))
+    await test_session.commit()
+
+    assert await subscription_service.get_usage_count(user_id, "portfolio") == 5
+    assert await subscription_service.check_usage_limit(user_id, "portfolio") is False
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_check_usage_limit_falls_back_to_database(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that an unreachable counter store falls back to the usagecounter table"""
+    user_id = await _create_user(client, "counterfallback@example.com")
+    subscription_service = SubscriptionService(
+        test_session, counters=UnavailableCounterStore()
+    )
+
+    await subscription_service.log_usage(user_id, "llm_requests")
+
+    assert await subscription_service.get_usage_count(user_id, "llm_requests") == 1
+    assert await subscription_service.check_usage_limit(user_id, "llm_requests")
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_charge_usage_lands_with_the_reservation(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that after-the-fact usage is counted in the reservation's window"""
+    user_id = await _create_user(client, "charge@example.com")
+    counters = InMemoryUsageCounterStore()
+    subscription_service = SubscriptionService(test_session, counters=counters)
+
+    reservation = await subscription_service.reserve_usage(user_id, "llm_requests")
+    key = usage_counter_key(user_id, "llm_tokens", reservation.period)
+    await counters.seed(key, 0)
+    await subscription_service.charge_usage(reservation, "llm_tokens", 150)
+    await subscription_service.commit_usage(reservation)
+
+    assert await counters.get(key) == 150
+    stored = await subscription_service._get_stored_count(
+        user_id, "llm_tokens", reservation.period
+    )
+    assert stored == 150
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_reconcile_usage_counters(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that reconciliation rebuilds counters from the daily rollups"""
+    user_id = await _create_user(client, "reconcile@example.com")
+    counters = InMemoryUsageCounterStore()
+    subscription_service = SubscriptionService(test_session, counters=counters)
+
+    for _i in range(3):
+        await subscription_service.log_usage(user_id, "portfolio")
+
+    # Simulate drift in both counter tiers
+    await test_session.execute(
+        delete(UsageCounter).where(UsageCounter.user_id == user_id)  # type: ignore[arg-type]
+    )
+    await test_session.commit()
+    period = UsageWindow.MONTH.period(datetime.utcnow())
+    key = usage_counter_key(user_id, "portfolio", period)
+    await counters.set_many({key: 42})
+
+    assert await subscription_service.reconcile_usage_counters() == 1
+    assert await counters.get(key) == 3
+    assert (
+        await subscription_service._get_stored_count(user_id, "portfolio", period) == 3
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_reconcile_keeps_usage_not_yet_rolled_up(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that reconciliation never lowers an open-window counter"""
+    user_id = await _create_user(client, "reconcileopen@example.com")
+    counters = InMemoryUsageCounterStore()
+    subscription_service = SubscriptionService(test_session, counters=counters)
+
+    await subscription_service.log_usage(user_id, "portfolio")
+    # Reserved but not yet committed, so not in the rollups
+    reservation = await subscription_service.reserve_usage(user_id, "portfolio")
+
+    assert await subscription_service.reconcile_usage_counters() == 1
+    key = usage_counter_key(user_id, "portfolio", reservation.period)
+    assert await counters.get(key) == 2
+    assert (
+        await subscription_service._get_stored_count(
+            user_id, "portfolio", reservation.period
+        )
+        == 2
+    )
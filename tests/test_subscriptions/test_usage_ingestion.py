@@ -0,0 +1,100 @@
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.batch_writer import BatchWriter
+from src.subscriptions.models import UsageLog
+from src.subscriptions.services import SubscriptionService
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_usage_logs_are_written_behind_in_batches(
+    client: AsyncClient, test_session: AsyncSession, test_engine
+):
+    """Test that metered usage is buffered and bulk-inserted, then drained on stop"""
+    user_data = {"email": "writebehind@example.com", "password": "testpassword123"}
+
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+    user_id = UUID(response.json()["id"])
+
+    writer = BatchWriter(
+        UsageLog,
+        name="usage_log_test",
+        batch_size=2,
+        flush_interval=60,
+        max_pending=100,
+        session_factory=async_sessionmaker(test_engine, expire_on_commit=False),
+    )
+    writer.start()
+    subscription_service = SubscriptionService(test_session, usage_log_writer=writer)
+
+    for _i in range(3):
+        async with subscription_service.metered(user_id, "portfolio"):
+            pass
+
+    # Usage is buffered rather than written by the request
+    assert writer.pending >= 1
+    await writer.stop()
+    assert writer.pending == 0
+
+    result = await test_session.execute(
+        select(UsageLog).where(UsageLog.user_id == user_id)
+    )
+    assert len(result.scalars().all()) == 3
+    assert await subscription_service.get_usage_count(user_id, "portfolio") == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_writer_sheds_oldest_rows_when_full():
+    """Test that the buffer stays bounded when it cannot be flushed"""
+    writer = BatchWriter(
+        UsageLog, name="usage_log_test", batch_size=10, flush_interval=60, max_pending=2
+    )
+
+    for i in range(3):
+        writer.enqueue({"feature_name": str(i)})
+
+    assert [row["feature_name"] for row in writer._pending] == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_batch_writer_rejects_bad_rows_without_blocking_others(
+    test_session: AsyncSession, test_engine, tmp_path: Path
+):
+    """Test that a row violating a constraint is set aside and the rest written"""
+    writer = BatchWriter(
+        UsageLog,
+        name="usage_log_test",
+        batch_size=10,
+        flush_interval=60,
+        max_pending=100,
+        session_factory=async_sessionmaker(test_engine, expire_on_commit=False),
+        spool_dir=tmp_path,
+    )
+    user_id = uuid4()
+    for feature_name in ["portfolio", "portfolio", None, "portfolio", "portfolio"]:
+        writer.enqueue(
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "feature_name": feature_name,
+                "quantity": 1,
+                "timestamp": datetime.utcnow(),
+            }
+        )
+
+    assert await writer.flush()
+    assert writer.pending == 0
+
+    result = await test_session.execute(
+        select(UsageLog).where(UsageLog.user_id == user_id)
+    )
+    assert len(result.scalars().all()) == 4
+    assert len(list(tmp_path.glob("usage_log_test-*.rejected"))) == 1
@@ -1,10 +1,13 @@
+from datetime import datetime
 from uuid import UUID
 
 from httpx import AsyncClient
 import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.subscriptions.models import UsageLog
+from src.core.exceptions import UsageLimitExceededError
+from src.subscriptions.models import UsageDaily, UsageLog
 from src.subscriptions.services import SubscriptionService
 from src.subscriptions.tiers import TIER_LIMITS, SubscriptionTier
 
@@ -121,7 +124,6 @@ async def test_usage_logging_creates_records(
     await subscription_service.log_usage(user_id, "llm_requests")
 
     # Check usage logs were created
-    from sqlalchemy import select
 
     result = await test_session.execute(
         select(UsageLog).where(UsageLog.user_id == user_id)
@@ -132,3 +134,137 @@ async def test_usage_logging_creates_records(
     features = [log.feature_name for log in logs]
     assert "portfolio" in features
     assert "llm_requests" in features
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_reserve_usage_enforces_limit(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that reservations stop at the tier limit and can be released"""
+    user_data = {"email": "reserve@example.com", "password": "testpassword123"}
+
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+    user_id = UUID(response.json()["id"])
+
+    subscription_service = SubscriptionService(test_session)
+    free_limit = TIER_LIMITS[SubscriptionTier.FREE].portfolio_limit
+
+    reservations = [
+        await subscription_service.reserve_usage(user_id, "portfolio")
+        for _i in range(free_limit)
+    ]
+    assert [r.count for r in reservations] == list(range(1, free_limit + 1))
+
+    with pytest.raises(UsageLimitExceededError):
+        await subscription_service.reserve_usage(user_id, "portfolio")
+
+    # Releasing a reservation frees one unit of quota
+    await subscription_service.release_usage(reservations[-1])
+    assert await subscription_service.check_usage_limit(user_id, "portfolio") is True
+    await subscription_service.reserve_usage(user_id, "portfolio")
+    assert await subscription_service.check_usage_limit(user_id, "portfolio") is False
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_reserve_usage_in_bulk(client: AsyncClient, test_session: AsyncSession):
+    """Test that a bulk reservation is admitted whole or not at all"""
+    user_data = {"email": "bulkreserve@example.com", "password": "testpassword123"}
+
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+    user_id = UUID(response.json()["id"])
+
+    subscription_service = SubscriptionService(test_session)
+    free_limit = TIER_LIMITS[SubscriptionTier.FREE].portfolio_limit
+
+    with pytest.raises(UsageLimitExceededError):
+        await subscription_service.reserve_usage(user_id, "portfolio", free_limit + 1)
+
+    reservation = await subscription_service.reserve_usage(
+        user_id, "portfolio", free_limit - 1
+    )
+    assert reservation.count == free_limit - 1
+    with pytest.raises(UsageLimitExceededError):
+        await subscription_service.reserve_usage(user_id, "portfolio", 2)
+
+    await subscription_service.release_usage(reservation)
+    assert await subscription_service.get_usage_count(user_id, "portfolio") == 0
+
+    # Committing logs the whole reservation as one event
+    reservation = await subscription_service.reserve_usage(user_id, "portfolio", 3)
+    await subscription_service.commit_usage(reservation)
+    assert await subscription_service.get_usage_count(user_id, "portfolio") == 3
+
+    result = await test_session.execute(
+        select(UsageLog).where(UsageLog.user_id == user_id)
+    )
+    assert [log.quantity for log in result.scalars().all()] == [3]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_metered_usage_commits_or_releases(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that metered calls log usage on success and release quota on failure"""
+    user_data = {"email": "metered@example.com", "password": "testpassword123"}
+
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+    user_id = UUID(response.json()["id"])
+
+    subscription_service = SubscriptionService(test_session)
+
+    async with subscription_service.metered(user_id, "llm_requests"):
+        pass
+
+    with pytest.raises(RuntimeError):
+        async with subscription_service.metered(user_id, "llm_requests"):
+            raise RuntimeError("upstream failure")
+
+    assert await subscription_service.get_usage_count(user_id, "llm_requests") == 1
+
+    result = await test_session.execute(
+        select(UsageLog).where(UsageLog.user_id == user_id)
+    )
+    assert len(result.scalars().all()) == 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_usage_summary_reads_daily_rollups(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that usage is rolled up per day and reported for the current window"""
+    user_data = {"email": "summary@example.com", "password": "testpassword123"}
+
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+    user_id = UUID(response.json()["id"])
+
+    subscription_service = SubscriptionService(test_session)
+    for _i in range(2):
+        await subscription_service.log_usage(user_id, "portfolio")
+    await subscription_service.log_usage(user_id, "llm_requests")
+
+    result = await test_session.execute(
+        select(UsageDaily).where(UsageDaily.user_id == user_id)
+    )
+    rollups = {row.feature_name: row.count for row in result.scalars().all()}
+    assert rollups == {"portfolio": 2, "llm_requests": 1}
+
+    login_response = await client.post("/auth/login", json=user_data)
+    token = login_response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/subscriptions/usage/summary", headers=headers)
+    assert response.status_code == 200
+    summary = {item["feature_name"]: item for item in response.json()}
+    free_limits = TIER_LIMITS[SubscriptionTier.FREE]
+    assert summary["portfolio"]["used"] == 2
+    assert summary["portfolio"]["limit"] == free_limits.portfolio_limit
+    assert summary["llm_requests"]["used"] == 1
+    assert summary["llm_requests"]["period"] == datetime.utcnow().strftime("%Y-%m")
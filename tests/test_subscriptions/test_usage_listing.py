@@ -0,0 +1,96 @@
+from datetime import datetime
+from uuid import UUID
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.subscriptions.services import SubscriptionService
+
+
+async def _login(client: AsyncClient, email: str) -> tuple[UUID, dict[str, str]]:
+    user_data = {"email": email, "password": "testpassword123"}
+    response = await client.post("/users/", json=user_data)
+    assert response.status_code == 200
+    user_id = UUID(response.json()["id"])
+
+    login_response = await client.post("/auth/login", json=user_data)
+    token = login_response.json()["access_token"]
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_usage_logs_are_cursor_paginated(
+    client: AsyncClient, test_session: AsyncSession
+):
+    """Test that pages follow next_cursor without gaps or repeats"""
+    user_id, headers = await _login(client, "usagepages@example.com")
+    subscription_service = SubscriptionService(test_session)
+    for _i in range(4):
+        await subscription_service.log_usage(user_id, "portfolio")
+    await subscription_service.log_usage(user_id, "llm_requests")
+
+    seen = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        response = await client.get(
+            "/subscriptions/usage", headers=headers, params=params
+        )
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert len(seen) == 5
+    assert len({item["id"] for item in seen}) == 5
+    timestamps = [item["timestamp"] for item in seen]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+    response = await client.get(
+        "/subscriptions/usage",
+        headers=headers,
+        params={"feature_name": "llm_requests", "start_date": "2000-01-01"},
+    )
+    assert [item["feature_name"] for item in response.json()["items"]] == [
+        "llm_requests"
+    ]
+
+    response = await client.get(
+        "/subscriptions/usage", headers=headers, params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_usage_aggregates(client: AsyncClient, test_session: AsyncSession):
+    """Test grouped usage counts by feature and by day"""
+    user_id, headers = await _login(client, "usageaggregate@example.com")
+    subscription_service = SubscriptionService(test_session)
+    for _i in range(3):
+        await subscription_service.log_usage(user_id, "portfolio")
+    await subscription_service.log_usage(user_id, "llm_requests")
+
+    response = await client.get(
+        "/subscriptions/usage", headers=headers, params={"aggregate": "feature"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["aggregate"] == "feature"
+    assert {g["group"]: g["count"] for g in body["groups"]} == {
+        "portfolio": 3,
+        "llm_requests": 1,
+    }
+
+    response = await client.get(
+        "/subscriptions/usage",
+        headers=headers,
+        params={"aggregate": "day", "feature_name": "portfolio"},
+    )
+    assert response.json()["groups"] == [
+        {"group": datetime.utcnow().date().isoformat(), "count": 3}
+    ]